@@ -1,4 +1,5 @@
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, Response
+from flask import jsonify as flask_jsonify
 from flask_cors import CORS
 from flatlib import const
 from flatlib.chart import Chart
@@ -7,16 +8,55 @@ from flatlib.geopos import GeoPos
 from flatlib.object import Object
 from flatlib import aspects
 import json
+import gzip
+import logging
+import base64
 from datetime import datetime
 import pytz
 import svgwrite
 import math
-from synastry_service import get_synastry_analysis
-from daily_fortune_service import DailyFortuneCalculator
+import os
+from collections import deque
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from synastry_service import get_synastry_analysis, get_synastry_aspects, composite_chart, davison_chart
+from daily_fortune_service import DailyFortuneCalculator, fortune_seed
+from daily_fortune_service import SnapshotStore, SnapshotScheduler, load_snapshots, SubscriberStore
+from daily_fortune_service.core import end_of_day_timestamp, local_date
+from daily_fortune_service.subscribers import compute_subscriber_fortune
+from daily_fortune_service.batch import BATCH_CHUNK_RECORDS, init_worker as batch_init_worker, score_chunk as batch_score_chunk
+from daily_fortune_service.snapshots import serialize_context
+from daily_fortune_service.planetary_hours import current_location, grid_cell
+from daily_fortune_service.transit_events import DEFAULT_HIT_ORB, EVENT_TYPES, aspect_hits, date_to_jd, jd_to_iso
+from daily_fortune_service.transit_events import transit_events
+from daily_fortune_service.ephemeris import TRANSIT_OBJECTS
+from daily_fortune_service.event_calendar import CALENDAR_EVENT_TYPES, CALENDAR_OBJECTS, calendar_events
+from daily_fortune_service.void_of_course import void_periods
+from daily_fortune_service.electional import electional_search
+from daily_fortune_service.influence import NATAL_PLANETS
+from cache_service import SVGStore, create_response_cache
+from monitoring_service import init_app as init_metrics, stage_timer, timed_stage, record_cache_lookup
+from monitoring_service import configure_logging, get_logger
+
+# 日志通过后台队列异步输出，默认不输出DEBUG
+configure_logging()
+logger = get_logger('app')
 
 app = Flask(__name__)
 CORS(app)
 
+# 请求延迟、进行中请求数和各阶段耗时指标，通过/metrics暴露
+init_metrics(app)
+
+def jsonify(*args, **kwargs):
+    """统计JSON序列化耗时的jsonify"""
+    with stage_timer('json_serialization'):
+        return flask_jsonify(*args, **kwargs)
+
+# SVG星盘磁盘缓存（多个worker和重启之间共享）
+svg_store = SVGStore()
+
 # 星座名称映射
 SIGN_NAMES = {
     'Aries': '白羊座',
@@ -110,9 +150,17 @@ def estimate_timezone_from_longitude(longitude):
     # 四舍五入到最接近的0.5小时
     timezone_offset = round(timezone_offset * 2) / 2
     
-    print(f"Debug - Estimated timezone from longitude {longitude}: {timezone_offset}")
+    logger.debug("Estimated timezone from longitude %s: %s", longitude, timezone_offset)
     return timezone_offset
 
+def format_utc_offset(timezone_offset):
+    """将数字时区转换为+HH:MM或-HH:MM格式"""
+    hours = int(timezone_offset)
+    minutes = int(abs(timezone_offset - hours) * 60)
+    sign = '+' if timezone_offset >= 0 else '-'
+    return f"{sign}{abs(hours):02d}:{abs(minutes):02d}"
+
+@timed_stage('chart_build')
 def calculate_chart(date, time, lat, lon):
     try:
         # 按照flatlib文档要求的格式: Datetime('2015/03/13', '17:00', '+00:00')
@@ -122,19 +170,16 @@ def calculate_chart(date, time, lat, lon):
         
         # 从经度估算时区偏移
         estimated_timezone = estimate_timezone_from_longitude(lon)
-        
-        # 将数字时区转换为+HH:MM或-HH:MM格式
-        hours = int(estimated_timezone)
-        minutes = int(abs(estimated_timezone - hours) * 60)
-        sign = '+' if estimated_timezone >= 0 else '-'
-        utc_offset = f"{sign}{abs(hours):02d}:{abs(minutes):02d}"
+        utc_offset = format_utc_offset(estimated_timezone)
         
         # 创建日期时间对象
         date_obj = Datetime(date_str, time_str, utc_offset)
         
         # 输出调试信息
-        print(f"Debug - Date: {date_str}, Time: {time_str}, Estimated Timezone: {utc_offset}")
-        print(f"Debug - Julian Date: {date_obj.jd}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Chart datetime", extra={
+                'date': date_str, 'time': time_str, 'utc_offset': utc_offset, 'jd': date_obj.jd
+            })
         
         # 创建地理位置对象
         pos = GeoPos(lat, lon)
@@ -143,8 +188,78 @@ def calculate_chart(date, time, lat, lon):
         chart = Chart(date_obj, pos, IDs=const.LIST_OBJECTS)
         return chart
     except Exception as e:
-        print(f"Debug - Error details: {str(e)}")  # 调试信息
+        logger.debug("Chart calculation error: %s", e)  # 调试信息
+        raise Exception(f"Date time format error: {str(e)}")
+
+def chart_fingerprint(date, time, lat, lon):
+    """
+    星盘指纹：只由儒略日和地理位置决定
+    同一时刻的不同输入写法（如'12:00'和'12:00:00'）得到相同指纹
+    """
+    try:
+        utc_offset = format_utc_offset(round(lon / 15.0 * 2) / 2)
+        jd = Datetime(date.replace('-', '/'), time, utc_offset).jd
+    except Exception as e:
         raise Exception(f"Date time format error: {str(e)}")
+    return f"{jd:.8f}|{lat:.6f}|{lon:.6f}|{const.HOUSES_DEFAULT}"
+
+def get_svg_options(data):
+    """
+    解析SVG渲染选项
+    svg_mode: 'standard'（默认）或 'compact'（symbol/use复用、坐标取整、共享CSS类）
+    precision: 精简模式下坐标保留的小数位数（0-3，默认1）
+    """
+    if str(data.get('svg_mode', 'standard')).lower() != 'compact':
+        return {}
+    try:
+        precision = int(data.get('precision', 1))
+    except (TypeError, ValueError):
+        precision = 1
+    return {'mode': 'compact', 'precision': max(0, min(3, precision))}
+
+def get_chart_svg_gz(date, time, lat, lon, lang, chart=None, options=None):
+    """
+    获取gzip压缩的SVG星盘，优先读取磁盘缓存
+    返回 (缓存键, gzip字节)；只有缓存未命中时才计算星盘并渲染
+    """
+    options = options or {}
+    cache_key = svg_store.key(chart_fingerprint(date, time, lat, lon), lang, options)
+    svg_gz = svg_store.get(cache_key)
+    if svg_gz is None:
+        if chart is None:
+            chart = calculate_chart(date, time, lat, lon)
+        if options.get('mode') == 'compact':
+            svg_content = generate_compact_chart_svg(chart, lang, options['precision'])
+        else:
+            svg_content = generate_chart_svg(chart, lang)
+        svg_gz = svg_store.put(cache_key, svg_content)
+    return cache_key, svg_gz
+
+def biwheel_fingerprint(user1_date, user1_time, user1_lat, user1_lon,
+                        user2_date, user2_time, user2_lat, user2_lon):
+    """合盘双轮图指纹：两个星盘指纹按顺序组合（内外圈不可交换）"""
+    return "biwheel|" + chart_fingerprint(user1_date, user1_time, user1_lat, user1_lon) + \
+        "#" + chart_fingerprint(user2_date, user2_time, user2_lat, user2_lon)
+
+def get_biwheel_svg_gz(fingerprint, lang, chart1, chart2, aspects_data):
+    """获取gzip压缩的合盘双轮图，缓存未命中时使用已计算的跨盘相位渲染"""
+    cache_key = svg_store.key(fingerprint, lang)
+    svg_gz = svg_store.get(cache_key)
+    if svg_gz is None:
+        svg_gz = svg_store.put(cache_key, generate_biwheel_svg(chart1, chart2, aspects_data, lang))
+    return cache_key, svg_gz
+
+def svg_response(svg_gz, etag):
+    """返回SVG响应，客户端支持gzip时直接发送预压缩字节"""
+    if 'gzip' in request.accept_encodings:
+        response = Response(svg_gz, mimetype='image/svg+xml')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(gzip.decompress(svg_gz), mimetype='image/svg+xml')
+    response.set_etag(etag, weak=True)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
 
 def get_planet_sign(planet, lang='en'):
     # 返回行星的基本信息，根据语言选择
@@ -185,12 +300,54 @@ def safe_get_planet(chart, planet_id, planet_name, lang='en'):
         return info
     except Exception as e:
         error_msg = f"Cannot get planet {planet_id}: {str(e)}"
-        print(error_msg)
+        logger.warning(error_msg)
         if lang == 'zh':
             return {'错误': error_msg}
         else:
             return {'error': error_msg}
 
+@timed_stage('aspects')
+def chart_aspects(chart, planet_definitions, lang='en'):
+    """计算planet_definitions中行星两两之间的主要相位，返回接口使用的相位列表"""
+    aspects_list = []
+    try:
+        planet_ids = [item[0] for item in planet_definitions]
+    
+        for i, p1_id in enumerate(planet_ids):
+            for j, p2_id in enumerate(planet_ids):
+                if i < j:  # 避免重复计算
+                    try:
+                        aspect = aspects.getAspect(chart.get(p1_id), chart.get(p2_id), const.MAJOR_ASPECTS)
+                        aspect_type = aspect.type if aspect else -1  # 如果没有相位，设为-1
+                        orb = aspect.orb if aspect else 0
+                    
+                        if lang == 'zh':
+                            # 中文版
+                            aspect_info = {
+                                '行星1': planet_definitions[i][1],
+                                '行星2': planet_definitions[j][1],
+                                '类型': aspect_type,
+                                '相位名称': ASPECT_TYPES_CN.get(aspect_type, f"{aspect_type}°"),
+                                '误差': round(orb, 2)
+                            }
+                        else:
+                            # 英文版
+                            aspect_info = {
+                                'planet1': planet_definitions[i][1],
+                                'planet2': planet_definitions[j][1],
+                                'type': aspect_type,
+                                'type_name': ASPECT_TYPES.get(aspect_type, f"{aspect_type}°"),
+                                'orb': round(orb, 2)
+                            }
+                        aspects_list.append(aspect_info)
+                    except Exception as e:
+                        error_msg = f"Aspect calculation error ({p1_id}-{p2_id}): {str(e)}"
+                        logger.warning(error_msg)
+    except Exception as e:
+        error_msg = f"Main aspect loop error: {str(e)}"
+        logger.warning(error_msg)
+    return aspects_list
+
 @app.route('/api/calculate', methods=['POST'])
 def calculate():
     try:
@@ -202,17 +359,17 @@ def calculate():
         lang = data.get('language', 'en')  # 默认使用英文
         
         # 添加调试信息，检查原始语言参数
-        print(f"Debug - Original language parameter: {lang}")
+        logger.debug("Original language parameter: %s", lang)
         
         # 如果语言是中文，使用'zh'
         if lang.lower() in ['zh', 'cn', 'chinese', 'zh-cn', 'zhcn']:
             lang = 'zh'
-            print("Debug - Language set to 'zh'")
+            logger.debug("Language set to 'zh'")
         else:
             lang = 'en'  # 其他情况默认使用英文
-            print("Debug - Language set to 'en'")
+            logger.debug("Language set to 'en'")
 
-        print(f"Debug - Input data: date={date}, time={time}, lat={lat}, lon={lon}, lang={lang}")
+        logger.debug("Input data", extra={'date': date, 'time': time, 'lat': lat, 'lon': lon, 'lang': lang})
 
         # 计算星盘
         chart = calculate_chart(date, time, lat, lon)
@@ -237,50 +394,14 @@ def calculate():
             planets.append(planet_info)
 
         # 计算相位
-        aspects_list = []
-        try:
-            planet_ids = [item[0] for item in planet_definitions]
-            
-            for i, p1_id in enumerate(planet_ids):
-                for j, p2_id in enumerate(planet_ids):
-                    if i < j:  # 避免重复计算
-                        try:
-                            aspect = aspects.getAspect(chart.get(p1_id), chart.get(p2_id), const.MAJOR_ASPECTS)
-                            aspect_type = aspect.type if aspect else -1  # 如果没有相位，设为-1
-                            orb = aspect.orb if aspect else 0
-                            
-                            if lang == 'zh':
-                                # 中文版
-                                aspect_info = {
-                                    '行星1': planet_definitions[i][1],
-                                    '行星2': planet_definitions[j][1],
-                                    '类型': aspect_type,
-                                    '相位名称': ASPECT_TYPES_CN.get(aspect_type, f"{aspect_type}°"),
-                                    '误差': round(orb, 2)
-                                }
-                            else:
-                                # 英文版
-                                aspect_info = {
-                                    'planet1': planet_definitions[i][1],
-                                    'planet2': planet_definitions[j][1],
-                                    'type': aspect_type,
-                                    'type_name': ASPECT_TYPES.get(aspect_type, f"{aspect_type}°"),
-                                    'orb': round(orb, 2)
-                                }
-                            aspects_list.append(aspect_info)
-                        except Exception as e:
-                            error_msg = f"Aspect calculation error ({p1_id}-{p2_id}): {str(e)}"
-                            print(error_msg)
-        except Exception as e:
-            error_msg = f"Main aspect loop error: {str(e)}"
-            print(error_msg)
+        aspects_list = chart_aspects(chart, planet_definitions, lang)
 
         # 添加调试信息，检查最终语言设置
-        print(f"Debug - Final language before response: {lang}")
+        logger.debug("Final language before response: %s", lang)
         
         # 根据语言返回结果
         if lang == 'zh':
-            print("Debug - Returning Chinese response")
+            logger.debug("Returning Chinese response")
             response = {
                 '成功': True,
                 '日期': date,
@@ -292,7 +413,7 @@ def calculate():
             }
             return jsonify(response)
         else:
-            print("Debug - Returning English response")
+            logger.debug("Returning English response")
             response = {
                 'success': True,
                 'date': date,
@@ -306,7 +427,7 @@ def calculate():
 
     except Exception as e:
         error_msg = str(e)
-        print(f"Debug - API error: {error_msg}")
+        logger.warning("API error: %s", error_msg)
         
         if lang == 'zh':
             return jsonify({
@@ -329,7 +450,7 @@ def calculate_zh():
         lat = float(data.get('latitude'))
         lon = float(data.get('longitude'))
         
-        print(f"Debug - 中文API: date={date}, time={time}, lat={lat}, lon={lon}")
+        logger.debug("中文API输入", extra={'date': date, 'time': time, 'lat': lat, 'lon': lon})
 
         # 计算星盘
         chart = calculate_chart(date, time, lat, lon)
@@ -354,36 +475,10 @@ def calculate_zh():
             planets.append(planet_info)
 
         # 计算相位
-        aspects_list = []
-        try:
-            planet_ids = [item[0] for item in planet_definitions]
-            
-            for i, p1_id in enumerate(planet_ids):
-                for j, p2_id in enumerate(planet_ids):
-                    if i < j:  # 避免重复计算
-                        try:
-                            aspect = aspects.getAspect(chart.get(p1_id), chart.get(p2_id), const.MAJOR_ASPECTS)
-                            aspect_type = aspect.type if aspect else -1  # 如果没有相位，设为-1
-                            orb = aspect.orb if aspect else 0
-                            
-                            # 中文版
-                            aspect_info = {
-                                '行星1': planet_definitions[i][1],
-                                '行星2': planet_definitions[j][1],
-                                '类型': aspect_type,
-                                '相位名称': ASPECT_TYPES_CN.get(aspect_type, f"{aspect_type}°"),
-                                '误差': round(orb, 2)
-                            }
-                            aspects_list.append(aspect_info)
-                        except Exception as e:
-                            error_msg = f"相位计算错误 ({p1_id}-{p2_id}): {str(e)}"
-                            print(error_msg)
-        except Exception as e:
-            error_msg = f"相位主循环错误: {str(e)}"
-            print(error_msg)
+        aspects_list = chart_aspects(chart, planet_definitions, 'zh')
 
         # 返回中文结果
-        print("Debug - 返回中文响应")
+        logger.debug("返回中文响应")
         response = {
             '成功': True,
             '日期': date,
@@ -397,7 +492,7 @@ def calculate_zh():
 
     except Exception as e:
         error_msg = str(e)
-        print(f"Debug - API错误: {error_msg}")
+        logger.warning("API错误: %s", error_msg)
         
         return jsonify({
             '成功': False,
@@ -478,21 +573,96 @@ def index():
                 'user2_name': 'name (optional)',
                 'language': 'en (default) or zh'
             },
-            '返回': '两个星盘的合盘分析结果'
+            '返回': '两个星盘的合盘分析结果（include_chart为true时附带双轮图）'
+        },
+        '合盘双轮图': {
+            '方法': 'POST',
+            '地址': '/api/compare_svg',
+            '请求体': '与 /api/compare 相同',
+            '返回': 'SVG格式的合盘双轮图'
+        },
+        '组合盘': {
+            '方法': 'POST',
+            '地址': '/api/composite',
+            '请求体': '与 /api/compare 相同，可选 chart_type（composite/davison/both）和 include_chart',
+            '返回': '组合盘（中点盘）和/或时空中点盘的行星、相位及可选SVG'
+        },
+        '关系行运时间线': {
+            '方法': 'POST',
+            '地址': '/api/relationship/timeline',
+            '请求体': '与 /api/compare 相同，另加 start_date、end_date（最多366天），可选 orb（默认1度）和 include_moon',
+            '返回': 'NDJSON，按时间顺序每行一个行运相位时段（start、exact、end）'
+        },
+        '行运事件': {
+            '方法': 'POST',
+            '地址': '/api/transits/events',
+            '请求体': 'start_date、end_date（最多366天），可选 types（aspect/ingress/station）、objects，以及出生信息（用于对本命行星的相位）',
+            '返回': '按时间顺序的精确事件（精确到分钟）：相位、换座、停滞'
+        },
+        '换座和停滞日历': {
+            '方法': 'GET',
+            '地址': '/api/calendar/ingresses?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD',
+            '参数': '可选 objects、types（ingress/station，逗号分隔）和 language',
+            '返回': '该时间段内所有天体的换座和停滞时刻（按年预计算）'
+        },
+        '月亮空亡': {
+            '方法': 'GET',
+            '地址': '/api/calendar/void_of_course?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD',
+            '参数': '可选 language',
+            '返回': '与该时间段重叠的月亮空亡时段（最后一个主要相位到下一次换座）'
+        },
+        '择时搜索': {
+            '方法': 'POST',
+            '地址': '/api/electional/search',
+            '请求体': 'start_date、end_date（最多366天）、query（条件名列表或 all/any/not 表达式），可选 min_duration_minutes',
+            '返回': '满足条件的时间段（start、end、duration_minutes）'
+        },
+        '批量每日运势': {
+            '方法': 'POST',
+            '地址': '/api/daily/batch',
+            '请求体': {
+                'target_date': 'YYYY-MM-DD (optional)',
+                'target_timezone': 'timezone (optional)',
+                'records': '[{id, birth_date, birth_time, birth_latitude, birth_longitude}, ...]'
+            },
+            '返回': 'NDJSON，每行一个用户的每日运势（按输入顺序）'
+        },
+        '日期范围运势': {
+            '方法': 'POST',
+            '地址': '/api/daily/range',
+            '请求体': '与 /api/daily 相同，target_date 换成 start_date 和 end_date（最多366天）',
+            '返回': 'NDJSON，每行一天的每日运势（按日期顺序）'
+        },
+        '月历': {
+            '方法': 'POST',
+            '地址': '/api/daily/calendar',
+            '请求体': '出生信息加 month（YYYY-MM），可选 target_timezone、language',
+            '返回': '按列排列的整月数据：dates、fortune_score、lunar_phase_name、lunar_illumination_percent、moon_sign'
+        },
+        '最佳日期': {
+            '方法': 'POST',
+            '地址': '/api/daily/best_days',
+            '请求体': '出生信息加 start_date、end_date（最多366天），可选 area（overall/career/love/health/growth）和 top_k',
+            '返回': '该时间段内评分最高的若干天及主要相位'
+        },
+        '订阅用户': {
+            '方法': 'POST',
+            '地址': '/api/subscribers',
+            '请求体': '与 /api/daily 相同，另加 subscriber_id（不含 target_date）',
+            '返回': '保存结果；次日运势由 cli pregenerate 任务预生成'
+        },
+        '订阅用户每日运势': {
+            '方法': 'GET',
+            '地址': '/api/subscribers/<subscriber_id>/daily?date=YYYY-MM-DD',
+            '返回': '预生成的每日运势（未命中时实时计算）'
         }
     })
 
-def generate_chart_svg(chart, lang='en'):
-    # 创建SVG画布 - 修改为透明背景
-    dwg = svgwrite.Drawing(profile='tiny', size=('720px', '720px'))
-    
+def compute_chart_layout(chart, lang='en'):
+    """计算星盘图布局：行星坐标（已避免重叠）和相位线，标准和精简两种SVG输出共用"""
     # 定义中心点和半径
     center_x, center_y = 360, 360  # 将中心点调整为画布中心
     inner_circle_radius = 216  # 内圈半径
-    zodiac_inner_radius = 216  # 星座圈内半径
-    zodiac_outer_radius = 261  # 星座圈外半径
-    house_inner_radius = 261   # 宫位圈内半径
-    house_outer_radius = 288   # 宫位圈外半径
     
     # 获取上升点的度数
     asc = chart.get(const.ASC)
@@ -532,7 +702,7 @@ def generate_chart_svg(chart, lang='en'):
                 'rad': planet_rad
             })
         except Exception as e:
-            print(f"Error collecting planet {planet_id}: {e}")
+            logger.warning("Error collecting planet %s: %s", planet_id, e)
     
     # 检测并调整重叠的行星
     def distance(p1, p2):
@@ -593,21 +763,26 @@ def generate_chart_svg(chart, lang='en'):
                         if aspect_type == 0:  # 合相
                             color = "#0000FF"  # 蓝色
                             dash = None
+                            kind = 'conjunction'
                         elif aspect_type == 60 or aspect_type == 120:  # 六分相或三分相
                             color = "#00AA00"  # 绿色
                             dash = None
+                            kind = 'harmonious'
                         elif aspect_type == 90 or aspect_type == 180:  # 四分相或对分相
                             color = "#FF0000"  # 红色
                             dash = "5,5"
+                            kind = 'challenging'
                         else:
                             color = "#777777"  # 灰色
                             dash = None
+                            kind = 'other'
                             
                         aspect_lines.append({
                             'start': (p1['x'], p1['y']),
                             'end': (p2['x'], p2['y']),
                             'color': color,
-                            'dash': dash
+                            'dash': dash,
+                            'kind': kind
                         })
                     
                     # 为了增加更多线条，添加次要相位计算
@@ -631,10 +806,36 @@ def generate_chart_svg(chart, lang='en'):
                                 'start': (p1['x'], p1['y']),
                                 'end': (p2['x'], p2['y']),
                                 'color': color,
-                                'dash': dash
+                                'dash': dash,
+                                'kind': 'minor'
                             })
                 except Exception as e:
-                    print(f"Error calculating aspect between {p1['name']} and {p2['name']}: {e}")
+                    logger.warning("Error calculating aspect between %s and %s: %s", p1['name'], p2['name'], e)
+    
+    return {
+        'asc_longitude': asc_longitude,
+        'planets': planets_data,
+        'aspect_lines': aspect_lines
+    }
+
+@timed_stage('svg_render')
+def generate_chart_svg(chart, lang='en'):
+    # 创建SVG画布 - 修改为透明背景
+    dwg = svgwrite.Drawing(profile='tiny', size=('720px', '720px'))
+    
+    # 定义中心点和半径
+    center_x, center_y = 360, 360  # 将中心点调整为画布中心
+    inner_circle_radius = 216  # 内圈半径
+    zodiac_inner_radius = 216  # 星座圈内半径
+    zodiac_outer_radius = 261  # 星座圈外半径
+    house_inner_radius = 261   # 宫位圈内半径
+    house_outer_radius = 288   # 宫位圈外半径
+    
+    # 计算行星位置和相位线
+    layout = compute_chart_layout(chart, lang)
+    asc_longitude = layout['asc_longitude']
+    planets_data = layout['planets']
+    aspect_lines = layout['aspect_lines']
     
     # 星座背景颜色
     # 元素顺序：火、土、风、水
@@ -879,13 +1080,299 @@ def generate_chart_svg(chart, lang='en'):
                           fill=color, font_size=font_size,
                           text_anchor='middle', font_weight='bold'))
         except Exception as e:
-            print(f"Error plotting planet {planet['name']}: {e}")
+            logger.warning("Error plotting planet %s: %s", planet['name'], e)
     
     # 行星标签部分已移除 - 根据用户要求，不再显示最外围的行星度数标签
     
     # 返回SVG字符串
     return dwg.tostring()
 
+# 精简模式的共享CSS：相位线等样式只定义一次，元素通过class引用
+COMPACT_SVG_CSS = (
+    ".sec{stroke:#000;stroke-width:.5}"
+    ".fire{fill:#ffccaa}.earth{fill:#d2b48c}.air{fill:#bbddff}.water{fill:#aadddd}.hs{fill:#fff}"
+    ".hd{stroke:#000;stroke-width:.7}.zd{stroke:#000;stroke-width:.5}.rl{stroke:#777;stroke-width:.5}"
+    ".al{stroke-width:1.2}"
+    ".conjunction{stroke:#00F}.harmonious{stroke:#0A0}.challenging{stroke:#F00;stroke-dasharray:5,5}"
+    ".minor{stroke:#C44;stroke-dasharray:3,3}.other{stroke:#777}"
+    "text{text-anchor:middle}.deg{fill:#777;font-size:8px}.sn{font-size:9px}.sns{font-size:7px}"
+    ".hn{font-size:11px;font-weight:bold}.hf{fill:#F33}.he{fill:#A62}.ha{fill:#36F}.hw{fill:#3AA}"
+    ".pc{fill:#fff;stroke:#000}.pg{font-size:12px;font-weight:bold}.pa{font-size:8px;font-weight:bold}"
+)
+
+@timed_stage('svg_render')
+def generate_compact_chart_svg(chart, lang='en', precision=1):
+    """
+    精简模式星盘图，布局与 generate_chart_svg 相同，但体积小得多：
+    - 行星和星座符号以<symbol>定义一次，通过<use>引用
+    - 12个星座/宫位扇形共用同一个路径，通过旋转复用
+    - 坐标按precision位小数取整，相位线等样式使用共享CSS类
+    """
+    dwg = svgwrite.Drawing(profile='full', size=('720px', '720px'), debug=False)
+    
+    def num(value):
+        value = round(value, precision)
+        return int(value) if value == int(value) else value
+    
+    def point(radius, longitude):
+        rad = math.radians(90 - longitude)
+        return (num(center_x + radius * math.cos(rad)), num(center_y - radius * math.sin(rad)))
+    
+    def sector_path(r_inner, r_outer):
+        # 0°到30°的扇形，其他扇形通过rotate复用
+        x1, y1 = point(r_inner, 0)
+        x2, y2 = point(r_outer, 0)
+        x3, y3 = point(r_outer, 30)
+        x4, y4 = point(r_inner, 30)
+        return (f"M{x1},{y1}L{x2},{y2}A{r_outer},{r_outer} 0 0,1 {x3},{y3}"
+                f"L{x4},{y4}A{r_inner},{r_inner} 0 0,0 {x1},{y1}Z")
+    
+    def rotated_use(href, angle, **extra):
+        use = dwg.use(href, **extra)
+        use['transform'] = f"rotate({num(angle)},{center_x},{center_y})"
+        return use
+    
+    # 定义中心点和半径（与标准模式一致）
+    center_x, center_y = 360, 360
+    inner_circle_radius = 216
+    zodiac_inner_radius = 216
+    zodiac_outer_radius = 261
+    house_inner_radius = 261
+    house_outer_radius = 288
+    
+    layout = compute_chart_layout(chart, lang)
+    asc_longitude = layout['asc_longitude']
+    
+    SIGN_ELEMENTS = {
+        'Aries': 'fire', 'Leo': 'fire', 'Sagittarius': 'fire',
+        'Taurus': 'earth', 'Virgo': 'earth', 'Capricorn': 'earth',
+        'Gemini': 'air', 'Libra': 'air', 'Aquarius': 'air',
+        'Cancer': 'water', 'Scorpio': 'water', 'Pisces': 'water'
+    }
+    signs = ['Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
+             'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces']
+    house_classes = ['hf', 'he', 'ha', 'hw']  # 火、土、风、水相宫
+    
+    # 共享定义：样式、扇形、分隔线和符号
+    dwg.defs.add(dwg.style(COMPACT_SVG_CSS))
+    dwg.defs.add(dwg.path(d=sector_path(zodiac_inner_radius, zodiac_outer_radius), id='zs'))
+    dwg.defs.add(dwg.path(d=sector_path(house_inner_radius, house_outer_radius), id='hs'))
+    dwg.defs.add(dwg.line(start=point(zodiac_inner_radius, 0), end=point(house_outer_radius, 0), id='hl'))
+    dwg.defs.add(dwg.line(start=point(zodiac_inner_radius, 0), end=point(zodiac_outer_radius, 0), id='zl'))
+    dwg.defs.add(dwg.line(start=(center_x, center_y), end=point(inner_circle_radius, 0), id='rl'))
+    
+    for sign in signs:
+        symbol = dwg.symbol(id=f"s-{sign}", overflow='visible')
+        symbol.add(dwg.text(sign, class_='sns' if sign in ['Sagittarius', 'Capricorn'] else 'sn'))
+        dwg.defs.add(symbol)
+    
+    for planet in layout['planets']:
+        planet_id = planet['id']
+        color = "#000"
+        if planet_id in [const.SUN, const.MARS]:
+            color = "#F00"
+        elif planet_id in [const.MOON, const.VENUS]:
+            color = "#090"
+        elif planet_id in [const.MERCURY, const.JUPITER]:
+            color = "#00F"
+        symbol = dwg.symbol(id=f"p-{planet_id.replace(' ', '')}", overflow='visible')
+        symbol.add(dwg.circle(r=9, class_='pc'))
+        if planet_id == const.ASC:
+            symbol.add(dwg.text(PLANET_SYMBOLS.get(planet_id), insert=(0, 3), fill=color, class_='pa'))
+        else:
+            symbol.add(dwg.text(PLANET_SYMBOLS.get(planet_id, planet['name'][0]), insert=(0, 4),
+                                fill=color, class_='pg'))
+        dwg.defs.add(symbol)
+    
+    # 主要圆环
+    dwg.add(dwg.circle(center=(center_x, center_y), r=house_outer_radius, fill='none', stroke='black', stroke_width=2))
+    dwg.add(dwg.circle(center=(center_x, center_y), r=house_inner_radius, fill='none', stroke='black', stroke_width=1))
+    dwg.add(dwg.circle(center=(center_x, center_y), r=inner_circle_radius, fill='white', stroke='black', stroke_width=1))
+    
+    # 宫位扇形、分隔线和编号
+    label_radius = (house_inner_radius + house_outer_radius) / 2
+    for i in range(12):
+        house_start = (asc_longitude + i * 30) % 360
+        dwg.add(rotated_use('#hs', house_start, class_='hs sec'))
+        dwg.add(rotated_use('#hl', house_start, class_='hd'))
+        dwg.add(dwg.text(str(i + 1), insert=point(label_radius, house_start + 15),
+                         class_=f"hn {house_classes[i % 4]}"))
+    
+    # 星座扇形、分隔线和名称
+    sign_radius = (zodiac_inner_radius + zodiac_outer_radius) / 2
+    for i, sign in enumerate(signs):
+        dwg.add(rotated_use('#zl', i * 30, class_='zd'))
+        dwg.add(rotated_use('#zs', i * 30, class_=f"{SIGN_ELEMENTS[sign]} sec"))
+        dwg.add(dwg.use(f"#s-{sign}", insert=point(sign_radius, i * 30 + 15)))
+    
+    # 内圈径向线和度数标记
+    for i in range(0, 360, 30):
+        dwg.add(rotated_use('#rl', i, class_='rl'))
+        dwg.add(dwg.text(f"{i}°", insert=point(inner_circle_radius * 0.85, i), class_='deg'))
+    
+    # 相位线
+    for line in layout['aspect_lines']:
+        dwg.add(dwg.line(start=(num(line['start'][0]), num(line['start'][1])),
+                         end=(num(line['end'][0]), num(line['end'][1])),
+                         class_=f"al {line['kind']}"))
+    
+    # 行星符号
+    for planet in layout['planets']:
+        dwg.add(dwg.use(f"#p-{planet['id'].replace(' ', '')}", insert=(num(planet['x']), num(planet['y']))))
+    
+    return dwg.tostring()
+
+@timed_stage('svg_render')
+def generate_biwheel_svg(chart1, chart2, aspects_data, lang='en'):
+    """
+    生成合盘双轮图：内圈为第一个人的行星和宫位，外圈为第二个人的行星
+    aspects_data 为 get_synastry_aspects 的结果（planet1属于chart1，planet2属于chart2），
+    与合盘分析共用同一次相位计算
+    """
+    dwg = svgwrite.Drawing(profile='tiny', size=('720px', '720px'))
+    
+    # 定义中心点和半径
+    center_x, center_y = 360, 360
+    inner_circle_radius = 190  # 内圈（第一个人的行星和相位线）
+    zodiac_outer_radius = 235  # 星座圈外半径
+    house_outer_radius = 262   # 第一个人的宫位圈外半径
+    outer_ring_radius = 330    # 第二个人的行星圈外半径
+    
+    def polar(radius, longitude):
+        rad = math.radians(90 - longitude)
+        return (center_x + radius * math.cos(rad), center_y - radius * math.sin(rad))
+    
+    def ring_sector(r_inner, r_outer, start, end):
+        x1, y1 = polar(r_inner, start)
+        x2, y2 = polar(r_outer, start)
+        x3, y3 = polar(r_outer, end)
+        x4, y4 = polar(r_inner, end)
+        return (f"M {x1},{y1} L {x2},{y2} A {r_outer},{r_outer} 0 0,1 {x3},{y3} "
+                f"L {x4},{y4} A {r_inner},{r_inner} 0 0,0 {x1},{y1} Z")
+    
+    planet_ids = [const.SUN, const.MOON, const.ASC, const.VENUS, const.MARS,
+                  const.MERCURY, const.NORTH_NODE, const.JUPITER, const.SATURN]
+    
+    # 收集两个人的行星经度
+    def collect_longitudes(chart):
+        longitudes = {}
+        for planet_id in planet_ids:
+            try:
+                longitudes[planet_id] = chart.get(planet_id).lon
+            except Exception as e:
+                logger.warning("Error collecting planet %s: %s", planet_id, e)
+        return longitudes
+    
+    person1_lons = collect_longitudes(chart1)
+    person2_lons = collect_longitudes(chart2)
+    
+    # 间距过近的行星交替放在两个半径上，避免符号重叠
+    def staggered_positions(longitudes, radius, step):
+        positions = {}
+        previous_lon = None
+        staggered = False
+        for planet_id, lon in sorted(longitudes.items(), key=lambda item: item[1]):
+            if previous_lon is not None and lon - previous_lon < 7 and not staggered:
+                positions[planet_id] = polar(radius - step, lon)
+                staggered = True
+            else:
+                positions[planet_id] = polar(radius, lon)
+                staggered = False
+            previous_lon = lon
+        return positions
+    
+    person1_positions = staggered_positions(person1_lons, inner_circle_radius * 0.75, 22)
+    person2_positions = staggered_positions(person2_lons, (house_outer_radius + outer_ring_radius) / 2, 24)
+    
+    # 星座元素颜色
+    ELEMENT_COLORS = {'fire': "#ffccaa", 'earth': "#d2b48c", 'air': "#bbddff", 'water': "#aadddd"}
+    SIGN_ELEMENTS = {
+        'Aries': 'fire', 'Leo': 'fire', 'Sagittarius': 'fire',
+        'Taurus': 'earth', 'Virgo': 'earth', 'Capricorn': 'earth',
+        'Gemini': 'air', 'Libra': 'air', 'Aquarius': 'air',
+        'Cancer': 'water', 'Scorpio': 'water', 'Pisces': 'water'
+    }
+    signs = ['Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
+             'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces']
+    
+    # 第二个人的行星圈（最外层）
+    dwg.add(dwg.circle(center=(center_x, center_y), r=outer_ring_radius,
+                       fill='#f7f7f7', stroke='black', stroke_width=2))
+    
+    # 第一个人的宫位圈（以上升点为第一宫起点的等宫制）
+    asc_longitude = person1_lons.get(const.ASC, 0)
+    for i in range(12):
+        house_start = (asc_longitude + i * 30) % 360
+        dwg.add(dwg.path(d=ring_sector(zodiac_outer_radius, house_outer_radius, house_start, house_start + 30),
+                         fill='white', stroke='black', stroke_width=0.5))
+        label_x, label_y = polar((zodiac_outer_radius + house_outer_radius) / 2, house_start + 15)
+        dwg.add(dwg.text(str(i + 1), insert=(label_x, label_y + 4),
+                         fill='#333333', font_size='11px', font_weight='bold',
+                         text_anchor='middle'))
+        # 宫位分隔线贯穿外圈，方便读出第二个人的行星落宫
+        x1, y1 = polar(zodiac_outer_radius, house_start)
+        x2, y2 = polar(outer_ring_radius, house_start)
+        dwg.add(dwg.line(start=(x1, y1), end=(x2, y2), stroke='#999999', stroke_width=0.7))
+    
+    # 星座圈
+    for i, sign in enumerate(signs):
+        start_angle = i * 30
+        dwg.add(dwg.path(d=ring_sector(inner_circle_radius, zodiac_outer_radius, start_angle, start_angle + 30),
+                         fill=ELEMENT_COLORS[SIGN_ELEMENTS[sign]], stroke='black', stroke_width=0.5))
+        sign_x, sign_y = polar((inner_circle_radius + zodiac_outer_radius) / 2, start_angle + 15)
+        font_size = '7px' if sign in ['Sagittarius', 'Capricorn'] else '9px'
+        dwg.add(dwg.text(sign if lang == 'en' else SIGN_NAMES.get(sign, sign), insert=(sign_x, sign_y),
+                         fill='black', font_size=font_size, text_anchor='middle'))
+    
+    # 内圈
+    dwg.add(dwg.circle(center=(center_x, center_y), r=inner_circle_radius,
+                       fill='white', stroke='black', stroke_width=1))
+    
+    # 跨盘相位线：从第一个人的行星连到第二个人的行星在内圈边缘的投影点
+    for aspect in aspects_data:
+        p1_id = aspect.get('planet1')
+        p2_id = aspect.get('planet2')
+        if p1_id not in person1_positions or p2_id not in person2_lons:
+            continue
+        aspect_name = aspect.get('aspect')
+        if aspect_name == 'conjunction':
+            color, dash = "#0000FF", None
+        elif aspect_name in ('trine', 'sextile'):
+            color, dash = "#00AA00", None
+        elif aspect_name in ('square', 'opposition'):
+            color, dash = "#FF0000", "5,5"
+        else:
+            color, dash = "#777777", None
+        
+        end = polar(inner_circle_radius, person2_lons[p2_id])
+        if dash:
+            dwg.add(dwg.line(start=person1_positions[p1_id], end=end, stroke=color,
+                             stroke_width=1.2, stroke_dasharray=dash))
+        else:
+            dwg.add(dwg.line(start=person1_positions[p1_id], end=end, stroke=color, stroke_width=1.2))
+    
+    # 第二个人的行星在内圈边缘的刻度
+    for lon in person2_lons.values():
+        x1, y1 = polar(inner_circle_radius, lon)
+        x2, y2 = polar(inner_circle_radius - 8, lon)
+        dwg.add(dwg.line(start=(x1, y1), end=(x2, y2), stroke='#7744AA', stroke_width=1.5))
+    
+    # 绘制行星符号：第一个人用黑色边框，第二个人用紫色边框
+    for positions, stroke_color in ((person1_positions, 'black'), (person2_positions, '#7744AA')):
+        for planet_id, (planet_x, planet_y) in positions.items():
+            dwg.add(dwg.circle(center=(planet_x, planet_y), r=9,
+                               fill='white', stroke=stroke_color, stroke_width=1))
+            symbol = PLANET_SYMBOLS.get(planet_id, planet_id[0])
+            if planet_id == const.ASC:
+                font_size, y_offset = '8px', 3
+            else:
+                font_size, y_offset = '12px', 4
+            dwg.add(dwg.text(symbol, insert=(planet_x, planet_y + y_offset),
+                             fill=stroke_color, font_size=font_size,
+                             text_anchor='middle', font_weight='bold'))
+    
+    return dwg.tostring()
+
 @app.route('/api/chart_svg', methods=['POST'])
 def chart_svg():
     # 在函数开始就设置默认值
@@ -907,18 +1394,23 @@ def chart_svg():
         else:
             lang = 'en'  # 其他情况默认使用英文
         
-        # 计算星盘
-        chart = calculate_chart(date, time, lat, lon)
+        # SVG内容只取决于星盘指纹、语言和渲染选项，客户端已有相同版本时直接返回304
+        svg_options = get_svg_options(data)
+        cache_key = svg_store.key(chart_fingerprint(date, time, lat, lon), lang, svg_options)
+        if request.if_none_match.contains_weak(cache_key):
+            response = Response(status=304)
+            response.set_etag(cache_key, weak=True)
+            return response
         
-        # 生成SVG
-        svg_content = generate_chart_svg(chart, lang)
+        # 读取缓存或计算星盘并生成SVG
+        cache_key, svg_gz = get_chart_svg_gz(date, time, lat, lon, lang, options=svg_options)
         
         # 返回SVG响应
-        return Response(svg_content, mimetype='image/svg+xml')
+        return svg_response(svg_gz, cache_key)
         
     except Exception as e:
         error_msg = str(e)
-        print(f"Debug - API error: {error_msg}")
+        logger.warning("API error: %s", error_msg)
         
         if lang == 'zh':
             return jsonify({
@@ -960,8 +1452,15 @@ def combined_data():
         # 计算星盘
         chart = calculate_chart(date, time, lat, lon)
         
-        # 生成SVG
-        svg_content = generate_chart_svg(chart, lang)
+        # 生成SVG（优先使用缓存）
+        _, svg_gz = get_chart_svg_gz(date, time, lat, lon, lang, chart, get_svg_options(data))
+        
+        # svg_encoding为gzip时直接嵌入预压缩字节（base64），减小JSON体积
+        svg_gzip_embedded = str(data.get('svg_encoding', '')).lower() == 'gzip'
+        if svg_gzip_embedded:
+            svg_content = base64.b64encode(svg_gz).decode('ascii')
+        else:
+            svg_content = gzip.decompress(svg_gz).decode('utf-8')
         
         # 获取行星和相位数据
         # 定义要获取的行星
@@ -984,43 +1483,7 @@ def combined_data():
             planets.append(planet_info)
 
         # 计算相位
-        aspects_list = []
-        try:
-            planet_ids = [item[0] for item in planet_definitions]
-            
-            for i, p1_id in enumerate(planet_ids):
-                for j, p2_id in enumerate(planet_ids):
-                    if i < j:  # 避免重复计算
-                        try:
-                            aspect = aspects.getAspect(chart.get(p1_id), chart.get(p2_id), const.MAJOR_ASPECTS)
-                            aspect_type = aspect.type if aspect else -1  # 如果没有相位，设为-1
-                            orb = aspect.orb if aspect else 0
-                            
-                            if lang == 'zh':
-                                # 中文版
-                                aspect_info = {
-                                    '行星1': planet_definitions[i][1],
-                                    '行星2': planet_definitions[j][1],
-                                    '类型': aspect_type,
-                                    '相位名称': ASPECT_TYPES_CN.get(aspect_type, f"{aspect_type}°"),
-                                    '误差': round(orb, 2)
-                                }
-                            else:
-                                # 英文版
-                                aspect_info = {
-                                    'planet1': planet_definitions[i][1],
-                                    'planet2': planet_definitions[j][1],
-                                    'type': aspect_type,
-                                    'type_name': ASPECT_TYPES.get(aspect_type, f"{aspect_type}°"),
-                                    'orb': round(orb, 2)
-                                }
-                            aspects_list.append(aspect_info)
-                        except Exception as e:
-                            error_msg = f"Aspect calculation error ({p1_id}-{p2_id}): {str(e)}"
-                            print(error_msg)
-        except Exception as e:
-            error_msg = f"Main aspect loop error: {str(e)}"
-            print(error_msg)
+        aspects_list = chart_aspects(chart, planet_definitions, lang)
         
         # 准备返回数据
         if lang == 'zh':
@@ -1034,6 +1497,8 @@ def combined_data():
                 '相位': aspects_list,
                 '星盘': svg_content
             }
+            if svg_gzip_embedded:
+                response_data['星盘编码'] = 'gzip+base64'
         else:
             response_data = {
                 'success': True,
@@ -1045,12 +1510,14 @@ def combined_data():
                 'aspects': aspects_list,
                 'chart': svg_content
             }
+            if svg_gzip_embedded:
+                response_data['chart_encoding'] = 'gzip+base64'
         
         return jsonify(response_data)
         
     except Exception as e:
         error_msg = str(e)
-        print(f"Debug - API error: {error_msg}")
+        logger.warning("API error: %s", error_msg)
         
         if lang == 'zh':
             return jsonify({
@@ -1108,18 +1575,23 @@ def compare_charts():
             }), 400
         
         # 输出调试信息
-        print(f"Debug - User1: {user1_date} {user1_time}")
-        print(f"Debug - User2: {user2_date} {user2_time}")
+        logger.debug("User1: %s %s, User2: %s %s", user1_date, user1_time, user2_date, user2_time)
         
         # 计算两个星盘
         chart1 = calculate_chart(user1_date, user1_time, user1_lat, user1_lon)
         chart2 = calculate_chart(user2_date, user2_time, user2_lat, user2_lon)
         
+        # 计算跨盘相位（合盘分析和双轮图共用同一次计算）
+        with stage_timer('aspects'):
+            aspects_data = get_synastry_aspects(chart1, chart2)
+        
         # 调用synastry_service进行合盘分析
-        result = get_synastry_analysis(chart1, chart2, lang, user1_name, user2_name)
+        with stage_timer('synastry_scoring'):
+            result = get_synastry_analysis(chart1, chart2, lang, user1_name, user2_name, aspects_data)
         
         # 调试输出
-        print(f"DEBUG - Before modification: compatibility_score={result.get('compatibility_score')}, relationship_type_score={result.get('relationship_type_score')}")
+        logger.debug("Before modification: compatibility_score=%s, relationship_type_score=%s",
+                     result.get('compatibility_score'), result.get('relationship_type_score'))
         
         # 修改compatibility_score为五个维度分数的平均值
         if "harmony_score" in result and "intimacy_score" in result and "passion_score" in result and "growth_score" in result and "karmic_score" in result:
@@ -1137,7 +1609,7 @@ def compare_charts():
             result["compatibility_score"] = max_score
             
             # 打印计算过程
-            print(f"DEBUG - Calculation: max({harmony}, {intimacy}, {passion}, {growth}, {karmic}) = {max_score}")
+            logger.debug("Calculation: max(%s, %s, %s, %s, %s) = %s", harmony, intimacy, passion, growth, karmic, max_score)
             
             # 根据更新后的分数调整兼容性级别
             if result["compatibility_score"] >= 90:
@@ -1160,7 +1632,14 @@ def compare_charts():
                 result["compatibility_level"] = "very difficult"
         
         # 调试输出
-        print(f"DEBUG - After modification: compatibility_score={result.get('compatibility_score')}")
+        logger.debug("After modification: compatibility_score=%s", result.get('compatibility_score'))
+        
+        # 可选：同时返回合盘双轮图
+        if data.get('include_chart'):
+            fingerprint = biwheel_fingerprint(user1_date, user1_time, user1_lat, user1_lon,
+                                              user2_date, user2_time, user2_lat, user2_lon)
+            _, svg_gz = get_biwheel_svg_gz(fingerprint, lang, chart1, chart2, aspects_data)
+            result["chart"] = gzip.decompress(svg_gz).decode('utf-8')
         
         # 增加一个临时标志帮助排查问题
         return jsonify({
@@ -1170,59 +1649,934 @@ def compare_charts():
         
     except Exception as e:
         error_msg = str(e)
-        print(f"Debug - API error: {error_msg}")
+        logger.warning("API error: %s", error_msg)
         
         return jsonify({
             "status": "error",
             "error": error_msg
         }), 400
 
-# Initialize daily fortune calculator
-daily_fortune_calc = DailyFortuneCalculator()
-
-@app.route('/api/daily', methods=['POST'])
-def daily_fortune():
-    """Calculate daily fortune based on birth information"""
+@app.route('/api/compare_svg', methods=['POST'])
+def compare_svg():
+    """生成合盘双轮图：第二个人的行星位于外圈，叠加在第一个人的宫位之上"""
+    lang = 'en'  # 默认使用英文
     try:
         data = request.get_json()
         
-        # Required fields
-        birth_date = data.get('birth_date')
-        birth_time = data.get('birth_time')
-        birth_lat = float(data.get('birth_latitude'))
-        birth_lon = float(data.get('birth_longitude'))
-        
-        # Optional fields
-        target_date = data.get('target_date')  # If not provided, uses today
-        target_timezone = data.get('target_timezone', 'UTC')
-        
-        # Validate required fields
-        if not all([birth_date, birth_time, birth_lat is not None, birth_lon is not None]):
+        # 验证必要的输入
+        required_fields = [
+            'user1_date', 'user1_time', 'user1_lat', 'user1_lon',
+            'user2_date', 'user2_time', 'user2_lat', 'user2_lon'
+        ]
+        missing_fields = [field for field in required_fields if data.get(field) is None]
+        if missing_fields:
             return jsonify({
-                'success': False,
-                'error': 'Missing required fields: birth_date, birth_time, birth_latitude, birth_longitude'
+                "status": "error",
+                "error": f"Missing required fields: {', '.join(missing_fields)}"
             }), 400
         
-        # Calculate daily fortune
-        result = daily_fortune_calc.calculate_daily_fortune(
-            birth_date=birth_date,
-            birth_time=birth_time,
-            birth_lat=birth_lat,
-            birth_lon=birth_lon,
-            target_date=target_date,
-            target_timezone=target_timezone
-        )
+        user1_date = data.get('user1_date')
+        user1_time = data.get('user1_time')
+        user1_lat = float(data.get('user1_lat'))
+        user1_lon = float(data.get('user1_lon'))
+        user2_date = data.get('user2_date')
+        user2_time = data.get('user2_time')
+        user2_lat = float(data.get('user2_lat'))
+        user2_lon = float(data.get('user2_lon'))
         
-        return jsonify(result)
+        # 如果语言是中文，使用'zh'
+        lang = data.get('language', 'en')
+        if lang and lang.lower() in ['zh', 'cn', 'chinese', 'zh-cn', 'zhcn']:
+            lang = 'zh'
+        else:
+            lang = 'en'
+        
+        fingerprint = biwheel_fingerprint(user1_date, user1_time, user1_lat, user1_lon,
+                                          user2_date, user2_time, user2_lat, user2_lon)
+        cache_key = svg_store.key(fingerprint, lang)
+        if request.if_none_match.contains_weak(cache_key):
+            response = Response(status=304)
+            response.set_etag(cache_key, weak=True)
+            return response
+        
+        svg_gz = svg_store.get(cache_key)
+        if svg_gz is None:
+            chart1 = calculate_chart(user1_date, user1_time, user1_lat, user1_lon)
+            chart2 = calculate_chart(user2_date, user2_time, user2_lat, user2_lon)
+            with stage_timer('aspects'):
+                aspects_data = get_synastry_aspects(chart1, chart2)
+            svg_gz = svg_store.put(cache_key, generate_biwheel_svg(chart1, chart2, aspects_data, lang))
+        
+        return svg_response(svg_gz, cache_key)
         
     except Exception as e:
         error_msg = str(e)
-        print(f"Daily Fortune API error: {error_msg}")
+        logger.warning("API error: %s", error_msg)
         
         return jsonify({
-            'success': False,
-            'error': error_msg
+            "status": "error",
+            "error": error_msg
         }), 400
 
+# 关系盘中返回的行星和轴点
+RELATIONSHIP_CHART_OBJECTS = [
+    const.SUN, const.MOON, const.ASC, const.MERCURY, const.VENUS, const.MARS,
+    const.JUPITER, const.SATURN, const.URANUS, const.NEPTUNE, const.PLUTO, const.NORTH_NODE
+]
+
+def relationship_chart_data(chart, lang='en'):
+    """关系盘（组合盘或时空中点盘）的行星位置和盘内主要相位"""
+    planets = []
+    for planet_id in RELATIONSHIP_CHART_OBJECTS:
+        planet_info = safe_get_planet(chart, planet_id, planet_id, lang)
+        planets.append(planet_info)
+    
+    with stage_timer('aspects'):
+        aspects_list = []
+        for i, p1_id in enumerate(RELATIONSHIP_CHART_OBJECTS):
+            for p2_id in RELATIONSHIP_CHART_OBJECTS[i + 1:]:
+                aspect = aspects.getAspect(chart.get(p1_id), chart.get(p2_id), const.MAJOR_ASPECTS)
+                if aspect is None or aspect.type == const.NO_ASPECT:
+                    continue
+                aspects_list.append({
+                    'planet1': PLANET_NAMES.get(p1_id, p1_id) if lang == 'zh' else p1_id,
+                    'planet2': PLANET_NAMES.get(p2_id, p2_id) if lang == 'zh' else p2_id,
+                    'type': aspect.type,
+                    'type_name': ASPECT_TYPES_CN.get(aspect.type) if lang == 'zh' else ASPECT_TYPES.get(aspect.type),
+                    'orb': round(aspect.orb, 2)
+                })
+    return {'planets': planets, 'aspects': aspects_list}
+
+@app.route('/api/composite', methods=['POST'])
+def composite_charts():
+    """
+    计算两人的组合盘（行星中点）和时空中点盘（出生时间、地点的中点）
+    chart_type: composite、davison 或 both（默认）；include_chart为true时附带SVG星盘
+    """
+    try:
+        data = request.get_json()
+        
+        # 验证必要的输入
+        required_fields = [
+            'user1_date', 'user1_time', 'user1_lat', 'user1_lon',
+            'user2_date', 'user2_time', 'user2_lat', 'user2_lon'
+        ]
+        missing_fields = [field for field in required_fields if data.get(field) is None]
+        if missing_fields:
+            return jsonify({
+                "status": "error",
+                "error": f"Missing required fields: {', '.join(missing_fields)}"
+            }), 400
+        
+        user1 = (data.get('user1_date'), data.get('user1_time'), float(data.get('user1_lat')), float(data.get('user1_lon')))
+        user2 = (data.get('user2_date'), data.get('user2_time'), float(data.get('user2_lat')), float(data.get('user2_lon')))
+        
+        chart_type = str(data.get('chart_type', 'both')).lower()
+        if chart_type not in ('composite', 'davison', 'both'):
+            return jsonify({
+                "status": "error",
+                "error": "chart_type must be composite, davison or both"
+            }), 400
+        
+        # 如果语言是中文，使用'zh'
+        lang = data.get('language', 'en')
+        if lang and lang.lower() in ['zh', 'cn', 'chinese', 'zh-cn', 'zhcn']:
+            lang = 'zh'
+        else:
+            lang = 'en'
+        
+        chart1 = calculate_chart(*user1)
+        chart2 = calculate_chart(*user2)
+        
+        charts = {}
+        if chart_type in ('composite', 'both'):
+            charts['composite'] = composite_chart(chart1, chart2)
+        if chart_type in ('davison', 'both'):
+            with stage_timer('chart_build'):
+                charts['davison'] = davison_chart(chart1, chart2)
+        
+        result = {'success': True}
+        for name, chart in charts.items():
+            result[name] = relationship_chart_data(chart, lang)
+            if data.get('include_chart'):
+                # 两种关系盘都只由两张本命盘决定，SVG按输入对缓存
+                fingerprint = f"{name}|" + biwheel_fingerprint(*user1, *user2)
+                cache_key = svg_store.key(fingerprint, lang)
+                svg_gz = svg_store.get(cache_key)
+                if svg_gz is None:
+                    svg_gz = svg_store.put(cache_key, generate_chart_svg(chart, lang))
+                result[name]['chart'] = gzip.decompress(svg_gz).decode('utf-8')
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.warning("API error: %s", error_msg)
+        
+        return jsonify({
+            "status": "error",
+            "error": error_msg
+        }), 400
+
+# 关系行运时间线：行运天体、相位对象和时间范围上限
+RELATIONSHIP_TRANSITS = [
+    const.SUN, const.MERCURY, const.VENUS, const.MARS, const.JUPITER,
+    const.SATURN, const.URANUS, const.NEPTUNE, const.PLUTO
+]
+RELATIONSHIP_PERSONAL_POINTS = [const.VENUS, const.MOON]
+RELATIONSHIP_TIMELINE_MAX_DAYS = 366
+
+@app.route('/api/relationship/timeline', methods=['POST'])
+def relationship_timeline():
+    """
+    关系行运时间线：行运天体与组合盘各天体、双方本命金星和月亮形成相位的时段
+    按开始时间排序，以NDJSON逐行返回；include_moon为true时包括行运月亮
+    """
+    try:
+        data = request.get_json()
+        
+        # 验证必要的输入
+        required_fields = [
+            'user1_date', 'user1_time', 'user1_lat', 'user1_lon',
+            'user2_date', 'user2_time', 'user2_lat', 'user2_lon',
+            'start_date', 'end_date'
+        ]
+        missing_fields = [field for field in required_fields if data.get(field) is None]
+        if missing_fields:
+            return jsonify({
+                "status": "error",
+                "error": f"Missing required fields: {', '.join(missing_fields)}"
+            }), 400
+        
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+        days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+        if days < 1 or days > RELATIONSHIP_TIMELINE_MAX_DAYS:
+            return jsonify({
+                "status": "error",
+                "error": f"end_date must be on or after start_date and the range at most {RELATIONSHIP_TIMELINE_MAX_DAYS} days"
+            }), 400
+        
+        orb = float(data.get('orb', DEFAULT_HIT_ORB))
+        transits = RELATIONSHIP_TRANSITS + ([const.MOON] if data.get('include_moon') else [])
+        
+        chart1 = calculate_chart(data.get('user1_date'), data.get('user1_time'),
+                                 float(data.get('user1_lat')), float(data.get('user1_lon')))
+        chart2 = calculate_chart(data.get('user2_date'), data.get('user2_time'),
+                                 float(data.get('user2_lat')), float(data.get('user2_lon')))
+        composite = composite_chart(chart1, chart2)
+        
+        # 相位对象：(所属星盘, 天体)
+        targets = [(('composite', body), composite.get(body).lon) for body in RELATIONSHIP_CHART_OBJECTS]
+        targets += [(('user1', body), chart1.get(body).lon) for body in RELATIONSHIP_PERSONAL_POINTS]
+        targets += [(('user2', body), chart2.get(body).lon) for body in RELATIONSHIP_PERSONAL_POINTS]
+        
+        with stage_timer('aspects'):
+            hits = aspect_hits(transits, targets, date_to_jd(start_date), date_to_jd(end_date) + 1, orb)
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.warning("API error: %s", error_msg)
+        
+        return jsonify({
+            "status": "error",
+            "error": error_msg
+        }), 400
+    
+    def generate():
+        for hit in hits:
+            chart_name, body = hit['target']
+            yield json.dumps({
+                'start': jd_to_iso(hit['start']) if hit['start'] is not None else None,
+                'exact': [jd_to_iso(jd) for jd in hit['exact']],
+                'end': jd_to_iso(hit['end']) if hit['end'] is not None else None,
+                'transit': hit['transit'],
+                'aspect': hit['aspect'],
+                'chart': chart_name,
+                'target': body
+            }, ensure_ascii=False) + '\n'
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+# 行运事件默认天体（行运表中的全部天体）
+TRANSIT_EVENT_OBJECTS = list(TRANSIT_OBJECTS)
+TRANSIT_EVENTS_MAX_DAYS = 366
+
+@app.route('/api/transits/events', methods=['POST'])
+def transits_events():
+    """
+    行运事件：精确到分钟的相位（需提供出生信息，对本命行星）、换座和停滞（留）时刻
+    可选 types（aspect/ingress/station）和 objects（行运天体）筛选，按时间顺序返回
+    """
+    try:
+        data = request.get_json()
+        
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+        if not start_date or not end_date:
+            return jsonify({
+                "status": "error",
+                "error": "Missing required fields: start_date, end_date"
+            }), 400
+        days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+        if days < 1 or days > TRANSIT_EVENTS_MAX_DAYS:
+            return jsonify({
+                "status": "error",
+                "error": f"end_date must be on or after start_date and the range at most {TRANSIT_EVENTS_MAX_DAYS} days"
+            }), 400
+        
+        types = data.get('types') or list(EVENT_TYPES)
+        objects = data.get('objects') or TRANSIT_EVENT_OBJECTS
+        invalid = [value for value in types if value not in EVENT_TYPES]
+        invalid += [value for value in objects if value not in TRANSIT_EVENT_OBJECTS + [const.SOUTH_NODE]]
+        if invalid:
+            return jsonify({
+                "status": "error",
+                "error": f"Unsupported types or objects: {', '.join(map(str, invalid))}"
+            }), 400
+        
+        # 提供出生信息时计算对本命行星的相位
+        targets = []
+        if data.get('birth_date') and data.get('birth_time'):
+            birth_chart = daily_fortune_calc.build_birth_chart(
+                data.get('birth_date'), data.get('birth_time'),
+                float(data.get('birth_latitude')), float(data.get('birth_longitude')))
+            targets = [(planet, birth_chart.get(planet).lon) for planet in NATAL_PLANETS]
+        
+        with stage_timer('transit_events'):
+            events = transit_events(date_to_jd(start_date), date_to_jd(end_date) + 1, objects, targets, types)
+        
+        result = []
+        for event in events:
+            item = {'time': jd_to_iso(event['jd'])}
+            item.update((key, value) for key, value in event.items() if key != 'jd')
+            result.append(item)
+        
+        return jsonify({
+            'success': True,
+            'start_date': start_date,
+            'end_date': end_date,
+            'events': result
+        })
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.warning("API error: %s", error_msg)
+        
+        return jsonify({
+            "status": "error",
+            "error": error_msg
+        }), 400
+
+# 换座和停滞日历单次查询的最大天数（按年预计算，查询为二分查找）
+CALENDAR_INGRESSES_MAX_DAYS = 3660
+
+@app.route('/api/calendar/ingresses', methods=['GET'])
+def calendar_ingresses():
+    """
+    换座和停滞（留）日历：?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD
+    可选 objects、types（逗号分隔）和 language；数据按年预计算并保存到磁盘
+    """
+    try:
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        if not start_date or not end_date:
+            return jsonify({
+                "status": "error",
+                "error": "Missing required parameters: start_date, end_date"
+            }), 400
+        days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+        if days < 1 or days > CALENDAR_INGRESSES_MAX_DAYS:
+            return jsonify({
+                "status": "error",
+                "error": f"end_date must be on or after start_date and the range at most {CALENDAR_INGRESSES_MAX_DAYS} days"
+            }), 400
+        
+        types = request.args.get('types')
+        types = types.split(',') if types else list(CALENDAR_EVENT_TYPES)
+        objects = request.args.get('objects')
+        objects = objects.split(',') if objects else list(CALENDAR_OBJECTS)
+        invalid = [value for value in types if value not in CALENDAR_EVENT_TYPES]
+        invalid += [value for value in objects if value not in CALENDAR_OBJECTS]
+        if invalid:
+            return jsonify({
+                "status": "error",
+                "error": f"Unsupported types or objects: {', '.join(invalid)}"
+            }), 400
+        lang = daily_language(request.args)
+        
+        with stage_timer('event_calendar'):
+            events = calendar_events(date_to_jd(start_date), date_to_jd(end_date) + 1, types, objects)
+        
+        result = []
+        for event in events:
+            item = {'time': jd_to_iso(event['jd'])}
+            item.update((key, value) for key, value in event.items() if key != 'jd')
+            if lang == 'zh':
+                item['object'] = PLANET_NAMES.get(item['object'], item['object'])
+                if 'sign' in item:
+                    item['sign'] = SIGN_NAMES.get(item['sign'], item['sign'])
+            result.append(item)
+        
+        return jsonify({
+            'success': True,
+            'start_date': start_date,
+            'end_date': end_date,
+            'events': result
+        })
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.warning("API error: %s", error_msg)
+        
+        return jsonify({
+            "status": "error",
+            "error": error_msg
+        }), 400
+
+@app.route('/api/calendar/void_of_course', methods=['GET'])
+def calendar_void_of_course():
+    """
+    月亮空亡（void-of-course）时段：?start_date=YYYY-MM-DD&end_date=YYYY-MM-DD
+    从月亮在当前星座的最后一个主要相位到进入下一星座；可选 language
+    """
+    try:
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        if not start_date or not end_date:
+            return jsonify({
+                "status": "error",
+                "error": "Missing required parameters: start_date, end_date"
+            }), 400
+        days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+        if days < 1 or days > CALENDAR_INGRESSES_MAX_DAYS:
+            return jsonify({
+                "status": "error",
+                "error": f"end_date must be on or after start_date and the range at most {CALENDAR_INGRESSES_MAX_DAYS} days"
+            }), 400
+        lang = daily_language(request.args)
+        
+        with stage_timer('event_calendar'):
+            periods = void_periods(date_to_jd(start_date), date_to_jd(end_date) + 1)
+        
+        result = []
+        for period in periods:
+            last_aspect = period['last_aspect']
+            if last_aspect and lang == 'zh':
+                last_aspect = dict(last_aspect, planet=PLANET_NAMES.get(last_aspect['planet'], last_aspect['planet']))
+            result.append({
+                'start': jd_to_iso(period['start']),
+                'end': jd_to_iso(period['end']),
+                'moon_enters': SIGN_NAMES.get(period['moon_enters']) if lang == 'zh' else period['moon_enters'],
+                'last_aspect': last_aspect
+            })
+        
+        return jsonify({
+            'success': True,
+            'start_date': start_date,
+            'end_date': end_date,
+            'periods': result
+        })
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.warning("API error: %s", error_msg)
+        
+        return jsonify({
+            "status": "error",
+            "error": error_msg
+        }), 400
+
+# 择时搜索单次查询的最大天数
+ELECTIONAL_MAX_DAYS = 366
+
+@app.route('/api/electional/search', methods=['POST'])
+def electional_search_windows():
+    """
+    择时搜索：满足所有条件的时间段，如月亮渐盈、非空亡、水星顺行且金星相位良好
+    query 为条件名列表（全部满足），或嵌套的 {"all": [...]}、{"any": [...]}、{"not": ...}
+    """
+    try:
+        data = request.get_json()
+        
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+        query = data.get('query')
+        if not start_date or not end_date or not query:
+            return jsonify({
+                "status": "error",
+                "error": "Missing required fields: start_date, end_date, query"
+            }), 400
+        days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+        if days < 1 or days > ELECTIONAL_MAX_DAYS:
+            return jsonify({
+                "status": "error",
+                "error": f"end_date must be on or after start_date and the range at most {ELECTIONAL_MAX_DAYS} days"
+            }), 400
+        min_duration = float(data.get('min_duration_minutes', 0)) / 1440
+        
+        with stage_timer('electional_search'):
+            windows = electional_search(query, date_to_jd(start_date), date_to_jd(end_date) + 1, min_duration)
+        
+        return jsonify({
+            'success': True,
+            'start_date': start_date,
+            'end_date': end_date,
+            'windows': [
+                {
+                    'start': jd_to_iso(start),
+                    'end': jd_to_iso(end),
+                    'duration_minutes': int(round((end - start) * 1440))
+                }
+                for start, end in windows
+            ]
+        })
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.warning("API error: %s", error_msg)
+        
+        return jsonify({
+            "status": "error",
+            "error": error_msg
+        }), 400
+
+# Initialize daily fortune calculator (readings are cached until the end of the target date)
+daily_fortune_calc = DailyFortuneCalculator(cache=create_response_cache('daily'))
+
+# Load precomputed per-date snapshots (transits, lunar phase) so requests only
+# do the natal-specific part; SNAPSHOT_SCHEDULER=1 also refreshes them nightly
+try:
+    snapshot_store = SnapshotStore()
+    logger.info("Loaded %d date snapshots", load_snapshots(daily_fortune_calc, snapshot_store))
+    if os.environ.get('SNAPSHOT_SCHEDULER') == '1':
+        SnapshotScheduler(daily_fortune_calc, snapshot_store,
+                          days=int(os.environ.get('SNAPSHOT_DAYS', 14))).start()
+except Exception as e:
+    logger.warning("Date snapshots unavailable: %s", e)
+
+# 订阅用户及其预生成的次日运势（由 cli pregenerate 任务每晚写入）
+subscriber_store = SubscriberStore()
+
+def daily_language(data):
+    """Language of the fortune texts: zh for Chinese variants, otherwise en"""
+    lang = data.get('language') or 'en'
+    return 'zh' if lang.lower() in ['zh', 'cn', 'chinese', 'zh-cn', 'zhcn'] else 'en'
+
+def daily_timezone(data):
+    """target_timezone of a request (default UTC); unknown zones raise ValueError"""
+    target_timezone = data.get('target_timezone', 'UTC')
+    try:
+        pytz.timezone(target_timezone)
+    except (pytz.UnknownTimeZoneError, AttributeError):
+        raise ValueError(f'Unknown target_timezone: {target_timezone}')
+    return target_timezone
+
+def daily_cache_control(target_date_given, target_timezone='UTC'):
+    """Cache-Control for a daily reading: fixed dates never change, "today" rolls over at midnight in target_timezone"""
+    if target_date_given:
+        return 'public, max-age=86400'
+    seconds_left = end_of_day_timestamp(local_date(target_timezone), target_timezone) - datetime.now(pytz.UTC).timestamp()
+    return f'public, max-age={max(0, int(seconds_left))}'
+
+@app.route('/api/daily', methods=['POST'])
+def daily_fortune():
+    """Calculate daily fortune based on birth information"""
+    try:
+        data = request.get_json()
+        
+        # Required fields
+        birth_date = data.get('birth_date')
+        birth_time = data.get('birth_time')
+        birth_lat = float(data.get('birth_latitude'))
+        birth_lon = float(data.get('birth_longitude'))
+        
+        # Optional fields
+        target_date = data.get('target_date')  # If not provided, uses today
+        target_timezone = daily_timezone(data)
+        lang = daily_language(data)
+        current_lat, current_lon = current_location(data)
+        
+        # Validate required fields
+        if not all([birth_date, birth_time, birth_lat is not None, birth_lon is not None]):
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields: birth_date, birth_time, birth_latitude, birth_longitude'
+            }), 400
+        
+        # The reading is deterministic for (birth data, date, algorithm version),
+        # so the seed doubles as an ETag and repeat requests can be answered with 304
+        cache_control = daily_cache_control(target_date is not None, target_timezone)
+        # 未指定日期时取目标时区的“今天”，而不是UTC日期
+        resolved_date = target_date or local_date(target_timezone)
+        # 行运按目标时区当地正午计算，时区不同结果不同
+        etag = f"{fortune_seed(birth_date, birth_time, birth_lat, birth_lon, resolved_date)}-{lang}-{target_timezone}"
+        if current_lat is not None:
+            # 行星时按经纬度网格计算，同一网格内结果相同
+            etag += '-{}-{}'.format(*grid_cell(current_lat, current_lon))
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = cache_control
+            return response
+        
+        # Calculate daily fortune
+        with stage_timer('daily_scoring'):
+            result = daily_fortune_calc.calculate_daily_fortune(
+                birth_date=birth_date,
+                birth_time=birth_time,
+                birth_lat=birth_lat,
+                birth_lon=birth_lon,
+                target_date=resolved_date,
+                target_timezone=target_timezone,
+                lang=lang,
+                current_lat=current_lat,
+                current_lon=current_lon
+            )
+        
+        response = jsonify(result)
+        if result.get('success'):
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = cache_control
+        return response
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.warning("Daily Fortune API error: %s", error_msg)
+        
+        return jsonify({
+            'success': False,
+            'error': error_msg
+        }), 400
+
+# Worker processes for batch scoring (chart building and texts are Python code
+# holding the GIL, so threads would barely run in parallel)
+DAILY_BATCH_WORKERS = int(os.environ.get('DAILY_BATCH_WORKERS', min(8, os.cpu_count() or 1)))
+
+# Chunks in flight per worker while a batch streams
+DAILY_BATCH_CHUNKS_PER_WORKER = 2
+
+_daily_batch_executor = None
+_daily_batch_executor_lock = threading.Lock()
+
+def daily_batch_executor():
+    """Shared process pool for batch scoring, started on the first batch request"""
+    global _daily_batch_executor
+    with _daily_batch_executor_lock:
+        if _daily_batch_executor is None:
+            # spawn: forking a threaded web server process is unsafe
+            _daily_batch_executor = ProcessPoolExecutor(
+                max_workers=DAILY_BATCH_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=batch_init_worker
+            )
+        return _daily_batch_executor
+
+@app.route('/api/daily/batch', methods=['POST'])
+def daily_fortune_batch():
+    """
+    Calculate daily fortunes for many birth records on one target date
+    
+    Transits and lunar phase are computed once; records are scored in chunks on
+    a process pool and streamed back as NDJSON, one line per record in input order.
+    """
+    try:
+        data = request.get_json()
+        records = data.get('records')
+        if not isinstance(records, list) or not records:
+            return jsonify({
+                'success': False,
+                'error': 'records must be a non-empty list of birth records'
+            }), 400
+        
+        with stage_timer('chart_build'):
+            context = daily_fortune_calc.build_date_context(
+                data.get('target_date'), daily_timezone(data))
+        # 工作进程直接使用这里的日期上下文（可能来自预计算快照），不再各自重算
+        payload = serialize_context(context)
+        lang = daily_language(data)
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.warning("Daily Batch API error: %s", error_msg)
+        
+        return jsonify({
+            'success': False,
+            'error': error_msg
+        }), 400
+    
+    def generate():
+        # Keep a bounded window of pending chunks so large batches stream
+        # without queueing every chunk up front
+        executor = daily_batch_executor()
+        window = DAILY_BATCH_WORKERS * DAILY_BATCH_CHUNKS_PER_WORKER
+        indexed = [(index, record if isinstance(record, dict) else {}) for index, record in enumerate(records)]
+        pending = deque()
+        for i in range(0, len(indexed), BATCH_CHUNK_RECORDS):
+            chunk = (indexed[i:i + BATCH_CHUNK_RECORDS], payload, lang)
+            pending.append(executor.submit(batch_score_chunk, chunk))
+            if len(pending) >= window:
+                for line in pending.popleft().result():
+                    yield json.dumps(line, ensure_ascii=False) + '\n'
+        while pending:
+            for line in pending.popleft().result():
+                yield json.dumps(line, ensure_ascii=False) + '\n'
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+# Longest range accepted by /api/daily/range
+DAILY_RANGE_MAX_DAYS = 366
+
+@app.route('/api/daily/range', methods=['POST'])
+def daily_fortune_range():
+    """
+    Calculate daily fortunes for every day from start_date to end_date inclusive
+    
+    The natal chart is built once and transits for the whole range come from one
+    ephemeris pass; days are streamed back as NDJSON as soon as each is scored.
+    """
+    try:
+        data = request.get_json()
+        
+        # Required fields
+        birth_date = data.get('birth_date')
+        birth_time = data.get('birth_time')
+        birth_lat = float(data.get('birth_latitude'))
+        birth_lon = float(data.get('birth_longitude'))
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+        target_timezone = daily_timezone(data)
+        lang = daily_language(data)
+        current_lat, current_lon = current_location(data)
+        
+        if not all([birth_date, birth_time, start_date, end_date]):
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields: birth_date, birth_time, birth_latitude, birth_longitude, start_date, end_date'
+            }), 400
+        
+        days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+        if days < 1 or days > DAILY_RANGE_MAX_DAYS:
+            return jsonify({
+                'success': False,
+                'error': f'end_date must be on or after start_date and the range at most {DAILY_RANGE_MAX_DAYS} days'
+            }), 400
+        
+        with stage_timer('chart_build'):
+            birth_chart = daily_fortune_calc.build_birth_chart(birth_date, birth_time, birth_lat, birth_lon)
+            contexts = daily_fortune_calc.build_range_contexts(start_date, end_date, target_timezone)
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.warning("Daily Range API error: %s", error_msg)
+        
+        return jsonify({
+            'success': False,
+            'error': error_msg
+        }), 400
+    
+    def generate():
+        for context in contexts:
+            with stage_timer('daily_scoring'):
+                result = daily_fortune_calc.calculate_daily_fortune(
+                    birth_date=birth_date,
+                    birth_time=birth_time,
+                    birth_lat=birth_lat,
+                    birth_lon=birth_lon,
+                    context=context,
+                    birth_chart=birth_chart,
+                    lang=lang,
+                    current_lat=current_lat,
+                    current_lon=current_lon
+                )
+            yield json.dumps(result, ensure_ascii=False) + '\n'
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/api/daily/calendar', methods=['POST'])
+def daily_calendar():
+    """
+    Fortune score, lunar phase, illumination and Moon sign for every day of a month
+    
+    month is YYYY-MM; the days come back as parallel arrays (one entry per day).
+    """
+    try:
+        data = request.get_json()
+        
+        # Required fields
+        birth_date = data.get('birth_date')
+        birth_time = data.get('birth_time')
+        birth_lat = float(data.get('birth_latitude'))
+        birth_lon = float(data.get('birth_longitude'))
+        month = data.get('month')
+        
+        # Optional fields
+        target_timezone = daily_timezone(data)
+        lang = daily_language(data)
+        
+        if not all([birth_date, birth_time, month]):
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields: birth_date, birth_time, birth_latitude, birth_longitude, month'
+            }), 400
+        
+        month_start = datetime.strptime(month, '%Y-%m')
+        with stage_timer('daily_scoring'):
+            calendar = daily_fortune_calc.month_calendar(
+                birth_date, birth_time, birth_lat, birth_lon,
+                month_start.year, month_start.month, target_timezone
+            )
+        
+        if lang == 'zh':
+            calendar['moon_sign'] = [SIGN_NAMES.get(sign, sign) for sign in calendar['moon_sign']]
+        
+        return jsonify({
+            'success': True,
+            'month': month_start.strftime('%Y-%m'),
+            **calendar
+        })
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.warning("Daily Calendar API error: %s", error_msg)
+        
+        return jsonify({
+            'success': False,
+            'error': error_msg
+        }), 400
+
+# 最佳日期查询的默认返回天数
+DAILY_BEST_DAYS_TOP_K = 5
+
+@app.route('/api/daily/best_days', methods=['POST'])
+def daily_best_days():
+    """
+    Find the best days from start_date to end_date for one birth record and life area
+    
+    area: overall (default), career, love, health or growth; top_k days are returned best first.
+    """
+    try:
+        data = request.get_json()
+        
+        # Required fields
+        birth_date = data.get('birth_date')
+        birth_time = data.get('birth_time')
+        birth_lat = float(data.get('birth_latitude'))
+        birth_lon = float(data.get('birth_longitude'))
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+        
+        # Optional fields
+        area = data.get('area', 'overall')
+        top_k = int(data.get('top_k', DAILY_BEST_DAYS_TOP_K))
+        target_timezone = daily_timezone(data)
+        
+        if not all([birth_date, birth_time, start_date, end_date]):
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields: birth_date, birth_time, birth_latitude, birth_longitude, start_date, end_date'
+            }), 400
+        
+        days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+        if days < 1 or days > DAILY_RANGE_MAX_DAYS:
+            return jsonify({
+                'success': False,
+                'error': f'end_date must be on or after start_date and the range at most {DAILY_RANGE_MAX_DAYS} days'
+            }), 400
+        
+        with stage_timer('daily_scoring'):
+            best_days = daily_fortune_calc.find_best_days(
+                birth_date, birth_time, birth_lat, birth_lon, start_date, end_date,
+                area=area, top_k=max(1, top_k), target_timezone=target_timezone
+            )
+        
+        return jsonify({
+            'success': True,
+            'area': area,
+            'start_date': start_date,
+            'end_date': end_date,
+            'best_days': best_days
+        })
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.warning("Daily Best Days API error: %s", error_msg)
+        
+        return jsonify({
+            'success': False,
+            'error': error_msg
+        }), 400
+
+@app.route('/api/subscribers', methods=['POST'])
+def upsert_subscriber():
+    """Add or update a subscriber whose daily fortune is pre-generated each night"""
+    try:
+        data = request.get_json()
+        
+        subscriber = {
+            'subscriber_id': str(data.get('subscriber_id') or ''),
+            'birth_date': data.get('birth_date'),
+            'birth_time': data.get('birth_time'),
+            'birth_latitude': float(data.get('birth_latitude')),
+            'birth_longitude': float(data.get('birth_longitude')),
+            'target_timezone': daily_timezone(data),
+            'language': daily_language(data)
+        }
+        
+        if not all([subscriber['subscriber_id'], subscriber['birth_date'], subscriber['birth_time']]):
+            return jsonify({
+                'success': False,
+                'error': 'Missing required fields: subscriber_id, birth_date, birth_time, birth_latitude, birth_longitude'
+            }), 400
+        
+        # 出生日期和时间由SubscriberStore校验，无法解析时不保存
+        try:
+            subscriber_store.upsert(subscriber)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        return jsonify({'success': True, 'subscriber_id': subscriber['subscriber_id']})
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.warning("Subscriber API error: %s", error_msg)
+        
+        return jsonify({
+            'success': False,
+            'error': error_msg
+        }), 400
+
+@app.route('/api/subscribers/<subscriber_id>/daily', methods=['GET'])
+def subscriber_daily_fortune(subscriber_id):
+    """
+    Daily fortune of a subscriber (?date=YYYY-MM-DD, default today in their timezone)
+    
+    Served from the pre-generated readings; on a miss it is computed live and stored.
+    """
+    subscriber = subscriber_store.get(subscriber_id)
+    if subscriber is None:
+        return jsonify({
+            'success': False,
+            'error': f'Unknown subscriber: {subscriber_id}'
+        }), 404
+    
+    target_date = request.args.get('date') or local_date(subscriber['target_timezone'])
+    result = subscriber_store.get_fortune(subscriber_id, target_date)
+    record_cache_lookup('subscriber_fortune', result is not None)
+    source = 'pregenerated'
+    if result is None:
+        source = 'live'
+        with stage_timer('daily_scoring'):
+            result = compute_subscriber_fortune(daily_fortune_calc, subscriber, target_date)
+        if not result.get('success'):
+            return jsonify(result), 400
+        subscriber_store.put_fortunes([(subscriber_id, target_date, result)])
+    
+    response = jsonify(result)
+    response.headers['X-Fortune-Source'] = source
+    return response
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5002) 
@@ -0,0 +1,11 @@
+# cache_service module
+# 提供星盘SVG和接口响应等计算结果的缓存功能
+from .files import atomic_write
+from .svg_store import SVGStore, SVG_RENDERER_VERSION
+from .response_cache import MemoryResponseCache, SQLiteResponseCache, create_response_cache
+
+__all__ = [
+    'atomic_write',
+    'SVGStore', 'SVG_RENDERER_VERSION',
+    'MemoryResponseCache', 'SQLiteResponseCache', 'create_response_cache'
+]
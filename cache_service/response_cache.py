@@ -0,0 +1,148 @@
+import copy
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from monitoring_service import get_logger, record_cache_lookup
+
+logger = get_logger('response_cache')
+
+
+# 默认配置
+DEFAULT_RESPONSE_CACHE_BACKEND = 'memory'
+DEFAULT_RESPONSE_CACHE_MAX_ENTRIES = 10000
+DEFAULT_RESPONSE_CACHE_PATH = os.path.join(tempfile.gettempdir(), 'star-api-response-cache.sqlite3')
+
+
+class MemoryResponseCache:
+    """
+    进程内LRU响应缓存
+    每条记录带过期时间戳，读取时发现过期即删除；超过条目上限时淘汰最久未使用的记录
+    """
+
+    def __init__(self, name, max_entries=DEFAULT_RESPONSE_CACHE_MAX_ENTRIES):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # 键 -> (过期时间, 值)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """返回缓存值，未命中或已过期时返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        record_cache_lookup(self.name, entry is not None)
+        # 深拷贝：调用方修改返回值（包括嵌套的列表和字典）不会影响缓存内容
+        return None if entry is None else copy.deepcopy(entry[1])
+
+    def put(self, key, value, expires_at):
+        """保存可JSON序列化的字典，expires_at为Unix时间戳"""
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteResponseCache:
+    """
+    基于SQLite的响应缓存，多个gunicorn worker和重启之间共享
+    每个线程使用独立连接，写入时顺带清理已过期的记录
+    """
+
+    # 每写入多少次清理一次过期记录
+    PURGE_INTERVAL = 500
+
+    def __init__(self, name, path=None):
+        self.name = name
+        self.path = path or os.environ.get('RESPONSE_CACHE_PATH', DEFAULT_RESPONSE_CACHE_PATH)
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_expires ON response_cache (expires_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """返回缓存值，未命中或已过期时返回None"""
+        value = None
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM response_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning("Response cache read failed: %s", e)
+        record_cache_lookup(self.name, value is not None)
+        return value
+
+    def put(self, key, value, expires_at):
+        """保存可JSON序列化的字典，expires_at为Unix时间戳"""
+        now = time.time()
+        if expires_at <= now:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), expires_at)
+                )
+                self._writes += 1
+                if self._writes % self.PURGE_INTERVAL == 0:
+                    conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        except sqlite3.Error as e:
+            logger.warning("Response cache write failed: %s", e)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM response_cache")
+
+
+def create_response_cache(name):
+    """
+    根据环境变量创建响应缓存，返回None表示不缓存
+
+    环境变量：
+    RESPONSE_CACHE_BACKEND      memory（默认）、sqlite 或 none
+    RESPONSE_CACHE_MAX_ENTRIES  memory后端的条目上限，默认10000
+    RESPONSE_CACHE_PATH         sqlite后端的数据库文件路径
+    """
+    backend = os.environ.get('RESPONSE_CACHE_BACKEND', DEFAULT_RESPONSE_CACHE_BACKEND).lower()
+    if backend == 'none':
+        return None
+    if backend == 'sqlite':
+        try:
+            return SQLiteResponseCache(name)
+        except sqlite3.Error as e:
+            logger.warning("SQLite response cache unavailable, falling back to memory: %s", e)
+    elif backend != 'memory':
+        logger.warning("Unknown RESPONSE_CACHE_BACKEND %r, using memory", backend)
+    max_entries = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', DEFAULT_RESPONSE_CACHE_MAX_ENTRIES))
+    return MemoryResponseCache(name, max_entries)
@@ -0,0 +1,132 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from monitoring_service import get_logger, record_cache_lookup
+from .files import atomic_write
+
+logger = get_logger('svg_cache')
+
+
+# 渲染器版本号 - 修改SVG绘制逻辑后需要递增，使旧缓存自动失效
+SVG_RENDERER_VERSION = 1
+
+# 默认缓存目录和容量上限
+DEFAULT_SVG_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'star-api-svg-cache')
+DEFAULT_SVG_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class SVGStore:
+    """
+    基于文件的SVG星盘缓存（内容寻址，每个哈希一个文件）
+    以gzip压缩字节保存，多个gunicorn worker和重启之间共享
+    文件修改时间用作LRU时间戳，总大小超过上限时淘汰最久未使用的文件
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.environ.get('SVG_CACHE_DIR', DEFAULT_SVG_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.environ.get('SVG_CACHE_MAX_BYTES', DEFAULT_SVG_CACHE_MAX_BYTES))
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._approx_bytes = None  # 本进程估算的缓存总大小，首次写入时扫描
+
+        try:
+            os.makedirs(self.root, exist_ok=True)
+        except OSError as e:
+            logger.warning("SVG cache disabled, cannot create %s: %s", self.root, e)
+            self.enabled = False
+
+    def key(self, fingerprint, lang, options=None):
+        """根据星盘指纹、语言和渲染选项生成缓存键"""
+        payload = json.dumps({
+            'fingerprint': fingerprint,
+            'lang': lang,
+            'options': options or {},
+            'version': SVG_RENDERER_VERSION
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        # 使用两级目录，避免单个目录下文件过多
+        return os.path.join(self.root, key[:2], f"{key}.svg.gz")
+
+    def get(self, key):
+        """返回缓存的gzip字节，未命中时返回None"""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            record_cache_lookup('svg', False)
+            return None
+        record_cache_lookup('svg', True)
+
+        # 更新访问时间，供LRU淘汰使用
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key, svg_content):
+        """压缩并保存SVG，返回gzip字节（即使写入失败也返回）"""
+        data = gzip.compress(svg_content.encode('utf-8'), compresslevel=9, mtime=0)
+        if not self.enabled:
+            return data
+
+        path = self._path(key)
+        try:
+            # 先写临时文件再原子替换，避免其他worker读到半个文件
+            with atomic_write(path) as f:
+                f.write(data)
+        except OSError as e:
+            logger.warning("SVG cache write failed: %s", e)
+            return data
+
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._scan_size()
+            else:
+                self._approx_bytes += len(data)
+            if self._approx_bytes > self.max_bytes:
+                self._approx_bytes = self._evict()
+        return data
+
+    def _list_entries(self):
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith('.svg.gz'):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._list_entries())
+
+    def _evict(self):
+        """淘汰最久未使用的文件，直到总大小降到上限的90%"""
+        entries = self._list_entries()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        return total
@@ -1,3 +1,10 @@
-from .core import DailyFortuneCalculator
+from .core import DailyFortuneCalculator, ALGORITHM_VERSION, fortune_seed
+from .utils import init_ephemeris_thread
+from .snapshots import SnapshotStore, SnapshotScheduler, load_snapshots, precompute_snapshots
+from .subscribers import SubscriberStore, pregenerate_fortunes
 
-__all__ = ['DailyFortuneCalculator'] 
\ No newline at end of file
+__all__ = [
+    'DailyFortuneCalculator', 'ALGORITHM_VERSION', 'fortune_seed', 'init_ephemeris_thread',
+    'SnapshotStore', 'SnapshotScheduler', 'load_snapshots', 'precompute_snapshots',
+    'SubscriberStore', 'pregenerate_fortunes'
+] 
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+Batch scoring of many birth records for one target date
+
+Records are scored in chunks: the natal charts of a chunk are built first
+and their transit influences computed in one 2-D NumPy pass (see
+influence.natal_influences), then each reading is assembled from its row.
+The /api/daily/batch endpoint hands chunks to a process pool so chart
+building and text generation run in parallel rather than sharing the GIL;
+the date context is built once by the web process (from its caches and
+preloaded snapshots) and sent to the workers serialized.
+"""
+import numpy as np
+
+from cache_service import create_response_cache
+from .core import DailyFortuneCalculator
+from .influence import chart_longitudes, natal_influences
+from .planetary_hours import current_location
+from .snapshots import deserialize_context
+from .utils import init_ephemeris_thread
+
+# Records handed to a worker process at a time
+BATCH_CHUNK_RECORDS = 200
+
+
+def score_records(calculator, indexed_records, context, lang='en'):
+    """
+    Score a chunk of records against one date context
+
+    Args:
+        indexed_records: [(index, record dict), ...]; a record has birth_date,
+            birth_time, birth_latitude, birth_longitude and optional id,
+            current_latitude and current_longitude
+
+    Returns:
+        One line dict per record, in order: index, id (when given) and the
+        calculate_daily_fortune() result (or success False and error)
+    """
+    charts = {}
+    errors = {}
+    for index, record in indexed_records:
+        try:
+            charts[index] = calculator.build_birth_chart(
+                record.get('birth_date'), record.get('birth_time'),
+                float(record.get('birth_latitude')), float(record.get('birth_longitude')))
+        except Exception as e:
+            errors[index] = str(e)
+
+    # Transit influences on every natal chart of the chunk at once, shape (U, N)
+    order = list(charts)
+    rows = {}
+    if order:
+        influences = natal_influences(
+            context['transit_longitudes'], np.array([chart_longitudes(charts[index]) for index in order]))
+        rows = dict(zip(order, influences))
+
+    lines = []
+    for index, record in indexed_records:
+        if index in errors:
+            result = {'success': False, 'error': errors[index]}
+        else:
+            try:
+                current_lat, current_lon = current_location(record)
+                result = calculator.calculate_daily_fortune(
+                    birth_date=record.get('birth_date'),
+                    birth_time=record.get('birth_time'),
+                    birth_lat=float(record.get('birth_latitude')),
+                    birth_lon=float(record.get('birth_longitude')),
+                    context=context,
+                    birth_chart=charts[index],
+                    lang=lang,
+                    current_lat=current_lat,
+                    current_lon=current_lon,
+                    influences=rows[index]
+                )
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+        line = {'index': index}
+        if 'id' in record:
+            line['id'] = record['id']
+        line.update(result)
+        lines.append(line)
+    return lines
+
+
+# One calculator per worker process, with its own response cache (shared
+# across workers with RESPONSE_CACHE_BACKEND=sqlite)
+_worker_calculator = None
+
+# Last (payload, date context) a worker deserialized; consecutive chunks of a
+# batch carry the same payload
+_worker_context = (None, None)
+
+
+def init_worker():
+    global _worker_calculator
+    init_ephemeris_thread()
+    _worker_calculator = DailyFortuneCalculator(cache=create_response_cache('daily'))
+
+
+def score_chunk(chunk):
+    """Worker: (indexed records, serialize_context() payload, lang) -> line dicts"""
+    global _worker_context
+    indexed_records, payload, lang = chunk
+    if _worker_context[0] != payload:
+        _worker_context = (payload, deserialize_context(payload))
+    return score_records(_worker_calculator, indexed_records, _worker_context[1], lang)
@@ -0,0 +1,115 @@
+"""
+Command line tasks for deploy steps and cron
+
+    python -m daily_fortune_service.cli lunar-table
+    python -m daily_fortune_service.cli snapshots --days 14 [--timezone Asia/Shanghai ...]
+    python -m daily_fortune_service.cli pregenerate [--workers 4]
+    python -m daily_fortune_service.cli transit-hits [--date YYYY-MM-DD] [--output hits.ndjson]
+    python -m daily_fortune_service.cli event-calendar --year 2026 [--years 2]
+"""
+import argparse
+import json
+import os
+import sys
+
+from .core import DailyFortuneCalculator
+from .electional import build_well_aspected_year, well_aspected_kind
+from .event_calendar import build_year_events, calendar_path, save_year_columns
+from .influence import TRANSIT_PLANETS
+from .lunar_table import DEFAULT_LUNAR_TABLE_PATH, build_phase_table, save_phase_table
+from .snapshots import DEFAULT_SNAPSHOT_DAYS, SnapshotStore, precompute_snapshots
+from .subscribers import SubscriberStore, build_natal_index, pregenerate_fortunes
+from .void_of_course import build_void_table
+
+
+def build_lunar_table(args):
+    path = args.path or os.environ.get('LUNAR_TABLE_PATH', DEFAULT_LUNAR_TABLE_PATH)
+    jds, first_phase = build_phase_table()
+    save_phase_table(path, jds, first_phase)
+    print(f"Saved {len(jds)} lunar phase events to {path}")
+
+
+def build_snapshots(args):
+    store = SnapshotStore(args.db)
+    count = precompute_snapshots(DailyFortuneCalculator(), store, args.days, args.start,
+                                 tuple(args.timezone or ['UTC']))
+    print(f"Saved {count} date snapshots to {store.path}")
+
+
+def pregenerate(args):
+    store = SubscriberStore(args.db)
+    count = pregenerate_fortunes(store, args.workers, args.days_ahead)
+    print(f"Pre-generated {count} subscriber fortunes in {store.path}")
+
+
+def transit_hits(args):
+    calculator = DailyFortuneCalculator()
+    index = build_natal_index(SubscriberStore(args.db), calculator)
+    context = calculator.build_date_context(args.date)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for transit, aspect, natal, ids in index.transit_hits(context['transit_longitudes']):
+            out.write(json.dumps({
+                'date': context['target_date'], 'transit': transit, 'aspect': aspect,
+                'natal': natal, 'subscriber_ids': ids
+            }, ensure_ascii=False) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def build_event_calendar(args):
+    for year in range(args.year, args.year + args.years):
+        path = calendar_path(year, args.dir)
+        columns = build_year_events(year)
+        save_year_columns(path, columns)
+        print(f"Saved {len(columns['jd'])} ingress and station events for {year} to {path}")
+        path = calendar_path(year, args.dir, kind='void-of-course')
+        columns = build_void_table(year)
+        save_year_columns(path, columns)
+        print(f"Saved {len(columns['start'])} void-of-course Moon periods for {year} to {path}")
+        for planet in TRANSIT_PLANETS:
+            save_year_columns(calendar_path(year, args.dir, kind=well_aspected_kind(planet)),
+                              build_well_aspected_year(planet, year))
+        print(f"Saved well-aspected periods of {len(TRANSIT_PLANETS)} planets for {year}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='daily_fortune_service.cli')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    lunar = commands.add_parser('lunar-table', help='build the lunar phase event table')
+    lunar.add_argument('--path', help='output file (default LUNAR_TABLE_PATH)')
+    lunar.set_defaults(func=build_lunar_table)
+
+    snapshots = commands.add_parser('snapshots', help='precompute per-date snapshots')
+    snapshots.add_argument('--days', type=int, default=DEFAULT_SNAPSHOT_DAYS, help='number of days ahead')
+    snapshots.add_argument('--start', help='first date (YYYY-MM-DD, default today UTC)')
+    snapshots.add_argument('--timezone', action='append', help='target timezone (repeatable, default UTC)')
+    snapshots.add_argument('--db', help='SQLite path (default SNAPSHOT_DB_PATH)')
+    snapshots.set_defaults(func=build_snapshots)
+
+    subscribers = commands.add_parser('pregenerate', help="pre-generate subscribers' next-day fortunes")
+    subscribers.add_argument('--workers', type=int, help='worker processes (default CPU count)')
+    subscribers.add_argument('--days-ahead', type=int, default=1, help='days after the local date (default 1)')
+    subscribers.add_argument('--db', help='SQLite path (default SUBSCRIBER_DB_PATH)')
+    subscribers.set_defaults(func=pregenerate)
+
+    hits = commands.add_parser('transit-hits', help="list subscribers receiving each of a date's transit aspects")
+    hits.add_argument('--date', help='target date (YYYY-MM-DD, default today UTC)')
+    hits.add_argument('--output', help='NDJSON output file (default stdout)')
+    hits.add_argument('--db', help='SQLite path (default SUBSCRIBER_DB_PATH)')
+    hits.set_defaults(func=transit_hits)
+
+    calendar = commands.add_parser('event-calendar', help='build yearly ingress, station, void-of-course and aspect calendars')
+    calendar.add_argument('--year', type=int, required=True, help='first year')
+    calendar.add_argument('--years', type=int, default=1, help='number of years (default 1)')
+    calendar.add_argument('--dir', help='output directory (default EVENT_CALENDAR_DIR)')
+    calendar.set_defaults(func=build_event_calendar)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,130 @@
+import hashlib
 import json
 import random
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from flatlib import const
 from flatlib.chart import Chart
 from flatlib.datetime import Datetime
 from flatlib.geopos import GeoPos
 from flatlib import aspects
+from .ephemeris import date_range, transit_snapshots
+from .influence import area_influences, aspect_details, chart_longitudes, natal_influences, AREA_PLANETS, NATAL_INDEX
+from .influence import TRANSIT_PLANETS
+from .planetary_hours import grid_cell, planetary_hours
+from .templates import fortune_level, get_templates
+from .transit_events import UNIX_EPOCH_JD
 from .utils import get_timezone_from_longitude, get_lucky_elements, get_current_transits, calculate_lunar_phase
+from .utils import calculate_lunar_phases
+from .void_of_course import void_periods
+import numpy as np
 import pytz
-import random
+from monitoring_service import timed_stage
+
+
+# Life-area ratings: (base score, lowest and highest adjustment from transit influence)
+LIFE_AREA_RANGES = {
+    'career_finance': (3.5, -0.5, 1.5),
+    'love_relationships': (3.0, -0.5, 1.5),
+    'health_wellness': (4.0, -0.5, 1.0),
+    'personal_growth': (4.5, -0.5, 0.5),
+}
+
+# Planetary hour rulers reported as auspicious (see 'auspicious_activity' templates)
+AUSPICIOUS_PLANETS = (const.SUN, const.MOON, const.MERCURY, const.VENUS, const.JUPITER)
+
+# Areas accepted by find_best_days(); 'overall' ranks by fortune score
+BEST_DAY_AREAS = {
+    'career': 'career_finance',
+    'love': 'love_relationships',
+    'health': 'health_wellness',
+    'growth': 'personal_growth',
+}
+
+# Natal planets behind the overall fortune score (see _calculate_fortune_score)
+OVERALL_PLANETS = (const.SUN, const.MOON, const.VENUS, const.JUPITER)
+
+# Local hours in which an auspicious planetary hour may start
+AUSPICIOUS_HOURS_WINDOW = (6, 22)
+
+# Date contexts kept in memory, keyed by (date, UTC offset)
+TRANSIT_CACHE_SIZE = 4096
+
+# Bump whenever scoring or text selection changes, so seeded results
+# (and any caches keyed on them) roll over to the new algorithm
+ALGORITHM_VERSION = 6
+
+
+def _canonical_date(value):
+    """Normalize a date string to YYYY-MM-DD (left unchanged if unparseable)"""
+    for fmt in ('%Y-%m-%d', '%Y/%m/%d'):
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d')
+        except (TypeError, ValueError):
+            continue
+    return value
+
+
+def _canonical_time(value):
+    """Normalize a time string to HH:MM:SS (left unchanged if unparseable)"""
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            return datetime.strptime(value, fmt).strftime('%H:%M:%S')
+        except (TypeError, ValueError):
+            continue
+    return value
+
+
+def fortune_seed(birth_date, birth_time, birth_lat, birth_lon, target_date):
+    """
+    Stable hex digest identifying one fortune reading
+
+    The same birth data, target date and algorithm version always give the
+    same digest (unlike the built-in hash(), which is salted per process).
+    Inputs are canonicalized first, so "14:30" and "14:30:00" are one reading.
+    It seeds the per-call RNG and doubles as an ETag.
+    """
+    payload = json.dumps([
+        _canonical_date(birth_date), _canonical_time(birth_time),
+        f"{float(birth_lat):.6f}", f"{float(birth_lon):.6f}",
+        _canonical_date(target_date), ALGORITHM_VERSION
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def local_date(target_timezone, days_ahead=0):
+    """Date (YYYY-MM-DD) in target_timezone, days_ahead days from now (UTC if unknown)"""
+    try:
+        tz = pytz.timezone(target_timezone)
+    except pytz.UnknownTimeZoneError:
+        tz = pytz.UTC
+    return (datetime.now(tz) + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
+
+
+def end_of_day_timestamp(target_date, target_timezone='UTC'):
+    """Unix timestamp of the end of target_date in target_timezone (UTC if unknown)"""
+    try:
+        tz = pytz.timezone(target_timezone)
+    except pytz.UnknownTimeZoneError:
+        tz = pytz.UTC
+    day = datetime.strptime(_canonical_date(target_date), '%Y-%m-%d') + timedelta(days=1)
+    return tz.localize(day).timestamp()
+
+
+def utc_offset_minutes(target_date, target_timezone='UTC'):
+    """UTC offset of target_timezone at local noon on target_date, in minutes (0 if unknown)"""
+    try:
+        tz = pytz.timezone(target_timezone)
+    except pytz.UnknownTimeZoneError:
+        return 0
+    noon = datetime.strptime(_canonical_date(target_date), '%Y-%m-%d') + timedelta(hours=12)
+    return int(tz.localize(noon).utcoffset().total_seconds() // 60)
+
+
+def local_noon_hour_utc(offset_minutes):
+    """UT hour of local noon for a UTC offset; outside 0-24 when noon falls on another UTC date"""
+    return 12.0 - offset_minutes / 60.0
 
 
 class DailyFortuneCalculator:
@@ -17,14 +133,19 @@ class DailyFortuneCalculator:
     Calculates daily horoscope based on astrological transits and user's birth chart
     """
     
-    def __init__(self):
-        self.wisdom_templates = [
-            "Creativity is intelligence having fun. Today, let your brilliance play freely in all that you do.",
-            "The universe conspires to help those who dare to dream. Your aspirations are closer than they appear.",
-            "Trust your intuition today - it's your inner compass guiding you toward your highest good.",
-            "Every challenge is an opportunity in disguise. Look for the gift within today's experiences.",
-            "Your authentic self is your greatest strength. Shine your light without hesitation.",
-        ]
+    def __init__(self, cache=None):
+        # Optional response cache (see cache_service.response_cache); readings
+        # are deterministic per seed, so they can be reused until the day ends
+        self.cache = cache
+        
+        # Precomputed date contexts keyed by (date, timezone), see snapshots.py;
+        # replaced as a whole so readers never see a half-loaded dict
+        self.preloaded_contexts = {}
+        
+        # Computed date contexts keyed by (date, UTC offset minutes): every
+        # timezone with the same offset on a date shares one transit chart
+        self._transit_cache = OrderedDict()
+        self._transit_cache_lock = threading.Lock()
         
         self.lucky_colors = [
             ['Purple', 'Emerald Green'], ['Rose Gold', 'Forest Green'], ['Silver', 'Sky Blue'],
@@ -34,8 +155,104 @@ class DailyFortuneCalculator:
         self.lucky_stones = ['Amethyst', 'Rose Quartz', 'Citrine', 'Clear Quartz', 'Moonstone']
         self.directions = ['North', 'Northeast', 'East', 'Southeast', 'South', 'Southwest', 'West', 'Northwest']
     
+    def build_date_context(self, target_date=None, target_timezone='UTC'):
+        """
+        Compute the date-level inputs shared by every user for one target date
+        
+        Pass the result to calculate_daily_fortune(context=...) to avoid
+        recomputing the transit chart and lunar phase per user. Transits and
+        the lunar phase are taken at local noon in target_timezone.
+        
+        Returns:
+            Dictionary with target_date, target_timezone, transits (a
+            TransitSnapshot), transit_longitudes and lunar_phase
+        """
+        if target_date is None:
+            target_date = local_date(target_timezone)
+        preloaded = self.preloaded_contexts.get((target_date, target_timezone))
+        if preloaded is not None:
+            return preloaded
+        offset = utc_offset_minutes(target_date, target_timezone)
+        cached = self._cached_context(target_date, offset, target_timezone)
+        if cached is not None:
+            return cached
+        transits = self._calculate_transits(target_date, target_timezone)
+        context = {
+            'target_date': target_date,
+            'target_timezone': target_timezone,
+            'transits': transits,
+            'transit_longitudes': chart_longitudes(transits),
+            'lunar_phase': calculate_lunar_phase(target_date, local_noon_hour_utc(offset))
+        }
+        self._store_context(offset, context)
+        return context
+    
+    def build_range_contexts(self, start_date, end_date, target_timezone='UTC'):
+        """
+        Compute date contexts for every day from start_date to end_date inclusive
+        
+        Preloaded snapshots and cached contexts are used where available;
+        transit positions for the remaining days come from one
+        planet_positions() call on the lightweight ephemeris (see
+        ephemeris.py) instead of a full chart per day, and their lunar phases
+        from one lookup in the phase table.
+        
+        Returns:
+            List of date contexts in date order, as from build_date_context()
+        """
+        dates = date_range(start_date, end_date)
+        offsets = {date: utc_offset_minutes(date, target_timezone) for date in dates}
+        contexts = {}
+        for date in dates:
+            context = self.preloaded_contexts.get((date, target_timezone))
+            if context is None:
+                context = self._cached_context(date, offsets[date], target_timezone)
+            if context is not None:
+                contexts[date] = context
+        
+        missing = [date for date in dates if date not in contexts]
+        hours = [local_noon_hour_utc(offsets[date]) for date in missing]
+        snapshots = transit_snapshots(missing, hours) if missing else []
+        for date, snapshot, lunar_phase in zip(missing, snapshots, calculate_lunar_phases(missing, hours)):
+            contexts[date] = {
+                'target_date': date,
+                'target_timezone': target_timezone,
+                'transits': snapshot,
+                'transit_longitudes': chart_longitudes(snapshot),
+                'lunar_phase': lunar_phase
+            }
+            self._store_context(offsets[date], contexts[date])
+        return [contexts[date] for date in dates]
+    
+    def _cached_context(self, target_date, offset, target_timezone):
+        """Computed context for (date, offset), relabelled with target_timezone"""
+        with self._transit_cache_lock:
+            context = self._transit_cache.get((target_date, offset))
+            if context is None:
+                return None
+            self._transit_cache.move_to_end((target_date, offset))
+        if context['target_timezone'] != target_timezone:
+            context = dict(context, target_timezone=target_timezone)
+        return context
+    
+    def _store_context(self, offset, context):
+        with self._transit_cache_lock:
+            self._transit_cache[(context['target_date'], offset)] = context
+            self._transit_cache.move_to_end((context['target_date'], offset))
+            while len(self._transit_cache) > TRANSIT_CACHE_SIZE:
+                self._transit_cache.popitem(last=False)
+    
+    def preload_date_contexts(self, contexts):
+        """Replace the in-memory precomputed date contexts (e.g. loaded snapshots)"""
+        self.preloaded_contexts = {
+            (context['target_date'], context['target_timezone']): context
+            for context in contexts
+        }
+    
     def calculate_daily_fortune(self, birth_date, birth_time, birth_lat, birth_lon, 
-                              target_date=None, target_timezone='UTC'):
+                              target_date=None, target_timezone='UTC', context=None,
+                              birth_chart=None, lang='en', current_lat=None, current_lon=None,
+                              influences=None):
         """
         Calculate daily fortune for a specific date
         
@@ -44,43 +261,80 @@ class DailyFortuneCalculator:
             birth_time: Birth time in HH:MM:SS format
             birth_lat: Birth latitude
             birth_lon: Birth longitude
-            target_date: Target date for fortune calculation (default: today)
+            target_date: Target date for fortune calculation (default: today in target_timezone)
             target_timezone: Timezone for target date (default: UTC)
+            context: Precomputed result of build_date_context(); overrides
+                target_date and target_timezone when given
+            birth_chart: Precomputed natal chart from build_birth_chart(), reused
+                across days of a range
+            lang: Language of the fortune texts (see templates.py; default: en)
+            current_lat: Latitude for planetary hours (default: birth latitude)
+            current_lon: Longitude for planetary hours (default: birth longitude)
+            influences: Precomputed natal_influences() of birth_chart against
+                the context's transits (one row of a batch)
         
         Returns:
             Dictionary containing all fortune data
         """
         try:
-            # Use today if no target date provided
+            if context is not None:
+                target_date = context['target_date']
+                target_timezone = context['target_timezone']
+            
+            # Use today in the target timezone if no target date provided
             if target_date is None:
-                target_date = datetime.now(pytz.UTC).strftime('%Y-%m-%d')
+                target_date = local_date(target_timezone)
+            
+            seed = fortune_seed(birth_date, birth_time, birth_lat, birth_lon, target_date)
+            
+            # Planetary hours are for where the user is today, if known
+            if current_lat is None or current_lon is None:
+                current_lat, current_lon = birth_lat, birth_lon
+            current_lat, current_lon = float(current_lat), float(current_lon)
+            
+            # Serve repeat readings from the response cache
+            lat_cell, lon_cell = grid_cell(current_lat, current_lon)
+            cache_key = f"{seed}|{target_timezone}|{lang}|{lat_cell},{lon_cell}"
+            if self.cache is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
+            # Per-call RNG: varied text across users and days, but repeatable
+            # for the same reading and never shared between threads
+            rng = random.Random(seed)
             
             # Calculate birth chart
-            birth_chart = self._calculate_birth_chart(birth_date, birth_time, birth_lat, birth_lon)
+            if birth_chart is None:
+                birth_chart = self.build_birth_chart(birth_date, birth_time, birth_lat, birth_lon)
             
-            # Calculate current transits for target date
-            transits = self._calculate_transits(target_date, target_timezone)
+            # Transits and lunar phase depend only on the date
+            if context is None:
+                context = self.build_date_context(target_date, target_timezone)
+            transits = context['transits']
+            lunar_phase_info = context['lunar_phase']
             
-            # Calculate lunar phase
-            lunar_phase_info = calculate_lunar_phase(target_date)
+            # Score every transit-to-natal aspect in one pass
+            if influences is None:
+                influences = natal_influences(context['transit_longitudes'], chart_longitudes(birth_chart))
             
             # Calculate fortune score
-            fortune_score = self._calculate_fortune_score(birth_chart, transits, lunar_phase_info['phase_name'])
+            fortune_score = self._calculate_fortune_score(influences, lunar_phase_info['phase_name'])
             
             # Generate fortune summary
-            fortune_summary = self._generate_fortune_summary(birth_chart, transits, fortune_score)
+            fortune_summary = self._generate_fortune_summary(fortune_score, rng, lang)
             
             # Generate wisdom for today
-            wisdom = self._generate_wisdom()
+            wisdom = self._generate_wisdom(rng, lang)
             
             # Calculate lucky elements
             lucky_elements = self._calculate_lucky_elements(birth_chart, transits)
             
             # Calculate life area forecasts
-            life_areas = self._calculate_life_areas(birth_chart, transits)
+            life_areas = self._calculate_life_areas(influences, rng, lang)
             
             # Generate daily guidance
-            daily_guidance = self._generate_daily_guidance(birth_chart, transits, fortune_score)
+            daily_guidance = self._generate_daily_guidance(rng, lang)
             
             # Compile all results in flat structure
             result = {
@@ -129,11 +383,16 @@ class DailyFortuneCalculator:
                 'lunar_energy_type': lunar_phase_info['energy_type'],
                 'days_to_next_lunar_phase': lunar_phase_info['days_to_next_phase'],
                 'lunar_phase_description': lunar_phase_info['phase_description'],
+                'void_of_course_moon': self._calculate_void_of_course(target_date, target_timezone),
                 
                 # Additional Information
-                'auspicious_hours': self._calculate_auspicious_hours(transits)
+                'auspicious_hours': self._calculate_auspicious_hours(
+                    target_date, target_timezone, current_lat, current_lon, lang)
             }
             
+            if self.cache is not None:
+                self.cache.put(cache_key, result, end_of_day_timestamp(target_date, target_timezone))
+            
             return result
             
         except Exception as e:
@@ -142,6 +401,93 @@ class DailyFortuneCalculator:
                 'error': str(e)
             }
     
+    def find_best_days(self, birth_date, birth_time, birth_lat, birth_lon, start_date, end_date,
+                       area='overall', top_k=5, target_timezone='UTC'):
+        """
+        Rank every day from start_date to end_date for one chart and life area
+        
+        The whole window is scored in one NumPy pass over the range's transit
+        longitudes (see influence.py), rather than one full reading per day.
+        
+        Args:
+            area: 'overall' (fortune score) or a key of BEST_DAY_AREAS
+            top_k: Number of days returned
+        
+        Returns:
+            List of up to top_k dicts (best first) with date, score, rating
+            (1-5 stars for an area, fortune level for overall), lunar phase
+            and the strongest aspects behind the score as reasons
+        """
+        if area != 'overall' and area not in BEST_DAY_AREAS:
+            raise ValueError(f"Unknown area: {area} (expected overall, {', '.join(BEST_DAY_AREAS)})")
+        
+        birth_chart = self.build_birth_chart(birth_date, birth_time, birth_lat, birth_lon)
+        contexts = self.build_range_contexts(start_date, end_date, target_timezone)
+        natal_lons = chart_longitudes(birth_chart)
+        
+        # (days, natal planets) influences for the whole window at once
+        influences = natal_influences(np.array([c['transit_longitudes'] for c in contexts]), natal_lons)
+        
+        if area == 'overall':
+            planets = OVERALL_PLANETS
+            scores = np.array([
+                self._calculate_fortune_score(influences[i], context['lunar_phase']['phase_name'])
+                for i, context in enumerate(contexts)
+            ], dtype=float)
+        else:
+            planets = AREA_PLANETS[BEST_DAY_AREAS[area]]
+            base, low, high = LIFE_AREA_RANGES[BEST_DAY_AREAS[area]]
+            scores = base + np.clip((low + high) / 2 + area_influences(influences)[BEST_DAY_AREAS[area]], low, high)
+        
+        best = []
+        for i in np.argsort(-scores, kind='stable')[:top_k]:
+            context = contexts[i]
+            score = float(scores[i])
+            best.append({
+                'date': context['target_date'],
+                'score': int(score) if area == 'overall' else round(score, 2),
+                'rating': fortune_level(score)[1] if area == 'overall' else self._score_to_stars(score),
+                'lunar_phase_name': context['lunar_phase']['phase_name'],
+                'reasons': aspect_details(context['transit_longitudes'], natal_lons, planets)[:3]
+            })
+        return best
+    
+    def month_calendar(self, birth_date, birth_time, birth_lat, birth_lon, year, month, target_timezone='UTC'):
+        """
+        Fortune score and lunar data for every day of a month, as parallel arrays
+        
+        Transits and lunar phases for the month come from build_range_contexts()
+        and all days are scored in one natal_influences() call.
+        
+        Returns:
+            Dictionary of equal-length lists: dates, fortune_score,
+            lunar_phase_name, lunar_illumination_percent and moon_sign
+        """
+        first = datetime(year, month, 1)
+        last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        contexts = self.build_range_contexts(first.strftime('%Y-%m-%d'), last.strftime('%Y-%m-%d'), target_timezone)
+        birth_chart = self.build_birth_chart(birth_date, birth_time, birth_lat, birth_lon)
+        
+        transit_lons = np.array([c['transit_longitudes'] for c in contexts])
+        influences = natal_influences(transit_lons, chart_longitudes(birth_chart))
+        moon_lons = transit_lons[:, TRANSIT_PLANETS.index(const.MOON)]
+        
+        return {
+            'dates': [c['target_date'] for c in contexts],
+            'fortune_score': [
+                self._calculate_fortune_score(influences[i], c['lunar_phase']['phase_name'])
+                for i, c in enumerate(contexts)
+            ],
+            'lunar_phase_name': [c['lunar_phase']['phase_name'] for c in contexts],
+            'lunar_illumination_percent': [c['lunar_phase']['illumination_percent'] for c in contexts],
+            'moon_sign': [const.LIST_SIGNS[int(lon // 30) % 12] for lon in moon_lons]
+        }
+    
+    def build_birth_chart(self, birth_date, birth_time, birth_lat, birth_lon):
+        """Calculate the natal chart once for reuse across several target dates"""
+        return self._calculate_birth_chart(birth_date, birth_time, birth_lat, birth_lon)
+    
+    @timed_stage('chart_build')
     def _calculate_birth_chart(self, date, time, lat, lon):
         """Calculate birth chart"""
         try:
@@ -169,57 +515,76 @@ class DailyFortuneCalculator:
         except Exception as e:
             raise Exception(f"Birth chart calculation error: {str(e)}")
     
+    @timed_stage('chart_build')
     def _calculate_transits(self, date, timezone='UTC'):
-        """Calculate current planetary transits"""
+        """Planet positions at local noon in the target timezone"""
         try:
-            # Convert date format
-            date_str = date.replace('-', '/')
-            
-            # Use noon UTC for transit calculations
-            date_obj = Datetime(date_str, '12:00:00', '+00:00')
-            pos = GeoPos(0, 0)  # Use equator for general transits
-            
-            # Create transit chart
-            transit_chart = Chart(date_obj, pos, IDs=const.LIST_OBJECTS)
-            return transit_chart
+            # A TransitSnapshot rather than a full Chart, so single-day and
+            # range contexts share one cache and can be saved as snapshots
+            offset = utc_offset_minutes(date, timezone)
+            return transit_snapshots([date], local_noon_hour_utc(offset))[0]
             
         except Exception as e:
             raise Exception(f"Transit calculation error: {str(e)}")
     
-    def _calculate_auspicious_hours(self, transits):
-        """Calculate auspicious hours for the day"""
-        # Simplified calculation based on planetary hours
-        # In a real implementation, this would be more sophisticated
+    def _calculate_auspicious_hours(self, target_date, target_timezone, lat, lon, lang='en'):
+        """Auspicious planetary hours starting in the daytime of target_date (local time)"""
+        try:
+            tz = pytz.timezone(target_timezone)
+        except pytz.UnknownTimeZoneError:
+            tz = pytz.UTC
+        first_hour, last_hour = AUSPICIOUS_HOURS_WINDOW
         
+        # The local day can overlap the planetary days of adjacent UTC dates
+        day = datetime.strptime(target_date, '%Y-%m-%d')
         auspicious_periods = []
-        
-        # Morning meditation period (based on Jupiter influence)
-        jupiter = transits.get(const.JUPITER)
-        if jupiter:
-            auspicious_periods.append({
-                'time_range': '7:00-9:00',
-                'activity': 'Meditation & Planning'
-            })
-        
-        # Business meeting period (based on Mercury influence)
-        mercury = transits.get(const.MERCURY)
-        if mercury:
-            auspicious_periods.append({
-                'time_range': '13:00-15:00',
-                'activity': 'Business Meetings'
-            })
+        for offset in (-1, 0, 1):
+            date = (day + timedelta(days=offset)).strftime('%Y-%m-%d')
+            for start, end, ruler in planetary_hours(date, lat, lon):
+                start, end = start.astimezone(tz), end.astimezone(tz)
+                if ruler not in AUSPICIOUS_PLANETS or start.strftime('%Y-%m-%d') != target_date:
+                    continue
+                if not first_hour <= start.hour < last_hour:
+                    continue
+                auspicious_periods.append({
+                    'time_range': f"{start.hour}:{start.minute:02d}-{end.hour}:{end.minute:02d}",
+                    'activity': get_templates('auspicious_activity', ruler, lang)[0],
+                    'planet': ruler
+                })
         
         return auspicious_periods
     
-    def _calculate_fortune_score(self, birth_chart, transits, lunar_phase):
+    def _calculate_void_of_course(self, target_date, target_timezone):
+        """Void-of-course Moon periods overlapping target_date, as local start/end times"""
+        try:
+            tz = pytz.timezone(target_timezone)
+        except pytz.UnknownTimeZoneError:
+            tz = pytz.UTC
+        day = tz.localize(datetime.strptime(target_date, '%Y-%m-%d'))
+        start_jd = day.timestamp() / 86400 + UNIX_EPOCH_JD
+        end_jd = end_of_day_timestamp(target_date, target_timezone) / 86400 + UNIX_EPOCH_JD
+        
+        def local_time(jd):
+            return datetime.fromtimestamp((jd - UNIX_EPOCH_JD) * 86400, tz).strftime('%Y-%m-%d %H:%M')
+        
+        return [
+            {
+                'start': local_time(period['start']),
+                'end': local_time(period['end']),
+                'moon_enters': period['moon_enters']
+            }
+            for period in void_periods(start_jd, end_jd)
+        ]
+    
+    def _calculate_fortune_score(self, influences, lunar_phase):
         """Calculate overall fortune score (1-100 integer scale)"""
         base_score = 50  # Start from middle point
         
         # Analyze major planetary influences
-        sun_influence = self._analyze_planet_influence(birth_chart, transits, const.SUN)
-        moon_influence = self._analyze_planet_influence(birth_chart, transits, const.MOON)
-        venus_influence = self._analyze_planet_influence(birth_chart, transits, const.VENUS)
-        jupiter_influence = self._analyze_planet_influence(birth_chart, transits, const.JUPITER)
+        sun_influence = self._analyze_planet_influence(influences, const.SUN)
+        moon_influence = self._analyze_planet_influence(influences, const.MOON)
+        venus_influence = self._analyze_planet_influence(influences, const.VENUS)
+        jupiter_influence = self._analyze_planet_influence(influences, const.JUPITER)
         
         # Weight the influences (scale to +/- 40 points)
         total_influence = (sun_influence * 12 + moon_influence * 10 + 
@@ -234,59 +599,21 @@ class DailyFortuneCalculator:
         # Ensure score is within 1-100 range and return as integer
         return int(max(1, min(100, final_score)))
     
-    def _generate_fortune_summary(self, birth_chart, transits, fortune_score):
+    def _generate_fortune_summary(self, fortune_score, rng, lang='en'):
         """Generate detailed fortune summary"""
-        sun_sign = birth_chart.get(const.SUN).sign
-        
-        # Get base description and expand it
-        if fortune_score >= 85:
-            level = "Exceptionally Favorable"
-            descriptions = [
-                "Today's celestial alignment creates an extraordinary environment for creative thinking and meaningful connections. Your communication skills are heightened to remarkable levels, making this an ideal day for important conversations, presentations, and negotiations. The planetary energies are flowing in perfect harmony with your natural tendencies, opening doors that may have seemed closed before. This is one of those rare days when the universe seems to conspire in your favor, so trust your instincts and take bold action.",
-                
-                "The stars have aligned in a particularly auspicious configuration today, bringing forth opportunities that could have lasting positive impact on your life. Your intuitive abilities are exceptionally sharp, allowing you to read between the lines in both personal and professional situations. The cosmic energy supports ambitious endeavors and creative projects, while also enhancing your magnetic appeal to others. Consider this a green light from the universe to pursue what truly matters to you.",
-                
-                "Today marks a powerful convergence of beneficial planetary influences that create an atmosphere ripe for success and fulfillment. Your natural charisma is amplified, drawing positive attention and support from influential people in your sphere. The celestial mechanics are working overtime to bring synchronicities and meaningful coincidences into your path. This is an exceptional day to launch new ventures, express your authentic self, and embrace opportunities that align with your highest aspirations."
-            ]
-        elif fortune_score >= 70:
-            level = "Very Favorable" 
-            descriptions = [
-                "The planetary influences are working in your favor today, creating a supportive backdrop for pursuing your goals with confidence and clarity. Your natural talents shine more brightly than usual, attracting the right kind of attention from people who can help advance your interests. The cosmic currents are flowing smoothly, reducing friction in your daily interactions and making collaboration feel effortless. This is an excellent time to build bridges, strengthen relationships, and make progress on important projects.",
-                
-                "Today brings a harmonious blend of cosmic energies that support both personal growth and professional advancement. Your ability to see the bigger picture is enhanced, helping you make decisions that will benefit you in the long run. The universe is offering gentle nudges in the right direction, so pay attention to subtle signs and synchronicities. Your emotional intelligence is particularly strong today, making it easier to navigate complex social dynamics and forge meaningful connections.",
-                
-                "The celestial atmosphere today is charged with positive potential, creating favorable conditions for manifestation and achievement. Your creative faculties are operating at a higher frequency, allowing innovative solutions to emerge naturally. The planetary aspects support confident self-expression and authentic communication, making others more receptive to your ideas and proposals. This is a day when patience and persistence will yield tangible rewards."
-            ]
-        elif fortune_score >= 55:
-            level = "Moderately Favorable"
-            descriptions = [
-                "Today presents a balanced cosmic landscape that supports both reflection and purposeful action. The planetary energies are neither pushing nor pulling too strongly in any direction, giving you the freedom to choose your own pace and priorities. This steady influence creates ideal conditions for making thoughtful decisions and building solid foundations for future success. Trust your instincts while remaining open to new perspectives and unexpected opportunities that may arise.",
-                
-                "The celestial influences today create a stable platform for steady progress toward your goals. While there may not be dramatic breakthroughs, the consistent energy flow supports sustainable growth and meaningful connections. Your ability to balance different aspects of your life is enhanced, helping you maintain harmony between personal desires and professional responsibilities. This is a good day for consolidating recent gains and planning your next strategic moves.",
-                
-                "Today's astrological climate offers a measured blend of challenge and opportunity that encourages personal development. The planetary aspects create just enough tension to keep you engaged and motivated, while providing sufficient support to ensure your efforts bear fruit. Your diplomatic skills are heightened, making this an excellent time for negotiations, conflict resolution, and collaborative problem-solving. The key to maximizing today's potential lies in maintaining flexibility while staying true to your core values."
-            ]
-        else:
-            level = "Challenging"
-            descriptions = [
-                "While today may present some obstacles and resistance, these challenges offer valuable opportunities for growth, resilience-building, and character development. The planetary tensions are designed to test your resolve and help you discover inner strengths you may not have known you possessed. Approach situations with patience, wisdom, and a willingness to learn from setbacks. Sometimes the universe presents difficulties as a way of redirecting us toward better paths and more authentic expressions of our true selves.",
-                
-                "Today's cosmic climate requires extra mindfulness and strategic thinking as you navigate through potentially turbulent waters. The planetary influences may create friction in your usual routines, pushing you to find creative solutions and alternative approaches. While this energy can feel uncomfortable, it often leads to breakthrough moments and innovative problem-solving. Focus on maintaining your center and responding rather than reacting to challenging circumstances.",
-                
-                "The astrological aspects today are calling for patience, adaptability, and emotional intelligence as you work through various complexities. These cosmic challenges are not punishments but rather opportunities for spiritual and personal evolution. The universe may be asking you to release outdated patterns and embrace new ways of being that better serve your highest good. Trust that current difficulties are temporary and are ultimately guiding you toward greater authenticity and fulfillment."
-            ]
+        level_key, level = fortune_level(fortune_score)
         
         # Randomly select one description to avoid repetition
-        description = random.choice(descriptions)
+        description = rng.choice(get_templates('summary', level_key, lang))
         
         return {
             'level': level,
             'description': description
         }
     
-    def _generate_wisdom(self):
+    def _generate_wisdom(self, rng, lang='en'):
         """Generate wisdom for today"""
-        return random.choice(self.wisdom_templates)
+        return rng.choice(get_templates('wisdom', lang=lang))
     
     def _calculate_lucky_elements(self, birth_chart, transits):
         """Calculate lucky elements for the day"""
@@ -301,8 +628,8 @@ class DailyFortuneCalculator:
             int(venus_pos / 40) + 1   # 1-9
         ]
         
-        # Select colors
-        color_index = hash(str(venus_pos)) % len(self.lucky_colors)
+        # Select colors (by transiting Venus sector, stable across processes)
+        color_index = int(venus_pos / (360 / len(self.lucky_colors))) % len(self.lucky_colors)
         lucky_colors = self.lucky_colors[color_index]
         
         # Select direction
@@ -321,156 +648,57 @@ class DailyFortuneCalculator:
             'lucky_stone': lucky_stone
         }
     
-    def _calculate_life_areas(self, birth_chart, transits):
+    def _calculate_life_areas(self, influences, rng, lang='en'):
         """Calculate life area forecasts with varied analysis"""
-        # Calculate ratings with some variation
-        base_career = 3.5 + random.uniform(-0.5, 1.5)
-        base_love = 3.0 + random.uniform(-0.5, 1.5)
-        base_health = 4.0 + random.uniform(-0.5, 1.0)
-        base_growth = 4.5 + random.uniform(-0.5, 0.5)
-        
-        # Career & Finance variations
-        career_forecasts = [
-            "Today is highly favorable for career advancement with Mercury's influence sharpening your communication skills and strategic thinking. Your creative solutions will be well-received by colleagues and superiors, opening doors to new opportunities. Financial decisions made today have potential for long-term gains, particularly investments in education or technology.",
-            
-            "Professional networking takes center stage today as Jupiter's aspects enhance your ability to connect with influential people in your field. Your natural leadership qualities shine through in group settings, making this an ideal time for presentations or proposals. Consider diversifying your income streams as new revenue opportunities may present themselves unexpectedly.",
-            
-            "Saturn's stabilizing energy supports methodical progress toward your career goals, favoring steady advancement over dramatic leaps. Your reputation for reliability and competence continues to grow, attracting the attention of mentors and potential collaborators. Focus on building systems that will support your long-term financial security.",
-            
-            "Mars energizes your professional ambitions today, giving you the drive to tackle challenging projects that others might avoid. Your competitive edge is sharp, but remember to channel this energy constructively rather than confrontationally. Entrepreneurial ventures receive cosmic support, particularly those involving innovation or technology."
-        ]
-        
-        # Love & Relationships variations  
-        love_forecasts = [
-            "Venus's harmonious aspects enhance your magnetic appeal and emotional intelligence, making you irresistible to potential partners and deepening bonds with existing ones. Singles may find themselves attracting multiple romantic options, while committed couples discover new depths of intimacy through honest communication. Social gatherings prove particularly fruitful for making meaningful connections.",
-            
-            "The Moon's influence heightens your intuitive understanding of others' needs and desires, creating opportunities for profound emotional connections. Existing relationships benefit from your increased empathy and willingness to listen without judgment. For those seeking love, trust your instincts about people you meet - your psychic radar is especially accurate today.",
-            
-            "Pluto's transformative energy may bring intensity to romantic relationships, pushing surface-level connections toward deeper commitment or natural completion. While this might feel overwhelming, these changes ultimately serve your highest good by aligning you with relationships that truly support your growth. Be willing to have difficult but necessary conversations.",
-            
-            "Jupiter's expansive influence encourages you to broaden your social circle and explore new types of relationships or relationship dynamics. Long-distance connections receive special cosmic support, as do relationships that involve cultural exchange or shared learning experiences. Your optimistic energy attracts like-minded souls who share your vision for the future."
-        ]
-        
-        # Health & Wellness variations
-        health_forecasts = [
-            "Your physical vitality receives a boost from Mars's energizing influence, making this an excellent day for starting new fitness routines or tackling physically demanding tasks. Mental clarity is exceptionally high, though you may need to guard against overthinking or analysis paralysis. Pay special attention to your nervous system - calming activities like meditation or gentle yoga will help maintain balance.",
-            
-            "The Moon's connection to your health sector emphasizes the mind-body connection, encouraging you to notice how emotions affect your physical wellbeing. Your digestive system may be more sensitive than usual, so choose nourishing foods that support both your body and mood. Water-based activities or treatments could provide unexpected healing benefits.",
-            
-            "Saturn's influence reminds you that consistency in health habits yields the best long-term results, favoring gradual lifestyle changes over dramatic interventions. Your discipline and commitment to wellness routines strengthen today, making it easier to stick with beneficial practices. Focus on building habits that will serve you for years to come rather than seeking quick fixes.",
-            
-            "Uranus brings innovative approaches to health and wellness into your awareness, encouraging you to experiment with new healing modalities or fitness techniques. Your body may respond unusually well to alternative treatments or cutting-edge therapies. Trust your instincts about what your body needs, even if it differs from conventional wisdom."
-        ]
-        
-        # Personal Growth variations
-        growth_forecasts = [
-            "Today marks a significant phase in your personal evolution as Pluto's transformative energy helps you release outdated beliefs and embrace more authentic ways of being. Your psychological insights are remarkably sharp, allowing you to understand patterns that have been limiting your growth. This is an ideal time for therapy, journaling, or any practice that promotes self-awareness and emotional healing.",
-            
-            "Jupiter's wisdom-enhancing influence expands your philosophical understanding and spiritual awareness, opening new pathways for personal development. Your ability to see the bigger picture helps you make sense of recent challenges and recognize how they've contributed to your growth. Teaching or mentoring others could provide unexpected insights about your own journey.",
-            
-            "Neptune's intuitive influence heightens your connection to your inner wisdom and creative potential, making this an excellent time for artistic pursuits or spiritual practices. Your dreams and meditation experiences may contain important messages about your path forward. Trust the subtle guidance you receive through non-rational channels.",
-            
-            "Mercury's influence supports learning new skills or subjects that genuinely fascinate you, particularly those involving communication, technology, or problem-solving. Your mental agility is enhanced, making it easier to absorb complex information and make innovative connections between different areas of knowledge. Consider taking a class or workshop that challenges your intellect."
-        ]
-        
-        # Tips variations
-        career_tips = [
-            "Schedule important meetings during your auspicious hours (1-3 PM) for maximum impact and receptivity from colleagues.",
-            "Document your innovative ideas today - they have the potential to become valuable intellectual property.",
-            "Network authentically rather than transactionally; genuine connections will serve you better than superficial ones.",
-            "Focus on problem-solving rather than problem-finding; your solutions-oriented approach will be noticed and appreciated."
-        ]
-        
-        love_tips = [
-            "Wear blue or purple to enhance your natural charisma and magnetic appeal in social situations.",
-            "Practice vulnerability in your relationships - authentic sharing deepens bonds more than trying to appear perfect.",
-            "Listen with your heart as much as your head during important conversations with loved ones.",
-            "Plan a surprise gesture that shows thoughtfulness rather than expense - it's the intention that matters most."
-        ]
-        
-        health_tips = [
-            "A morning meditation or gentle yoga session will help balance your energy for the day ahead.",
-            "Stay hydrated and choose foods that support both your physical energy and emotional wellbeing.",
-            "Take regular breaks from screens to rest your eyes and nervous system throughout the day.",
-            "Spend time in nature if possible - even a brief walk outdoors can reset your energy and mood."
-        ]
-        
-        growth_tips = [
-            "Set aside time for brainstorming or working on a creative project to maximize today's inspirational energy.",
-            "Journal about recent experiences to extract valuable lessons and insights for future growth.",
-            "Practice mindfulness during routine activities to discover new perspectives on familiar situations.",
-            "Engage with material that challenges your current worldview - growth often comes through gentle discomfort."
-        ]
+        # Ratings follow the transits to each area's natal planets, centred
+        # on the middle of the area's range when nothing is in aspect
+        area_scores = {}
+        for area, influence in area_influences(influences).items():
+            base, low, high = LIFE_AREA_RANGES[area]
+            area_scores[area] = base + min(high, max(low, (low + high) / 2 + float(influence)))
+        base_career = area_scores['career_finance']
+        base_love = area_scores['love_relationships']
+        base_health = area_scores['health_wellness']
+        base_growth = area_scores['personal_growth']
         
         return {
             'career_finance': {
                 'rating': self._score_to_stars(base_career),
-                'forecast': random.choice(career_forecasts),
-                'tip': random.choice(career_tips)
+                'forecast': rng.choice(get_templates('career_forecast', lang=lang)),
+                'tip': rng.choice(get_templates('career_tip', lang=lang))
             },
             'love_relationships': {
                 'rating': self._score_to_stars(base_love),
-                'forecast': random.choice(love_forecasts),
-                'tip': random.choice(love_tips)
+                'forecast': rng.choice(get_templates('love_forecast', lang=lang)),
+                'tip': rng.choice(get_templates('love_tip', lang=lang))
             },
             'health_wellness': {
                 'rating': self._score_to_stars(base_health),
-                'forecast': random.choice(health_forecasts),
-                'tip': random.choice(health_tips)
+                'forecast': rng.choice(get_templates('health_forecast', lang=lang)),
+                'tip': rng.choice(get_templates('health_tip', lang=lang))
             },
             'personal_growth': {
                 'rating': self._score_to_stars(base_growth),
-                'forecast': random.choice(growth_forecasts),
-                'tip': random.choice(growth_tips)
+                'forecast': rng.choice(get_templates('growth_forecast', lang=lang)),
+                'tip': rng.choice(get_templates('growth_tip', lang=lang))
             }
         }
     
-    def _generate_daily_guidance(self, birth_chart, transits, fortune_score):
+    def _generate_daily_guidance(self, rng, lang='en'):
         """Generate comprehensive daily guidance"""
-        sun_sign = birth_chart.get(const.SUN).sign
-        
-        # Expanded focus descriptions based on astrological influences
-        focus_options = [
-            "Today's cosmic energy strongly favors career advancement and financial growth, with planetary alignments creating opportune moments for presenting your ideas to decision-makers. Your creative problem-solving abilities are heightened, making colleagues and superiors more receptive to your innovative approaches. The universe is opening doors to long-term prosperity, so focus on building relationships that will serve your professional goals for years to come. Trust your instincts when it comes to investment opportunities or career moves that seem aligned with your deeper purpose.",
-            
-            "The celestial influences today create a powerful backdrop for meaningful relationship building and authentic self-expression in all areas of your life. Your natural charisma and communication skills are amplified, drawing people toward you who can offer valuable insights, opportunities, or genuine friendship. Focus on deepening existing connections rather than spreading your energy too thin across surface-level interactions. The universe is supporting heart-centered conversations that could lead to significant personal or professional breakthroughs.",
-            
-            "Today brings exceptional clarity for strategic planning and visionary thinking, with planetary aspects supporting your ability to see both immediate opportunities and long-term potential. Your analytical capabilities are sharp, while your intuitive faculties provide crucial insights that pure logic might miss. Focus on projects that require both creative inspiration and practical execution, as you're uniquely positioned to bridge these domains. The cosmic energy supports ambitious goal-setting and the development of comprehensive action plans.",
-            
-            "The astrological climate today strongly supports learning, teaching, and knowledge-sharing activities that could have far-reaching positive impact. Your ability to synthesize complex information and present it in accessible ways is enhanced, making this an ideal time for presentations, workshops, or mentoring relationships. Focus on expanding your expertise in areas that genuinely fascinate you, as passionate learning today could open unexpected career doors tomorrow. The universe is supporting your role as both student and teacher in the grand scheme of life."
-        ]
-        
-        # Expanded challenge descriptions
-        challenge_options = [
-            "Venus and Mercury's current aspects may create temporary communication misunderstandings, particularly in close relationships where emotions run high and expectations aren't clearly articulated. Practice active listening and avoid making assumptions about others' motivations or intentions during conversations that feel charged or sensitive. The key to navigating these cosmic crosscurrents lies in speaking your truth with compassion while remaining genuinely curious about perspectives that differ from your own. Remember that what feels like conflict today may actually be the universe's way of deepening intimacy and understanding.",
-            
-            "Mars's influence today could manifest as impatience or frustration with processes that seem unnecessarily slow or bureaucratic, testing your ability to maintain grace under pressure. The cosmic energy may amplify your desire for immediate results, but the universe is actually teaching valuable lessons about timing, persistence, and strategic patience. Channel any restless energy into productive activities like physical exercise, creative projects, or detailed planning for future endeavors. Sometimes apparent delays are actually perfect timing in disguise.",
-            
-            "Saturn's aspect today may bring encounters with authority figures or institutional structures that challenge your preferred way of operating, requiring diplomacy and adaptive thinking. The universe is presenting opportunities to refine your approach to rules, boundaries, and hierarchical relationships in ways that ultimately serve your long-term goals. Focus on finding win-win solutions rather than engaging in power struggles that drain your energy without creating meaningful change. These cosmic lessons in patience and strategy will pay dividends in future leadership situations.",
-            
-            "Jupiter's current position may create overconfidence or a tendency to overcommit to too many projects simultaneously, potentially spreading your energy too thin across multiple fronts. The challenge lies in maintaining enthusiasm and optimism while exercising practical discernment about which opportunities truly deserve your precious time and attention. The universe is teaching you the art of conscious choice-making and the power that comes from focusing deeply rather than broadly. Sometimes saying no to good opportunities creates space for great ones to emerge."
-        ]
-        
         # Randomly select from options to create variety
-        focus = random.choice(focus_options)
-        challenges = random.choice(challenge_options)
+        focus = rng.choice(get_templates('focus', lang=lang))
+        challenges = rng.choice(get_templates('challenge', lang=lang))
         
         return {
             'focus_of_the_day': focus,
             'challenges_to_navigate': challenges
         }
     
-    def _analyze_planet_influence(self, birth_chart, transits, planet_id):
-        """Analyze planetary influence"""
-        try:
-            birth_planet = birth_chart.get(planet_id)
-            transit_planet = transits.get(planet_id)
-            
-            # Basic influence calculation
-            influence = random.uniform(-1.0, 2.0)
-            return influence
-        except:
-            return 0.0
+    def _analyze_planet_influence(self, influences, planet_id):
+        """Net transit influence on a natal planet, on a -1.0 to 2.0 scale (0.5 when unaspected)"""
+        influence = 0.5 + float(influences[NATAL_INDEX[planet_id]])
+        return max(-1.0, min(2.0, influence))
     
     def _get_lunar_phase_bonus(self, lunar_phase):
         """Get bonus based on lunar phase"""
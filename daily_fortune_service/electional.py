@@ -0,0 +1,308 @@
+"""
+Electional time-window search
+
+A query such as "Moon waxing, not void of course, Mercury direct and Venus
+well aspected" is answered with interval arithmetic rather than per-minute
+charts. Each predicate is turned into a sorted list of disjoint (start, end)
+intervals over the search window, read from the precomputed event tables:
+
+- lunar phases: the phase event table (lunar_table.py)
+- sign ingresses and stations: the yearly event calendar (event_calendar.py)
+- void-of-course Moon: the yearly interval table (void_of_course.py)
+- aspects between transiting bodies ("well aspected"): exact orb crossings
+  on the interpolated ephemeris (transit_events.py), kept as yearly
+  interval tables here
+
+and a query combines them with intersection, union and complement, so a
+search over months costs a few bisects and list merges.
+
+Queries are predicate names (see predicate_names()) or nested
+{"all": [...]}, {"any": [...]} and {"not": ...} expressions; a list is "all".
+"""
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import swisseph
+from flatlib import const
+from flatlib.ephem.swe import SWE_OBJECTS
+
+from .event_calendar import CALENDAR_OBJECTS, calendar_events, year_bounds, year_table
+from .influence import ASPECT_ANGLES, ASPECT_NAMES, TRANSIT_PLANETS
+from .lunar_table import get_phase_table
+from .transit_events import TABLE_STEP_DAYS, DEFAULT_TABLE_STEP_DAYS, NON_STATIONING, EphemerisTable
+from .transit_events import point_crossings
+from .void_of_course import void_periods
+
+# Orb of the aspects behind "well aspected" (degrees)
+WELL_ASPECTED_ORB = 3.0
+
+# Aspects that make a body well aspected from any other planet, and
+# conjunctions that do so from the benefics
+HARMONIOUS_ASPECTS = ('Sextile', 'Trine')
+BENEFICS = (const.VENUS, const.JUPITER)
+
+# Aspects from the malefics that cancel it
+HARD_ASPECTS = ('Conjunction', 'Square', 'Opposition')
+MALEFICS = (const.MARS, const.SATURN)
+
+# Bodies with direct/retrograde predicates
+STATIONING_OBJECTS = tuple(obj for obj in CALENDAR_OBJECTS if obj not in NON_STATIONING)
+
+
+# Interval arithmetic on sorted lists of disjoint (start, end) tuples
+
+def normalize(intervals):
+    """Sort intervals and merge overlapping or touching ones; empty intervals are dropped"""
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect(a, b):
+    """Intersection of two normalized interval lists"""
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def union(a, b):
+    """Union of two normalized interval lists"""
+    return normalize(a + b)
+
+
+def complement(intervals, start_jd, end_jd):
+    """[start_jd, end_jd) minus a normalized interval list"""
+    result = []
+    cursor = start_jd
+    for start, end in intervals:
+        if start > cursor:
+            result.append((cursor, min(start, end_jd)))
+        cursor = max(cursor, end)
+        if cursor >= end_jd:
+            break
+    if cursor < end_jd:
+        result.append((cursor, end_jd))
+    return [(start, end) for start, end in result if start < end]
+
+
+def _toggle_intervals(start_jd, end_jd, active, times):
+    """Intervals of a state that is active at start_jd and flips at each of the sorted times"""
+    intervals = []
+    opened = start_jd if active else None
+    for jd in times:
+        if opened is None:
+            opened = jd
+        else:
+            intervals.append((opened, jd))
+            opened = None
+    if opened is not None:
+        intervals.append((opened, end_jd))
+    return normalize(intervals)
+
+
+# Predicates: (start_jd, end_jd) -> normalized interval list
+
+def moon_phase_intervals(start_jd, end_jd, waxing=True):
+    """Waxing (new moon to full moon) or waning (full moon to new moon) periods"""
+    jds, first_phase = get_phase_table()
+    opening = 0 if waxing else 2
+    # From the opening event of the half cycle under way at start_jd (at most
+    # three events back) to the first event after the window
+    first = max(bisect_right(jds, start_jd) - 3, 0)
+    last = min(bisect_left(jds, end_jd) + 1, len(jds) - 1)
+    intervals = []
+    for i in range(first, last + 1):
+        if (first_phase + i) % 4 == opening and i + 2 < len(jds):
+            intervals.append((max(jds[i], start_jd), min(jds[i + 2], end_jd)))
+    return normalize(intervals)
+
+
+def void_intervals(start_jd, end_jd):
+    """Void-of-course Moon periods"""
+    return normalize([
+        (max(period['start'], start_jd), min(period['end'], end_jd))
+        for period in void_periods(start_jd, end_jd)
+    ])
+
+
+def direct_intervals(obj, start_jd, end_jd):
+    """Periods in which a body moves direct"""
+    direct = swisseph.calc_ut(start_jd, SWE_OBJECTS[obj])[0][3] >= 0
+    stations = [event['jd'] for event in calendar_events(start_jd, end_jd, ('station',), (obj,))]
+    return _toggle_intervals(start_jd, end_jd, direct, stations)
+
+
+def sign_intervals(obj, sign, start_jd, end_jd):
+    """Periods in which a body is in a sign"""
+    if obj == const.SOUTH_NODE:
+        lon = (swisseph.calc_ut(start_jd, SWE_OBJECTS[const.NORTH_NODE])[0][0] + 180.0) % 360.0
+    else:
+        lon = swisseph.calc_ut(start_jd, SWE_OBJECTS[obj])[0][0]
+    initially_inside = const.LIST_SIGNS[int(lon // 30) % 12] == sign
+    inside = initially_inside
+    times = []
+    for event in calendar_events(start_jd, end_jd, ('ingress',), (obj,)):
+        # Entering the sign, or entering another sign from it
+        if (event['sign'] == sign) != inside:
+            times.append(event['jd'])
+            inside = not inside
+    return _toggle_intervals(start_jd, end_jd, initially_inside, times)
+
+
+def aspect_intervals(table, obj, other, angle, orb, start_jd, end_jd):
+    """Periods in which two bodies are within orb of an aspect angle"""
+    # Scan on the finer of the two grids
+    if TABLE_STEP_DAYS.get(other, DEFAULT_TABLE_STEP_DAYS) < TABLE_STEP_DAYS.get(obj, DEFAULT_TABLE_STEP_DAYS):
+        obj, other = other, obj
+    intervals = []
+    for point in sorted({float(angle) % 360.0, float(-angle) % 360.0}):
+        separation = table.longitude(obj, start_jd) - table.longitude(other, start_jd)
+        inside = abs((separation - point + 180.0) % 360.0 - 180.0) <= orb
+        times, _ = point_crossings(table, obj, np.array([point - orb, point + orb]) % 360.0, relative_to=other)
+        times = sorted(jd for jd in times.tolist() if start_jd <= jd < end_jd)
+        intervals += _toggle_intervals(start_jd, end_jd, inside, times)
+    return normalize(intervals)
+
+
+def build_well_aspected(obj, start_jd, end_jd, orb=WELL_ASPECTED_ORB):
+    """
+    Periods in which a body is well aspected: within orb of a sextile or
+    trine to another planet (or conjunct a benefic) and of no hard aspect
+    from a malefic
+    """
+    angles = dict(zip(ASPECT_NAMES, ASPECT_ANGLES))
+    others = [planet for planet in TRANSIT_PLANETS if planet != obj]
+    table = EphemerisTable(start_jd, end_jd, [obj] + others)
+    good, bad = [], []
+    for other in others:
+        for aspect in HARMONIOUS_ASPECTS + (('Conjunction',) if other in BENEFICS else ()):
+            good = union(good, aspect_intervals(table, obj, other, angles[aspect], orb, start_jd, end_jd))
+        if other in MALEFICS:
+            for aspect in HARD_ASPECTS:
+                bad = union(bad, aspect_intervals(table, obj, other, angles[aspect], orb, start_jd, end_jd))
+    return intersect(good, complement(bad, start_jd, end_jd))
+
+
+def well_aspected_kind(obj):
+    """Name of a body's yearly well-aspected tables (see event_calendar.year_table)"""
+    return f'well-aspected-{_predicate_key(obj)}'
+
+
+def build_well_aspected_year(obj, year):
+    """Columns (start, end) of a body's well-aspected periods in a year"""
+    intervals = build_well_aspected(obj, *year_bounds(year))
+    return {
+        'start': np.array([start for start, _ in intervals], dtype=float),
+        'end': np.array([end for _, end in intervals], dtype=float)
+    }
+
+
+def _to_intervals(columns):
+    return list(zip(columns['start'].tolist(), columns['end'].tolist()))
+
+
+def well_aspected_intervals(obj, start_jd, end_jd):
+    """Well-aspected periods of a body, from its yearly interval tables"""
+    intervals = []
+    for year in range(int(swisseph.revjul(start_jd)[0]), int(swisseph.revjul(end_jd)[0]) + 1):
+        intervals += year_table(well_aspected_kind(obj), year,
+                                lambda year: build_well_aspected_year(obj, year), _to_intervals)
+    # Periods running over New Year are split in the yearly tables and merge again here
+    return intersect(normalize(intervals), [(start_jd, end_jd)])
+
+
+def _predicate_key(obj):
+    return obj.lower().replace(' ', '_')
+
+
+def _build_predicates():
+    predicates = {
+        'moon_waxing': lambda start, end: moon_phase_intervals(start, end, True),
+        'moon_waning': lambda start, end: moon_phase_intervals(start, end, False),
+        'moon_void': void_intervals,
+        'moon_not_void': lambda start, end: complement(void_intervals(start, end), start, end),
+    }
+    for obj in STATIONING_OBJECTS:
+        key = _predicate_key(obj)
+        predicates[f'{key}_direct'] = lambda start, end, obj=obj: direct_intervals(obj, start, end)
+        predicates[f'{key}_retrograde'] = (
+            lambda start, end, obj=obj: complement(direct_intervals(obj, start, end), start, end))
+    for obj in CALENDAR_OBJECTS:
+        for sign in const.LIST_SIGNS:
+            predicates[f'{_predicate_key(obj)}_in_{sign.lower()}'] = (
+                lambda start, end, obj=obj, sign=sign: sign_intervals(obj, sign, start, end))
+    for obj in TRANSIT_PLANETS:
+        predicates[f'{_predicate_key(obj)}_well_aspected'] = (
+            lambda start, end, obj=obj: well_aspected_intervals(obj, start, end))
+    return predicates
+
+
+PREDICATES = _build_predicates()
+
+
+def predicate_names():
+    return sorted(PREDICATES)
+
+
+def evaluate(query, start_jd, end_jd):
+    """
+    Interval list of a query over [start_jd, end_jd)
+
+    Raises:
+        ValueError: for unknown predicates or malformed expressions
+    """
+    if isinstance(query, str):
+        if query not in PREDICATES:
+            raise ValueError(f"Unknown predicate: {query}")
+        return PREDICATES[query](start_jd, end_jd)
+    if isinstance(query, list):
+        query = {'all': query}
+    if not isinstance(query, dict) or len(query) != 1:
+        raise ValueError(f"Malformed query: {query!r}")
+
+    operator, operand = next(iter(query.items()))
+    if operator == 'not':
+        return complement(evaluate(operand, start_jd, end_jd), start_jd, end_jd)
+    if operator == 'all':
+        result = [(start_jd, end_jd)]
+        for item in operand:
+            result = intersect(result, evaluate(item, start_jd, end_jd))
+            if not result:
+                break
+        return result
+    if operator == 'any':
+        result = []
+        for item in operand:
+            result = union(result, evaluate(item, start_jd, end_jd))
+        return result
+    raise ValueError(f"Unknown operator: {operator}")
+
+
+def electional_search(query, start_jd, end_jd, min_duration=0.0):
+    """
+    Windows in [start_jd, end_jd) satisfying a query
+
+    Args:
+        query: predicate name, list (all of) or {"all"/"any"/"not": ...} expression
+        min_duration: shortest window returned (days)
+
+    Returns:
+        Sorted list of disjoint (start, end) Julian day pairs
+    """
+    return [(start, end) for start, end in evaluate(query, start_jd, end_jd) if end - start >= min_duration]
@@ -0,0 +1,134 @@
+"""
+Lightweight transit ephemeris for multi-day calculations
+
+A full flatlib Chart also computes houses, angles, Syzygy and the Part of
+Fortune, none of which the daily fortune uses from the transit chart.
+This module calls the Swiss Ephemeris directly for the planets only and
+returns positions for a whole date range as NumPy arrays. swisseph takes
+one Julian day per call, so this is still one calc_ut() per (date, body);
+what is batched is the date contexts, not the ephemeris evaluation.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import swisseph
+from flatlib import const
+from flatlib.ephem.swe import SWE_OBJECTS
+from flatlib.object import Object
+
+
+# Objects available in a TransitSnapshot (South Node is derived from North Node)
+TRANSIT_OBJECTS = (
+    const.SUN, const.MOON, const.MERCURY, const.VENUS, const.MARS,
+    const.JUPITER, const.SATURN, const.URANUS, const.NEPTUNE, const.PLUTO,
+    const.CHIRON, const.NORTH_NODE
+)
+
+
+def date_range(start_date, end_date):
+    """List of YYYY-MM-DD strings from start_date to end_date inclusive"""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    return [(start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range((end - start).days + 1)]
+
+
+def julian_days(dates, hour_utc=12.0):
+    """
+    Julian days (UT) for a list of YYYY-MM-DD dates at the given UTC hour
+
+    hour_utc is one hour for every date or a sequence with one per date; it
+    may fall outside 0-24 (e.g. local noon east of UTC is before 12:00 UT).
+    """
+    hours = np.broadcast_to(np.asarray(hour_utc, dtype=float), (len(dates),))
+    jds = np.empty(len(dates))
+    for i, date in enumerate(dates):
+        year, month, day = (int(part) for part in date.split('-'))
+        jds[i] = swisseph.julday(year, month, day, float(hours[i]))
+    return jds
+
+
+def planet_positions(jds, objects=TRANSIT_OBJECTS):
+    """
+    Ecliptic positions for every (day, object) pair
+
+    One swisseph.calc_ut() call per pair (the library has no array form).
+
+    Returns:
+        Tuple of (lon, lat, lonspeed, latspeed) arrays shaped (len(jds), len(objects))
+    """
+    result = np.empty((4, len(jds), len(objects)))
+    for j, obj in enumerate(objects):
+        swe_id = SWE_OBJECTS[obj]
+        for i, jd in enumerate(jds):
+            values, _ = swisseph.calc_ut(float(jd), swe_id)
+            result[0, i, j] = values[0]
+            result[1, i, j] = values[1]
+            result[2, i, j] = values[3]
+            result[3, i, j] = values[4]
+    return result[0], result[1], result[2], result[3]
+
+
+class TransitSnapshot:
+    """
+    Planet positions for one moment, exposing the chart.get(ID) interface
+    the fortune calculator uses on transit charts
+    """
+
+    def __init__(self, objects, lon, lat, lonspeed, latspeed):
+        self._index = {obj: i for i, obj in enumerate(objects)}
+        self._lon = lon
+        self._lat = lat
+        self._lonspeed = lonspeed
+        self._latspeed = latspeed
+        self._cache = {}
+
+    def to_dict(self):
+        """JSON-serializable form, restored with TransitSnapshot.from_dict()"""
+        objects = sorted(self._index, key=self._index.get)
+        return {
+            'objects': objects,
+            'lon': [float(v) for v in self._lon],
+            'lat': [float(v) for v in self._lat],
+            'lonspeed': [float(v) for v in self._lonspeed],
+            'latspeed': [float(v) for v in self._latspeed]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            tuple(data['objects']),
+            np.array(data['lon']), np.array(data['lat']),
+            np.array(data['lonspeed']), np.array(data['latspeed'])
+        )
+
+    def get(self, ID):
+        """Return a flatlib Object for the given ID, or None if not computed"""
+        if ID in self._cache:
+            return self._cache[ID]
+        source = const.NORTH_NODE if ID == const.SOUTH_NODE else ID
+        i = self._index.get(source)
+        if i is None:
+            return None
+        lon = float(self._lon[i])
+        if ID == const.SOUTH_NODE:
+            lon = (lon + 180) % 360
+        obj = Object.fromDict({
+            'id': ID,
+            'lon': lon,
+            'lat': float(self._lat[i]),
+            'lonspeed': float(self._lonspeed[i]),
+            'latspeed': float(self._latspeed[i]),
+            'sign': const.LIST_SIGNS[int(lon / 30) % 12],
+            'signlon': lon % 30
+        })
+        self._cache[ID] = obj
+        return obj
+
+
+def transit_snapshots(dates, hour_utc=12.0, objects=TRANSIT_OBJECTS):
+    """One TransitSnapshot per date, from one planet_positions() call (see julian_days for hour_utc)"""
+    lon, lat, lonspeed, latspeed = planet_positions(julian_days(dates, hour_utc), objects)
+    return [
+        TransitSnapshot(objects, lon[i], lat[i], lonspeed[i], latspeed[i])
+        for i in range(len(dates))
+    ]
@@ -0,0 +1,159 @@
+"""
+Yearly calendar of sign ingresses and retrograde stations
+
+Every sign ingress and station of CALENDAR_OBJECTS in a calendar year (UT)
+is found once with the transit event engine and saved as one compressed
+NumPy file per year under EVENT_CALENDAR_DIR, so other workers and restarts
+load it directly. Events are kept sorted by time; a range query is two
+bisects per year touched. Other yearly tables (void_of_course.py) are
+cached and persisted the same way through year_table(). Years can be
+prebuilt as a deploy step with:
+
+    python -m daily_fortune_service.cli event-calendar --year 2026 [--years 2]
+"""
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+
+import numpy as np
+import swisseph
+from flatlib import const
+
+from cache_service import atomic_write
+from monitoring_service import get_logger
+from .transit_events import transit_events
+
+logger = get_logger('daily')
+
+
+# Bodies of const.LIST_OBJECTS with an ephemeris position (Syzygy and the
+# Part of Fortune are chart points that depend on a birth time and place)
+CALENDAR_OBJECTS = tuple(obj for obj in const.LIST_OBJECTS if obj not in (const.SYZYGY, const.PARS_FORTUNA))
+
+CALENDAR_EVENT_TYPES = ('ingress', 'station')
+
+# Bump when the file layout or the event engine changes, so stale years are rebuilt
+CALENDAR_FORMAT_VERSION = 1
+
+DEFAULT_EVENT_CALENDAR_DIR = os.path.join(tempfile.gettempdir(), 'star-api-event-calendar')
+
+_years = {}
+_years_lock = threading.Lock()
+
+
+def year_bounds(year):
+    """Julian days (UT) of Jan 1 00:00 of year and of the next year"""
+    return swisseph.julday(year, 1, 1, 0.0), swisseph.julday(year + 1, 1, 1, 0.0)
+
+
+def build_year_events(year):
+    """
+    Ingresses and stations of every calendar object in a year
+
+    Returns:
+        Dictionary of parallel arrays sorted by jd: jd, type (index in
+        CALENDAR_EVENT_TYPES), object (index in CALENDAR_OBJECTS), sign (index
+        in const.LIST_SIGNS, -1 for stations), retrograde (direction of the
+        ingress, or the motion that starts at the station) and longitude
+        (stations; NaN for ingresses)
+    """
+    start_jd, end_jd = year_bounds(year)
+    events = [
+        event for event in transit_events(start_jd, end_jd, CALENDAR_OBJECTS, types=CALENDAR_EVENT_TYPES)
+        if event['jd'] < end_jd
+    ]
+    return {
+        'jd': np.array([event['jd'] for event in events], dtype=float),
+        'type': np.array([CALENDAR_EVENT_TYPES.index(event['type']) for event in events], dtype=np.int8),
+        'object': np.array([CALENDAR_OBJECTS.index(event['object']) for event in events], dtype=np.int8),
+        'sign': np.array([const.LIST_SIGNS.index(event['sign']) if 'sign' in event else -1
+                          for event in events], dtype=np.int8),
+        'retrograde': np.array([event['direction'] == 'retrograde' for event in events], dtype=bool),
+        'longitude': np.array([event.get('longitude', np.nan) for event in events], dtype=float)
+    }
+
+
+def calendar_path(year, directory=None, kind='ingresses'):
+    """File of one year's table of a kind ('ingresses', 'void-of-course')"""
+    directory = directory or os.environ.get('EVENT_CALENDAR_DIR', DEFAULT_EVENT_CALENDAR_DIR)
+    return os.path.join(directory, f'{kind}-{year}.npz')
+
+
+def save_year_columns(path, columns):
+    """Save a dictionary of parallel arrays, tagged with CALENDAR_FORMAT_VERSION"""
+    with atomic_write(path) as f:
+        np.savez_compressed(f, version=CALENDAR_FORMAT_VERSION, **columns)
+
+
+def load_year_columns(path):
+    with np.load(path) as data:
+        if int(data['version']) != CALENDAR_FORMAT_VERSION:
+            raise ValueError(f"Event calendar {path} has an old format")
+        return {name: data[name] for name in data.files if name != 'version'}
+
+
+def year_table(kind, year, build, prepare):
+    """
+    A year's table of a kind, loaded or built (and saved) once per process
+
+    build(year) returns the columns to persist; prepare(columns) turns them
+    into the in-memory form that is cached and returned.
+    """
+    cached = _years.get((kind, year))
+    if cached is not None:
+        return cached
+    with _years_lock:
+        cached = _years.get((kind, year))
+        if cached is not None:
+            return cached
+        path = calendar_path(year, kind=kind)
+        try:
+            columns = load_year_columns(path)
+        except (OSError, ValueError, KeyError):
+            columns = build(year)
+            try:
+                save_year_columns(path, columns)
+            except OSError as e:
+                logger.warning("Could not save event calendar to %s: %s", path, e)
+        _years[(kind, year)] = prepare(columns)
+        return _years[(kind, year)]
+
+
+def _to_events(columns):
+    """Columns -> (jds list for bisect, event dicts)"""
+    events = []
+    for jd, kind, obj, sign, retrograde, lon in zip(
+            columns['jd'].tolist(), columns['type'].tolist(), columns['object'].tolist(),
+            columns['sign'].tolist(), columns['retrograde'].tolist(), columns['longitude'].tolist()):
+        event = {
+            'type': CALENDAR_EVENT_TYPES[kind],
+            'jd': jd,
+            'object': CALENDAR_OBJECTS[obj],
+            'direction': 'retrograde' if retrograde else 'direct'
+        }
+        if sign >= 0:
+            event['sign'] = const.LIST_SIGNS[sign]
+        else:
+            event['longitude'] = lon
+        events.append(event)
+    return [event['jd'] for event in events], events
+
+
+def get_year_events(year):
+    """(sorted jds, event dicts) of a year's ingresses and stations"""
+    return year_table('ingresses', year, build_year_events, _to_events)
+
+
+def calendar_events(start_jd, end_jd, types=CALENDAR_EVENT_TYPES, objects=CALENDAR_OBJECTS):
+    """Ingress and station events with start_jd <= jd < end_jd, in time order"""
+    first_year = int(swisseph.revjul(start_jd)[0])
+    last_year = int(swisseph.revjul(end_jd)[0])
+    result = []
+    for year in range(first_year, last_year + 1):
+        jds, events = get_year_events(year)
+        for event in events[bisect_left(jds, start_jd):bisect_left(jds, end_jd)]:
+            if event['type'] in types and event['object'] in objects:
+                result.append(event)
+    return result
+
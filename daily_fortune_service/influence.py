@@ -0,0 +1,142 @@
+"""
+Transit-to-natal influence engine
+
+Scores every aspect between transiting and natal planets in one NumPy pass.
+The separation matrix (transit x natal) is compared against each aspect angle
+at once; aspects within orb contribute weight * closeness * polarity, summed
+per natal planet. Natal longitudes may be a 2-D array (users x planets), so a
+whole subscriber batch is scored with the same call; likewise transit
+longitudes may be 2-D (days x planets) to score a date range for one chart.
+"""
+import numpy as np
+from flatlib import const
+
+
+# Transiting planets considered, and their relative weight (slow planets mark longer, stronger periods)
+TRANSIT_PLANETS = (
+    const.SUN, const.MOON, const.MERCURY, const.VENUS, const.MARS,
+    const.JUPITER, const.SATURN, const.URANUS, const.NEPTUNE, const.PLUTO
+)
+TRANSIT_WEIGHTS = np.array([1.0, 0.6, 0.8, 0.9, 1.0, 1.2, 1.2, 0.9, 0.8, 0.9])
+
+# Nature of each transiting planet, used as the polarity of conjunctions
+TRANSIT_NATURE = np.array([0.5, 0.3, 0.2, 1.0, -0.6, 1.0, -0.8, -0.3, -0.1, -0.4])
+
+# Natal planets receiving transits, and their weight in the chart
+NATAL_PLANETS = TRANSIT_PLANETS
+NATAL_WEIGHTS = np.array([1.2, 1.1, 0.8, 0.9, 0.8, 0.9, 0.8, 0.6, 0.5, 0.5])
+
+# Major aspects: angle, orb (degrees) and polarity (conjunctions take the planet's nature)
+ASPECT_ANGLES = np.array([0.0, 60.0, 90.0, 120.0, 180.0])
+ASPECT_ORBS = np.array([6.0, 3.0, 5.0, 5.0, 6.0])
+ASPECT_POLARITY = np.array([0.0, 0.6, -0.8, 0.9, -0.7])
+ASPECT_NAMES = ('Conjunction', 'Sextile', 'Square', 'Trine', 'Opposition')
+
+# Natal planets feeding each life-area rating
+AREA_PLANETS = {
+    'career_finance': (const.SUN, const.SATURN, const.JUPITER, const.MERCURY),
+    'love_relationships': (const.VENUS, const.MOON, const.MARS),
+    'health_wellness': (const.SUN, const.MARS, const.MOON),
+    'personal_growth': (const.JUPITER, const.MERCURY, const.NEPTUNE, const.PLUTO),
+}
+
+# Column index of each natal planet
+NATAL_INDEX = {planet: i for i, planet in enumerate(NATAL_PLANETS)}
+
+
+def chart_longitudes(chart, planets=TRANSIT_PLANETS):
+    """Longitudes of the given planets from a chart (or TransitSnapshot) as an array"""
+    return np.array([chart.get(planet).lon for planet in planets])
+
+
+def aspect_closeness(transit_lons, natal_lons):
+    """
+    Closeness to exact (1 = exact, 0 = out of orb) of every aspect per (transit, natal) pair
+
+    Args:
+        transit_lons: shape (T,) or (D, T) transit longitudes
+        natal_lons: shape (N,) or (U, N) natal longitudes; at most one of
+            the two may be 2-D
+
+    Returns:
+        Array shaped (..., T, N, A) over ASPECT_ANGLES
+    """
+    transit_lons = np.asarray(transit_lons, dtype=float)
+    natal_lons = np.asarray(natal_lons, dtype=float)
+    # Angular separation in [0, 180] for every pair: (..., T, N)
+    separation = np.abs((transit_lons[..., :, None] - natal_lons[..., None, :] + 180.0) % 360.0 - 180.0)
+    # Distance from each aspect angle: (..., T, N, A)
+    deviation = np.abs(separation[..., None] - ASPECT_ANGLES)
+    return np.clip(1.0 - deviation / ASPECT_ORBS, 0.0, None)
+
+
+def _aspect_polarity():
+    """Polarity per (transit planet, aspect); conjunctions take the planet's nature"""
+    polarity = np.broadcast_to(ASPECT_POLARITY, (len(TRANSIT_PLANETS), len(ASPECT_ANGLES))).copy()
+    polarity[:, 0] = TRANSIT_NATURE
+    return polarity
+
+
+def aspect_matrix(transit_lons, natal_lons):
+    """
+    Signed aspect strengths for every (transit, natal) pair
+
+    Args:
+        transit_lons: shape (T,) or (D, T) transit longitudes
+        natal_lons: shape (N,) or (U, N) natal longitudes
+
+    Returns:
+        Array shaped (..., T, N) with the summed weighted aspect strength
+    """
+    closeness = aspect_closeness(transit_lons, natal_lons)
+    strength = (closeness * _aspect_polarity()[:, None, :]).sum(axis=-1)
+    return strength * TRANSIT_WEIGHTS[:, None] * NATAL_WEIGHTS
+
+
+def aspect_details(transit_lons, natal_lons, natal_planets=NATAL_PLANETS):
+    """
+    Individual aspects in orb for one transit set and one chart, strongest first
+
+    Returns:
+        List of dicts with transit, aspect, natal and signed strength,
+        limited to the given natal planets
+    """
+    closeness = aspect_closeness(transit_lons, natal_lons)
+    strength = closeness * _aspect_polarity()[:, None, :] * TRANSIT_WEIGHTS[:, None, None] * NATAL_WEIGHTS[:, None]
+    details = []
+    for t, n, a in zip(*np.nonzero(closeness)):
+        if NATAL_PLANETS[n] in natal_planets:
+            details.append({
+                'transit': TRANSIT_PLANETS[t],
+                'aspect': ASPECT_NAMES[a],
+                'natal': NATAL_PLANETS[n],
+                'strength': round(float(strength[t, n, a]), 3)
+            })
+    details.sort(key=lambda detail: -abs(detail['strength']))
+    return details
+
+
+# Users scored per aspect_matrix call; bounds the (U, T, N, A) intermediate to a few tens of MB
+BATCH_CHUNK_SIZE = 4096
+
+
+def natal_influences(transit_lons, natal_lons):
+    """
+    Net influence on each natal planet, shape (N,) or (U, N)
+    Roughly within [-2, 2]; 0 means no aspect in orb
+    """
+    natal_lons = np.asarray(natal_lons, dtype=float)
+    if natal_lons.ndim == 1 or len(natal_lons) <= BATCH_CHUNK_SIZE:
+        return aspect_matrix(transit_lons, natal_lons).sum(axis=-2)
+    return np.concatenate([
+        aspect_matrix(transit_lons, natal_lons[i:i + BATCH_CHUNK_SIZE]).sum(axis=-2)
+        for i in range(0, len(natal_lons), BATCH_CHUNK_SIZE)
+    ])
+
+
+def area_influences(influences):
+    """Mean influence of the natal planets behind each life area, shape () or (U,) per area"""
+    return {
+        area: influences[..., [NATAL_INDEX[planet] for planet in planets]].mean(axis=-1)
+        for area, planets in AREA_PLANETS.items()
+    }
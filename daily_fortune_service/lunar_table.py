@@ -0,0 +1,186 @@
+"""
+Precomputed lunar phase event table
+
+Exact instants (Julian days, UT) of every new moon, first quarter, full moon
+and last quarter from 1900 to 2100, found from the Swiss Ephemeris and kept
+as one sorted float array. Phases strictly alternate, so the phase of event i
+is (first_phase + i) % 4 and only the instants need storing. Lookups are a
+single bisect; illumination is interpolated from the surrounding events.
+
+The table is built on first use (well under a second) and saved to
+LUNAR_TABLE_PATH so other workers and restarts load it directly. It can be
+prebuilt as a deploy step with:
+
+    python -m daily_fortune_service.cli lunar-table
+"""
+import math
+import os
+import tempfile
+import threading
+from bisect import bisect_right
+
+import numpy as np
+import swisseph
+
+from cache_service import atomic_write
+from monitoring_service import get_logger
+
+logger = get_logger('daily')
+
+
+# Major phases in cycle order; event i has elongation 90 * phase degrees
+PHASE_EVENTS = ('New Moon', 'First Quarter', 'Full Moon', 'Last Quarter')
+
+TABLE_START_YEAR = 1900
+TABLE_END_YEAR = 2100
+MEAN_SYNODIC_MONTH = 29.530588853
+
+DEFAULT_LUNAR_TABLE_PATH = os.path.join(tempfile.gettempdir(), 'star-api-lunar-phases.npy')
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def moon_elongation(jd):
+    """Moon-Sun elongation in degrees [0, 360) and its rate in degrees/day"""
+    sun, _ = swisseph.calc_ut(jd, swisseph.SUN)
+    moon, _ = swisseph.calc_ut(jd, swisseph.MOON)
+    return (moon[0] - sun[0]) % 360.0, moon[3] - sun[3]
+
+
+def _refine_event(jd, target):
+    """Newton iteration to the instant the elongation equals target degrees"""
+    for _ in range(10):
+        elongation, rate = moon_elongation(jd)
+        delta = (target - elongation + 180.0) % 360.0 - 180.0
+        jd += delta / rate
+        if abs(delta) < 1e-6:
+            break
+    return jd
+
+
+def build_phase_table(start_year=TABLE_START_YEAR, end_year=TABLE_END_YEAR):
+    """
+    Find every major phase instant from Jan 1 of start_year to Dec 31 of end_year
+
+    Returns:
+        (jds, first_phase): sorted float array of Julian days and the
+        PHASE_EVENTS index of the first event
+    """
+    start_jd = swisseph.julday(start_year, 1, 1, 0.0)
+    end_jd = swisseph.julday(end_year + 1, 1, 1, 0.0)
+
+    # First event after start_jd: next multiple of 90 degrees elongation
+    elongation, _ = moon_elongation(start_jd)
+    phase = int(elongation // 90 + 1) % 4
+    jd = _refine_event(start_jd + ((90.0 * phase - elongation) % 360.0) / 12.19, 90.0 * phase)
+    first_phase = phase
+
+    events = []
+    quarter = MEAN_SYNODIC_MONTH / 4
+    while jd < end_jd:
+        events.append(jd)
+        phase = (phase + 1) % 4
+        jd = _refine_event(jd + quarter, 90.0 * phase)
+    return np.array(events), first_phase
+
+
+def save_phase_table(path, jds, first_phase):
+    """Save as one float array: [first_phase, jd0, jd1, ...]"""
+    with atomic_write(path) as f:
+        np.save(f, np.concatenate(([float(first_phase)], jds)))
+
+
+def load_phase_table(path):
+    data = np.load(path)
+    return data[1:], int(data[0])
+
+
+def get_phase_table():
+    """Return (jds as list, first_phase), loading or building the table once per process"""
+    global _table
+    if _table is not None:
+        return _table
+    with _table_lock:
+        if _table is not None:
+            return _table
+        path = os.environ.get('LUNAR_TABLE_PATH', DEFAULT_LUNAR_TABLE_PATH)
+        try:
+            jds, first_phase = load_phase_table(path)
+        except (OSError, ValueError, IndexError):
+            jds, first_phase = build_phase_table()
+            try:
+                save_phase_table(path, jds, first_phase)
+            except OSError as e:
+                logger.warning("Could not save lunar phase table to %s: %s", path, e)
+        # bisect on a plain list avoids NumPy scalar overhead per lookup
+        _table = (jds.tolist(), first_phase)
+        return _table
+
+
+def phase_at(jd):
+    """
+    Lunar phase state at a Julian day (UT)
+
+    Returns:
+        Dictionary with elongation (degrees), illumination (0-1), days since
+        the last new moon, next major phase name and days until it; None if
+        jd is outside the table
+    """
+    jds, first_phase = get_phase_table()
+    i = bisect_right(jds, jd) - 1
+    if i < 0 or i + 1 >= len(jds):
+        return None
+
+    phase = (first_phase + i) % 4
+    fraction = (jd - jds[i]) / (jds[i + 1] - jds[i])
+    elongation = 90.0 * (phase + fraction)
+
+    # Walk back to the most recent new moon (at most three events)
+    new_moon = i - phase
+    days_since_new = jd - jds[new_moon] if new_moon >= 0 else jd - jds[i] + phase * MEAN_SYNODIC_MONTH / 4
+
+    return {
+        'elongation': elongation,
+        'illumination': (1 - math.cos(math.radians(elongation))) / 2,
+        'days_since_new_moon': days_since_new,
+        'next_phase': PHASE_EVENTS[(phase + 1) % 4],
+        'days_to_next_phase': jds[i + 1] - jd
+    }
+
+
+def phases_at(jds):
+    """
+    Vectorized phase_at() for an array of Julian days (UT)
+
+    Returns:
+        Dictionary of arrays: elongation, illumination, days_since_new_moon,
+        next_phase (PHASE_EVENTS index), days_to_next_phase, and valid
+        (False where jd is outside the table; other values are then meaningless)
+    """
+    table, first_phase = get_phase_table()
+    table = np.asarray(table)
+    jds = np.asarray(jds, dtype=float)
+    i = np.searchsorted(table, jds, side='right') - 1
+    valid = (i >= 0) & (i + 1 < len(table))
+    i = np.clip(i, 0, len(table) - 2)
+
+    phase = (first_phase + i) % 4
+    fraction = (jds - table[i]) / (table[i + 1] - table[i])
+    elongation = 90.0 * (phase + fraction)
+
+    new_moon = i - phase
+    days_since_new = np.where(
+        new_moon >= 0,
+        jds - table[np.maximum(new_moon, 0)],
+        jds - table[i] + phase * MEAN_SYNODIC_MONTH / 4
+    )
+
+    return {
+        'elongation': elongation,
+        'illumination': (1 - np.cos(np.radians(elongation))) / 2,
+        'days_since_new_moon': days_since_new,
+        'next_phase': (phase + 1) % 4,
+        'days_to_next_phase': table[i + 1] - jds,
+        'valid': valid
+    }
@@ -0,0 +1,75 @@
+"""
+Inverted index of natal planet longitudes
+
+For notifications like "Venus is conjunct your natal Sun today" every
+transit point has to be matched against every stored profile. Instead, the
+profiles' natal longitudes are kept sorted per planet; the profiles within
+an orb of a point are one contiguous slice found by binary search, so each
+(transit, aspect, natal planet) query costs O(log N + k) rather than O(N).
+
+    python -m daily_fortune_service.cli transit-hits [--date YYYY-MM-DD]
+
+writes the affected subscriber lists for a date as NDJSON.
+"""
+import numpy as np
+
+from .influence import ASPECT_ANGLES, ASPECT_NAMES, ASPECT_ORBS, NATAL_PLANETS, TRANSIT_PLANETS
+
+
+class NatalIndex:
+    """Sorted natal longitudes per planet, with the profile ID of each entry"""
+
+    def __init__(self, profile_ids, natal_lons):
+        """
+        Args:
+            profile_ids: sequence of U profile IDs
+            natal_lons: array shaped (U, len(NATAL_PLANETS)) of natal longitudes
+        """
+        profile_ids = np.asarray(profile_ids, dtype=object)
+        natal_lons = np.asarray(natal_lons, dtype=float).reshape(len(profile_ids), len(NATAL_PLANETS)) % 360.0
+        self.size = len(profile_ids)
+        self._lons = {}
+        self._ids = {}
+        for i, planet in enumerate(NATAL_PLANETS):
+            order = np.argsort(natal_lons[:, i], kind='stable')
+            self._lons[planet] = natal_lons[order, i]
+            self._ids[planet] = profile_ids[order]
+
+    def within(self, planet, point, orb):
+        """IDs of profiles whose natal planet lies within orb degrees of point"""
+        lons = self._lons[planet]
+        low = (point - orb) % 360.0
+        high = (point + orb) % 360.0
+        start = np.searchsorted(lons, low, side='left')
+        end = np.searchsorted(lons, high, side='right')
+        if low <= high:
+            return self._ids[planet][start:end].tolist()
+        # The orb wraps through 0 degrees: [low, 360) and [0, high]
+        return self._ids[planet][start:].tolist() + self._ids[planet][:end].tolist()
+
+    def transit_hits(self, transit_lons, orbs=ASPECT_ORBS):
+        """
+        Profiles receiving each major aspect from today's transits
+
+        Args:
+            transit_lons: longitudes of TRANSIT_PLANETS (e.g. a date context's
+                transit_longitudes)
+            orbs: orb per aspect in ASPECT_ANGLES (default: the scoring orbs)
+
+        Yields:
+            (transit planet, aspect name, natal planet, [profile IDs]) for
+            every combination with at least one profile in orb
+        """
+        for transit, transit_lon in zip(TRANSIT_PLANETS, transit_lons):
+            for aspect, angle, orb in zip(ASPECT_NAMES, ASPECT_ANGLES, orbs):
+                # Aspects other than conjunction and opposition hit two points
+                if angle in (0.0, 180.0):
+                    points = [float(transit_lon + angle) % 360.0]
+                else:
+                    points = [float(transit_lon + angle) % 360.0, float(transit_lon - angle) % 360.0]
+                for natal in NATAL_PLANETS:
+                    ids = []
+                    for point in points:
+                        ids.extend(self.within(natal, point, orb))
+                    if ids:
+                        yield transit, aspect, natal, ids
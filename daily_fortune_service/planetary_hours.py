@@ -0,0 +1,150 @@
+"""
+Chaldean planetary hours
+
+Daylight (sunrise to sunset) and night (sunset to next sunrise) are each split
+into 12 unequal hours. The first hour of the day is ruled by the weekday's
+planet and each following hour by the next planet in Chaldean order.
+
+Sunrise and sunset come from a NumPy version of the standard sunrise equation
+(accurate to a minute or two), evaluated for whole arrays of dates and
+locations at once. Day tables are cached per (date, lat/lon grid cell), so
+users in the same cell share one computation.
+"""
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pytz
+from flatlib import const
+
+
+# Chaldean order, slowest to fastest
+CHALDEAN_ORDER = (
+    const.SATURN, const.JUPITER, const.MARS, const.SUN,
+    const.VENUS, const.MERCURY, const.MOON
+)
+
+# Ruler of the first hour for each weekday (Monday = 0)
+WEEKDAY_RULERS = (
+    const.MOON, const.MARS, const.MERCURY, const.JUPITER,
+    const.VENUS, const.SATURN, const.SUN
+)
+
+# Size of the location grid cells sharing a day table (degrees)
+GRID_CELL_DEGREES = 0.5
+
+DAY_TABLE_CACHE_SIZE = 65536
+
+J2000 = 2451545.0
+UNIX_EPOCH_JD = 2440587.5
+
+# Sun's altitude at rise/set, allowing for refraction and the solar disc
+SUNRISE_ALTITUDE = -0.833
+OBLIQUITY = 23.4397
+
+
+def sun_times(jd_noon, lat, lon):
+    """
+    Sunrise and sunset (Julian days, UT) for arrays of dates and locations
+
+    Args:
+        jd_noon: Julian day of 12:00 UT on each date
+        lat, lon: degrees, east longitude positive (broadcast against jd_noon)
+
+    Returns:
+        (sunrise, sunset) arrays. Where the sun never rises or sets, the day
+        is treated as 12 equal hours centred on solar noon.
+    """
+    jd_noon, lat, lon = np.broadcast_arrays(
+        np.asarray(jd_noon, dtype=float), np.asarray(lat, dtype=float), np.asarray(lon, dtype=float))
+
+    n = np.round(jd_noon - J2000)
+    mean_solar_noon = n - lon / 360.0
+    anomaly = np.radians((357.5291 + 0.98560028 * mean_solar_noon) % 360.0)
+    center = 1.9148 * np.sin(anomaly) + 0.02 * np.sin(2 * anomaly) + 0.0003 * np.sin(3 * anomaly)
+    ecliptic_lon = np.radians((np.degrees(anomaly) + center + 180.0 + 102.9372) % 360.0)
+    transit = J2000 + mean_solar_noon + 0.0053 * np.sin(anomaly) - 0.0069 * np.sin(2 * ecliptic_lon)
+
+    sin_dec = np.sin(ecliptic_lon) * np.sin(np.radians(OBLIQUITY))
+    cos_dec = np.cos(np.arcsin(sin_dec))
+    phi = np.radians(lat)
+    cos_hour_angle = (np.sin(np.radians(SUNRISE_ALTITUDE)) - np.sin(phi) * sin_dec) / (np.cos(phi) * cos_dec)
+
+    half_day = np.where(
+        np.abs(cos_hour_angle) <= 1.0,
+        np.degrees(np.arccos(np.clip(cos_hour_angle, -1.0, 1.0))) / 360.0,
+        0.25
+    )
+    return transit - half_day, transit + half_day
+
+
+def current_location(data):
+    """Current location for planetary hours from a request or record as (lat, lon); (None, None) means the birth place"""
+    lat = data.get('current_latitude')
+    lon = data.get('current_longitude')
+    if lat is None or lon is None:
+        return None, None
+    return float(lat), float(lon)
+
+
+def grid_cell(lat, lon):
+    """Grid cell index containing a location"""
+    return int(np.floor(lat / GRID_CELL_DEGREES)), int(np.floor(lon / GRID_CELL_DEGREES))
+
+
+@lru_cache(maxsize=DAY_TABLE_CACHE_SIZE)
+def day_table(date, lat_cell, lon_cell):
+    """
+    (sunrise, sunset, next sunrise, first ruler index) for a date and grid cell
+
+    Times are Julian days (UT) at the cell centre; the ruler index points
+    into CHALDEAN_ORDER.
+    """
+    day = datetime.strptime(date, '%Y-%m-%d')
+    lat = (lat_cell + 0.5) * GRID_CELL_DEGREES
+    lon = (lon_cell + 0.5) * GRID_CELL_DEGREES
+    jd_noon = (day - datetime(1970, 1, 1)).days + UNIX_EPOCH_JD + 0.5
+
+    sunrise, sunset = sun_times(np.array([jd_noon, jd_noon + 1]), lat, lon)
+    first_ruler = CHALDEAN_ORDER.index(WEEKDAY_RULERS[day.weekday()])
+    return float(sunrise[0]), float(sunset[0]), float(sunrise[1]), first_ruler
+
+
+def planetary_hours(date, lat, lon):
+    """
+    The 24 planetary hours of a date at a location
+
+    Returns:
+        List of (start, end, ruler) with start/end as aware UTC datetimes
+    """
+    sunrise, sunset, next_sunrise, first_ruler = day_table(date, *grid_cell(lat, lon))
+    day_length = (sunset - sunrise) / 12
+    night_length = (next_sunrise - sunset) / 12
+
+    hours = []
+    for i in range(24):
+        if i < 12:
+            start = sunrise + i * day_length
+            end = start + day_length
+        else:
+            start = sunset + (i - 12) * night_length
+            end = start + night_length
+        hours.append((_jd_to_datetime(start), _jd_to_datetime(end), CHALDEAN_ORDER[(first_ruler + i) % 7]))
+    return hours
+
+
+def _jd_to_datetime(jd):
+    return datetime(1970, 1, 1, tzinfo=pytz.UTC) + timedelta(days=jd - UNIX_EPOCH_JD)
+
+
+def ruler_at(moment, lat, lon):
+    """Planet ruling the planetary hour containing an aware datetime"""
+    moment_utc = moment.astimezone(pytz.UTC)
+    # The local planetary day may start on the UTC date before or after
+    for offset in (1, 0, -1):
+        date = (moment_utc + timedelta(days=offset)).strftime('%Y-%m-%d')
+        for start, end, ruler in planetary_hours(date, lat, lon):
+            if start <= moment_utc < end:
+                return ruler
+    return None
+
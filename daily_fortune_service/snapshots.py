@@ -0,0 +1,180 @@
+"""
+Per-date "cosmic weather" snapshots
+
+A snapshot is the user-independent part of a daily fortune for one date and
+timezone: transit positions and lunar phase (a serialized date context).
+Snapshots for the next N days are precomputed ahead of time, by cron via
+
+    python -m daily_fortune_service.cli snapshots --days 14
+
+or by the in-app SnapshotScheduler, persisted to SQLite, and loaded into the
+calculator's memory at worker start so requests only do natal-specific work.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from monitoring_service import get_logger
+from .core import ALGORITHM_VERSION
+from .ephemeris import TransitSnapshot
+from .influence import chart_longitudes
+from .utils import init_ephemeris_thread
+
+logger = get_logger('snapshots')
+
+
+DEFAULT_SNAPSHOT_DB_PATH = os.path.join(tempfile.gettempdir(), 'star-api-snapshots.sqlite3')
+DEFAULT_SNAPSHOT_DAYS = 14
+DEFAULT_SNAPSHOT_HOUR_UTC = 0
+
+
+def serialize_context(context):
+    """Date context -> JSON string (transits must be a TransitSnapshot)"""
+    return json.dumps({
+        'target_date': context['target_date'],
+        'target_timezone': context['target_timezone'],
+        'transits': context['transits'].to_dict(),
+        'lunar_phase': context['lunar_phase']
+    }, ensure_ascii=False)
+
+
+def deserialize_context(payload):
+    """JSON string -> date context usable by calculate_daily_fortune(context=...)"""
+    data = json.loads(payload)
+    transits = TransitSnapshot.from_dict(data['transits'])
+    return {
+        'target_date': data['target_date'],
+        'target_timezone': data['target_timezone'],
+        'transits': transits,
+        'transit_longitudes': chart_longitudes(transits),
+        'lunar_phase': data['lunar_phase']
+    }
+
+
+class SnapshotStore:
+    """SQLite store of date snapshots, keyed by (date, timezone, algorithm version)"""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get('SNAPSHOT_DB_PATH', DEFAULT_SNAPSHOT_DB_PATH)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS date_snapshots ("
+                    "target_date TEXT NOT NULL, target_timezone TEXT NOT NULL, "
+                    "algorithm_version INTEGER NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL, "
+                    "PRIMARY KEY (target_date, target_timezone, algorithm_version))"
+                )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def put_many(self, contexts):
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO date_snapshots VALUES (?, ?, ?, ?, ?)",
+                    [(c['target_date'], c['target_timezone'], ALGORITHM_VERSION, serialize_context(c), now)
+                     for c in contexts]
+                )
+        finally:
+            conn.close()
+
+    def load(self, from_date):
+        """All snapshots for the current algorithm version from from_date onwards"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT payload FROM date_snapshots WHERE algorithm_version = ? AND target_date >= ? "
+                "ORDER BY target_date",
+                (ALGORITHM_VERSION, from_date)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [deserialize_context(row[0]) for row in rows]
+
+    def prune(self, before_date):
+        """Delete snapshots for past dates and older algorithm versions"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "DELETE FROM date_snapshots WHERE target_date < ? OR algorithm_version != ?",
+                    (before_date, ALGORITHM_VERSION)
+                )
+        finally:
+            conn.close()
+
+
+def _today():
+    return datetime.now(pytz.UTC).strftime('%Y-%m-%d')
+
+
+def precompute_snapshots(calculator, store, days=DEFAULT_SNAPSHOT_DAYS, start_date=None, timezones=('UTC',)):
+    """Compute and persist snapshots for `days` days from start_date (default today); returns the count"""
+    start_date = start_date or _today()
+    end_date = (datetime.strptime(start_date, '%Y-%m-%d') + timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    count = 0
+    for timezone in timezones:
+        contexts = calculator.build_range_contexts(start_date, end_date, timezone)
+        store.put_many(contexts)
+        count += len(contexts)
+    store.prune(start_date)
+    return count
+
+
+def load_snapshots(calculator, store):
+    """Load stored snapshots from today onwards into the calculator; returns the count"""
+    contexts = store.load(_today())
+    calculator.preload_date_contexts(contexts)
+    return len(contexts)
+
+
+class SnapshotScheduler:
+    """
+    Background thread that precomputes snapshots once a day at hour_utc
+    and reloads them into the calculator
+    """
+
+    def __init__(self, calculator, store, days=DEFAULT_SNAPSHOT_DAYS, hour_utc=DEFAULT_SNAPSHOT_HOUR_UTC):
+        self.calculator = calculator
+        self.store = store
+        self.days = days
+        self.hour_utc = hour_utc
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='snapshot-scheduler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _seconds_until_next_run(self):
+        now = datetime.now(pytz.UTC)
+        next_run = now.replace(hour=self.hour_utc, minute=0, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+    def _run(self):
+        init_ephemeris_thread()
+        while True:
+            try:
+                count = precompute_snapshots(self.calculator, self.store, self.days)
+                load_snapshots(self.calculator, self.store)
+                logger.info("Precomputed %d date snapshots", count)
+            except Exception:
+                logger.exception("Snapshot precomputation failed")
+            if self._stop.wait(self._seconds_until_next_run()):
+                return
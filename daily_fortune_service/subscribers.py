@@ -0,0 +1,312 @@
+"""
+Subscriber store with pre-generated next-day fortunes
+
+Subscribers (birth data, timezone, language) are kept in SQLite. A nightly job,
+
+    python -m daily_fortune_service.cli pregenerate [--workers 4]
+
+computes tomorrow's reading (in each subscriber's own timezone) for everyone
+ahead of the morning notifications and stores the finished responses, so
+reads by subscriber ID are a single primary-key lookup. Subscribers are
+processed in waves by UTC offset, easternmost first, so the zones whose
+morning arrives first are ready first; each wave is scored on a process pool.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytz
+
+from monitoring_service import get_logger
+from .core import ALGORITHM_VERSION, DailyFortuneCalculator, local_date, utc_offset_minutes
+from .influence import NATAL_PLANETS, chart_longitudes
+from .natal_index import NatalIndex
+from .utils import init_ephemeris_thread
+
+logger = get_logger('subscribers')
+
+
+DEFAULT_SUBSCRIBER_DB_PATH = os.path.join(tempfile.gettempdir(), 'star-api-subscribers.sqlite3')
+
+# Subscribers handed to a worker process at a time
+PREGENERATE_CHUNK_SIZE = 500
+
+SUBSCRIBER_FIELDS = (
+    'subscriber_id', 'birth_date', 'birth_time', 'birth_latitude', 'birth_longitude',
+    'target_timezone', 'language'
+)
+
+
+def _parse_birth_datetime(birth_date, birth_time):
+    """
+    Validate a subscriber's birth date and time
+
+    Returns:
+        (YYYY-MM-DD, HH:MM:SS) strings
+
+    Raises:
+        ValueError: if either does not parse
+    """
+    for fmt in ('%Y-%m-%d', '%Y/%m/%d'):
+        try:
+            date = datetime.strptime(birth_date, fmt).strftime('%Y-%m-%d')
+            break
+        except (TypeError, ValueError):
+            continue
+    else:
+        raise ValueError(f"Invalid birth_date: {birth_date!r} (expected YYYY-MM-DD)")
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            time_of_day = datetime.strptime(birth_time, fmt).strftime('%H:%M:%S')
+            break
+        except (TypeError, ValueError):
+            continue
+    else:
+        raise ValueError(f"Invalid birth_time: {birth_time!r} (expected HH:MM or HH:MM:SS)")
+    return date, time_of_day
+
+
+class SubscriberStore:
+    """SQLite store of subscribers and their pre-generated daily fortunes"""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get('SUBSCRIBER_DB_PATH', DEFAULT_SUBSCRIBER_DB_PATH)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS subscribers ("
+                    "subscriber_id TEXT PRIMARY KEY, birth_date TEXT NOT NULL, birth_time TEXT NOT NULL, "
+                    "birth_latitude REAL NOT NULL, birth_longitude REAL NOT NULL, "
+                    "target_timezone TEXT NOT NULL, language TEXT NOT NULL, updated_at REAL NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS subscriber_fortunes ("
+                    "subscriber_id TEXT NOT NULL, target_date TEXT NOT NULL, "
+                    "algorithm_version INTEGER NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL, "
+                    "PRIMARY KEY (subscriber_id, target_date, algorithm_version))"
+                )
+                # Natal longitudes of NATAL_PLANETS (JSON list), for the natal index
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS subscriber_natal ("
+                    "subscriber_id TEXT PRIMARY KEY, longitudes TEXT NOT NULL)"
+                )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def upsert(self, subscriber):
+        """
+        Add or replace a subscriber (a dict with SUBSCRIBER_FIELDS)
+
+        Raises:
+            ValueError: if birth_date or birth_time does not parse
+        """
+        subscriber = dict(subscriber)
+        subscriber['birth_date'], subscriber['birth_time'] = _parse_birth_datetime(
+            subscriber['birth_date'], subscriber['birth_time'])
+        row = tuple(subscriber[field] for field in SUBSCRIBER_FIELDS)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO subscribers VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             row + (time.time(),))
+                # Stored readings were computed from the old birth data
+                conn.execute("DELETE FROM subscriber_fortunes WHERE subscriber_id = ?", (row[0],))
+                conn.execute("DELETE FROM subscriber_natal WHERE subscriber_id = ?", (row[0],))
+        finally:
+            conn.close()
+
+    def delete(self, subscriber_id):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM subscribers WHERE subscriber_id = ?", (subscriber_id,))
+                conn.execute("DELETE FROM subscriber_fortunes WHERE subscriber_id = ?", (subscriber_id,))
+                conn.execute("DELETE FROM subscriber_natal WHERE subscriber_id = ?", (subscriber_id,))
+        finally:
+            conn.close()
+
+    def get(self, subscriber_id):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT " + ', '.join(SUBSCRIBER_FIELDS) + " FROM subscribers WHERE subscriber_id = ?",
+                (subscriber_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return dict(zip(SUBSCRIBER_FIELDS, row)) if row else None
+
+    def all(self):
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT " + ', '.join(SUBSCRIBER_FIELDS) + " FROM subscribers").fetchall()
+        finally:
+            conn.close()
+        return [dict(zip(SUBSCRIBER_FIELDS, row)) for row in rows]
+
+    def without_natal_longitudes(self):
+        """Subscribers whose natal longitudes are not stored yet"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT " + ', '.join('s.' + field for field in SUBSCRIBER_FIELDS) + " FROM subscribers s "
+                "LEFT JOIN subscriber_natal n ON n.subscriber_id = s.subscriber_id WHERE n.subscriber_id IS NULL"
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(zip(SUBSCRIBER_FIELDS, row)) for row in rows]
+
+    def put_natal_longitudes(self, items):
+        """Store (subscriber_id, longitudes) pairs"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO subscriber_natal VALUES (?, ?)",
+                    [(subscriber_id, json.dumps([float(lon) for lon in longitudes]))
+                     for subscriber_id, longitudes in items]
+                )
+        finally:
+            conn.close()
+
+    def natal_longitudes(self):
+        """(subscriber IDs, array shaped (U, len(NATAL_PLANETS))) of every stored natal chart"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT subscriber_id, longitudes FROM subscriber_natal").fetchall()
+        finally:
+            conn.close()
+        ids = [row[0] for row in rows]
+        lons = np.array([json.loads(row[1]) for row in rows]).reshape(len(rows), len(NATAL_PLANETS))
+        return ids, lons
+
+    def put_fortunes(self, items):
+        """Store (subscriber_id, target_date, result) triples"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO subscriber_fortunes VALUES (?, ?, ?, ?, ?)",
+                    [(subscriber_id, target_date, ALGORITHM_VERSION, json.dumps(result, ensure_ascii=False), now)
+                     for subscriber_id, target_date, result in items]
+                )
+        finally:
+            conn.close()
+
+    def get_fortune(self, subscriber_id, target_date):
+        """Stored reading for the current algorithm version, or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT payload FROM subscriber_fortunes "
+                "WHERE subscriber_id = ? AND target_date = ? AND algorithm_version = ?",
+                (subscriber_id, target_date, ALGORITHM_VERSION)
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def prune(self, before_date):
+        """Delete readings for past dates and older algorithm versions"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "DELETE FROM subscriber_fortunes WHERE target_date < ? OR algorithm_version != ?",
+                    (before_date, ALGORITHM_VERSION)
+                )
+        finally:
+            conn.close()
+
+
+def compute_subscriber_fortune(calculator, subscriber, target_date):
+    """calculate_daily_fortune() for one stored subscriber"""
+    return calculator.calculate_daily_fortune(
+        birth_date=subscriber['birth_date'],
+        birth_time=subscriber['birth_time'],
+        birth_lat=subscriber['birth_latitude'],
+        birth_lon=subscriber['birth_longitude'],
+        target_date=target_date,
+        target_timezone=subscriber['target_timezone'],
+        lang=subscriber['language']
+    )
+
+
+# One calculator per worker process, so date contexts are reused across chunks
+_worker_calculator = None
+
+
+def _init_worker():
+    global _worker_calculator
+    init_ephemeris_thread()
+    _worker_calculator = DailyFortuneCalculator()
+
+
+def _score_chunk(chunk):
+    """Worker: [(subscriber, target_date), ...] -> [(subscriber_id, target_date, result), ...]"""
+    return [
+        (subscriber['subscriber_id'], target_date,
+         compute_subscriber_fortune(_worker_calculator, subscriber, target_date))
+        for subscriber, target_date in chunk
+    ]
+
+
+def subscriber_waves(subscribers, days_ahead=1):
+    """
+    Group subscribers by the UTC offset of their next local day
+
+    Returns:
+        List of (offset minutes, [(subscriber, target_date), ...]), easternmost
+        offset (earliest morning) first
+    """
+    waves = {}
+    for subscriber in subscribers:
+        target_date = local_date(subscriber['target_timezone'], days_ahead)
+        offset = utc_offset_minutes(target_date, subscriber['target_timezone'])
+        waves.setdefault(offset, []).append((subscriber, target_date))
+    return sorted(waves.items(), key=lambda item: -item[0])
+
+
+def pregenerate_fortunes(store, workers=None, days_ahead=1):
+    """Compute and store every subscriber's reading for their next local day; returns the count"""
+    count = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for offset, items in subscriber_waves(store.all(), days_ahead):
+            chunks = [items[i:i + PREGENERATE_CHUNK_SIZE] for i in range(0, len(items), PREGENERATE_CHUNK_SIZE)]
+            for results in executor.map(_score_chunk, chunks):
+                stored = [item for item in results if item[2].get('success')]
+                store.put_fortunes(stored)
+                count += len(stored)
+            logger.info("Pre-generated fortunes for UTC offset %+d min (%d subscribers)", offset, len(items))
+    # Etc/GMT+12 (UTC-12) has the earliest local date anywhere
+    store.prune(local_date('Etc/GMT+12'))
+    return count
+
+
+def build_natal_index(store, calculator=None):
+    """Natal index over every subscriber, computing and storing missing natal charts first"""
+    calculator = calculator or DailyFortuneCalculator()
+    missing = store.without_natal_longitudes()
+    for i in range(0, len(missing), PREGENERATE_CHUNK_SIZE):
+        items = []
+        for subscriber in missing[i:i + PREGENERATE_CHUNK_SIZE]:
+            try:
+                chart = calculator.build_birth_chart(
+                    subscriber['birth_date'], subscriber['birth_time'],
+                    subscriber['birth_latitude'], subscriber['birth_longitude'])
+                items.append((subscriber['subscriber_id'], chart_longitudes(chart, NATAL_PLANETS)))
+            except Exception as e:
+                # One bad record must not abort indexing everyone else
+                logger.warning("Skipping subscriber %s in natal index: %s", subscriber['subscriber_id'], e)
+        store.put_natal_longitudes(items)
+    return NatalIndex(*store.natal_longitudes())
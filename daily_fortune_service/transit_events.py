@@ -0,0 +1,355 @@
+"""
+Exact transit events over a date range
+
+Rather than a chart per day (which also misses exact times), transiting
+positions are sampled on a coarse grid and every (sample, body, target)
+combination is compared at once with NumPy. Sign changes of an event
+function bracket the events, which are then bisected to under a minute:
+
+- aspect_hits(): intervals within orb of aspects to given points, refined
+  on the ephemeris itself
+- transit_events(): exact aspects, sign ingresses and retrograde stations,
+  refined on an interpolated ephemeris (EphemerisTable) so that all
+  brackets are bisected together as arrays
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import swisseph
+from flatlib import const
+from flatlib.ephem.swe import SWE_OBJECTS
+
+from .ephemeris import planet_positions
+from .influence import ASPECT_ANGLES, ASPECT_NAMES
+
+# Sampling step of the coarse scan (days); the Moon moves about 3 degrees per step
+SCAN_STEP_DAYS = 0.25
+
+# Refined event times are accurate to this (days)
+REFINE_TOLERANCE_DAYS = 1.0 / 1440
+
+# Default orb of a "hit" (degrees)
+DEFAULT_HIT_ORB = 1.0
+
+# Interpolation grid step per body (days); slow bodies are smooth over longer steps
+DEFAULT_TABLE_STEP_DAYS = 2.0
+TABLE_STEP_DAYS = {
+    const.MOON: 0.5,
+    const.SUN: 1.0,
+    const.MERCURY: 1.0,
+    const.VENUS: 1.0,
+    const.MARS: 1.0,
+}
+
+# Event types found by transit_events()
+EVENT_TYPES = ('aspect', 'ingress', 'station')
+
+# Bodies that never station (the mean node moves backwards at a steady rate)
+NON_STATIONING = (const.SUN, const.MOON, const.NORTH_NODE, const.SOUTH_NODE)
+
+UNIX_EPOCH_JD = 2440587.5
+
+
+def _wrap(angle):
+    """Signed angle in [-180, 180)"""
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+def jd_to_iso(jd):
+    """Julian day (UT) -> 'YYYY-MM-DDTHH:MMZ', rounded to the minute"""
+    moment = datetime(1970, 1, 1) + timedelta(days=jd - UNIX_EPOCH_JD, seconds=30)
+    return moment.strftime('%Y-%m-%dT%H:%MZ')
+
+
+def date_to_jd(date):
+    """Julian day of 00:00 UT on a YYYY-MM-DD date"""
+    year, month, day = (int(part) for part in date.split('-'))
+    return swisseph.julday(year, month, day, 0.0)
+
+
+def longitude_scan(start_jd, end_jd, objects, step=SCAN_STEP_DAYS):
+    """Sample times covering [start_jd, end_jd] and the objects' longitudes, shaped (S,) and (S, len(objects))"""
+    count = int(np.ceil((end_jd - start_jd) / step)) + 1
+    jds = start_jd + np.arange(count) * step
+    lons, _, _, _ = planet_positions(jds, objects)
+    return jds, lons
+
+
+def aspect_points(targets, angles=ASPECT_ANGLES):
+    """
+    Points in the zodiac that receive an aspect from each target
+
+    Args:
+        targets: list of (label, longitude)
+
+    Returns:
+        (point longitudes array, [(label, aspect name), ...]); sextiles,
+        squares and trines have a point on either side of the target
+    """
+    lons, meta = [], []
+    for label, lon in targets:
+        for name, angle in zip(ASPECT_NAMES, angles):
+            for point in sorted({round((lon + angle) % 360.0, 9), round((lon - angle) % 360.0, 9)}):
+                lons.append(point)
+                meta.append((label, name))
+    return np.array(lons), meta
+
+
+def _refine(obj, point, offset, low, high):
+    """Bisect |deviation from point| - offset (offset 0: the signed deviation) to a root in [low, high]"""
+    swe_id = SWE_OBJECTS[obj]
+
+    def value(jd):
+        deviation = _wrap(swisseph.calc_ut(jd, swe_id)[0][0] - point)
+        return abs(deviation) - offset if offset else deviation
+
+    low_positive = value(low) > 0
+    while high - low > REFINE_TOLERANCE_DAYS:
+        middle = (low + high) / 2
+        if (value(middle) > 0) == low_positive:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def aspect_hits(transits, targets, start_jd, end_jd, orb=DEFAULT_HIT_ORB):
+    """
+    Intervals during which each transiting body is within orb of an aspect to a target
+
+    Args:
+        transits: flatlib object IDs of the transiting bodies
+        targets: list of (label, longitude); label is passed through to the events
+        start_jd, end_jd: range (Julian days, UT)
+        orb: orb of a hit in degrees
+
+    Returns:
+        List of dicts sorted by time: transit, aspect, target (label), start
+        and end (Julian days; None when the hit is already under way at
+        start_jd or still on at end_jd) and exact (Julian days of every
+        exact pass, several when the transit is retrograde)
+    """
+    jds, lons = longitude_scan(start_jd, end_jd, transits)
+    points, meta = aspect_points(targets)
+
+    # Deviation from exact for every (sample, transit, point)
+    deviation = _wrap(lons[:, :, None] - points[None, None, :])
+    # Only compare neighbouring samples on the same side of the wrap at 180 degrees
+    continuous = (np.abs(deviation[:-1]) < 90.0) & (np.abs(deviation[1:]) < 90.0)
+    positive = deviation > 0
+    outside = np.abs(deviation) > orb
+    exact_steps = np.nonzero(continuous & (positive[:-1] != positive[1:]))
+    orb_steps = np.nonzero(continuous & (outside[:-1] != outside[1:]))
+
+    # Refined crossing times per (transit, point) series, as (jd, kind)
+    crossings = {}
+    for i, t, k in zip(*exact_steps):
+        jd = _refine(transits[t], points[k], 0.0, jds[i], jds[i + 1])
+        crossings.setdefault((t, k), []).append((jd, 'exact'))
+        if outside[i, t, k] and outside[i + 1, t, k]:
+            # A fast body (the Moon) passed through the whole orb within one step
+            crossings[(t, k)].append((_refine(transits[t], points[k], orb, jds[i], jd), 'enter'))
+            crossings[(t, k)].append((_refine(transits[t], points[k], orb, jd, jds[i + 1]), 'exit'))
+    for i, t, k in zip(*orb_steps):
+        jd = _refine(transits[t], points[k], orb, jds[i], jds[i + 1])
+        crossings.setdefault((t, k), []).append((jd, 'exit' if outside[i + 1, t, k] else 'enter'))
+    # Series in orb for the whole range have no crossings
+    for t, k in zip(*np.nonzero(~outside.any(axis=0))):
+        crossings.setdefault((t, k), [])
+
+    hits = []
+    for (t, k), events in crossings.items():
+        events.sort()
+        current = None if outside[0, t, k] else {'start': None, 'exact': []}
+        for jd, kind in events:
+            if jd > end_jd:
+                break
+            if kind == 'enter':
+                current = {'start': jd, 'exact': []}
+            elif current is None:
+                continue
+            elif kind == 'exact':
+                current['exact'].append(jd)
+            else:
+                hits.append(_hit(transits[t], meta[k], current, jd))
+                current = None
+        if current is not None:
+            hits.append(_hit(transits[t], meta[k], current, None))
+
+    hits.sort(key=lambda hit: (hit['start'] if hit['start'] is not None else start_jd,
+                               hit['end'] if hit['end'] is not None else end_jd))
+    return hits
+
+
+def _hit(transit, meta, current, end):
+    label, aspect = meta
+    return {
+        'transit': transit,
+        'aspect': aspect,
+        'target': label,
+        'start': current['start'],
+        'exact': current['exact'],
+        'end': end
+    }
+
+
+class EphemerisTable:
+    """
+    Longitudes and speeds of some bodies sampled over a range, with cubic
+    Hermite interpolation in between (longitude and speed at both ends of
+    each step), so event functions can be evaluated for many times at once
+    """
+
+    def __init__(self, start_jd, end_jd, objects):
+        self._grids = {}
+        for obj in objects:
+            step = TABLE_STEP_DAYS.get(obj, DEFAULT_TABLE_STEP_DAYS)
+            count = int(np.ceil((end_jd - start_jd) / step)) + 1
+            jds = start_jd + np.arange(count) * step
+            source = const.NORTH_NODE if obj == const.SOUTH_NODE else obj
+            lon, _, speed, _ = planet_positions(jds, (source,))
+            if obj == const.SOUTH_NODE:
+                lon = lon + 180.0
+            # Unwrapped so the interpolant is continuous across 0 degrees
+            unwrapped = np.degrees(np.unwrap(np.radians(lon[:, 0])))
+            self._grids[obj] = (jds, step, unwrapped, speed[:, 0])
+
+    def grid(self, obj):
+        """Sample times of a body"""
+        return self._grids[obj][0]
+
+    def _segment(self, obj, jd):
+        jds, step, lon, speed = self._grids[obj]
+        jd = np.asarray(jd, dtype=float)
+        i = np.clip(((jd - jds[0]) // step).astype(int), 0, len(jds) - 2)
+        s = (jd - jds[i]) / step
+        return step, s, lon[i], lon[i + 1], speed[i] * step, speed[i + 1] * step
+
+    def longitude(self, obj, jd):
+        """Interpolated longitude in [0, 360) at jd (scalar or array)"""
+        _, s, p0, p1, m0, m1 = self._segment(obj, jd)
+        s2, s3 = s * s, s * s * s
+        value = (2 * s3 - 3 * s2 + 1) * p0 + (s3 - 2 * s2 + s) * m0 + (3 * s2 - 2 * s3) * p1 + (s3 - s2) * m1
+        return value % 360.0
+
+    def speed(self, obj, jd):
+        """Interpolated longitude speed (degrees/day) at jd"""
+        step, s, p0, p1, m0, m1 = self._segment(obj, jd)
+        s2 = s * s
+        value = (6 * s2 - 6 * s) * p0 + (3 * s2 - 4 * s + 1) * m0 + (6 * s - 6 * s2) * p1 + (3 * s2 - 2 * s) * m1
+        return value / step
+
+
+def bisect_roots(func, low, high, tolerance=REFINE_TOLERANCE_DAYS):
+    """
+    Bisect many brackets at once
+
+    func(jds, index) evaluates the event function of each bracket (index is
+    an array of bracket positions, same shape as jds); every [low, high]
+    must contain a sign change. Returns the root times.
+    """
+    low = np.array(low, dtype=float)
+    high = np.array(high, dtype=float)
+    if low.size == 0:
+        return low
+    index = np.arange(low.size)
+    low_positive = func(low, index) > 0
+    width = float(np.max(high - low))
+    for _ in range(max(int(np.ceil(np.log2(width / tolerance))), 0)):
+        middle = (low + high) / 2
+        same = (func(middle, index) > 0) == low_positive
+        low = np.where(same, middle, low)
+        high = np.where(same, high, middle)
+    return (low + high) / 2
+
+
+def point_crossings(table, obj, points, relative_to=None):
+    """
+    Times a body passes each of the points
+
+    With relative_to, points are separations from that body's longitude
+    (e.g. the Moon 90 degrees ahead of Saturn) rather than fixed longitudes;
+    the grid of obj is used, so obj should be the faster body.
+
+    Returns:
+        (times, point indexes) arrays
+    """
+    def longitude(jd):
+        if relative_to is None:
+            return table.longitude(obj, jd)
+        return table.longitude(obj, jd) - table.longitude(relative_to, jd)
+
+    jds = table.grid(obj)
+    deviation = _wrap(longitude(jds)[:, None] - points[None, :])
+    # Only compare neighbouring samples on the same side of the wrap at 180 degrees
+    continuous = (np.abs(deviation[:-1]) < 90.0) & (np.abs(deviation[1:]) < 90.0)
+    positive = deviation > 0
+    i, k = np.nonzero(continuous & (positive[:-1] != positive[1:]))
+    times = bisect_roots(lambda jd, n: _wrap(longitude(jd) - points[k[n]]), jds[i], jds[i + 1])
+    return times, k
+
+
+def aspect_events(table, obj, targets):
+    """Exact aspects of a body to every target: list of event dicts"""
+    points, meta = aspect_points(targets)
+    times, k = point_crossings(table, obj, points)
+    return [
+        {'type': 'aspect', 'jd': jd, 'object': obj, 'aspect': meta[point][1], 'target': meta[point][0]}
+        for jd, point in zip(times.tolist(), k.tolist())
+    ]
+
+
+def ingress_events(table, obj):
+    """Sign ingresses of a body: list of event dicts (a retrograde ingress enters the previous sign)"""
+    times, cusps = point_crossings(table, obj, np.arange(12) * 30.0)
+    speeds = table.speed(obj, times)
+    return [
+        {'type': 'ingress', 'jd': jd, 'object': obj,
+         'sign': const.LIST_SIGNS[cusp if speed >= 0 else (cusp - 1) % 12],
+         'direction': 'direct' if speed >= 0 else 'retrograde'}
+        for jd, cusp, speed in zip(times.tolist(), cusps.tolist(), speeds.tolist())
+    ]
+
+
+def station_events(table, obj):
+    """Retrograde and direct stations of a body: list of event dicts"""
+    if obj in NON_STATIONING:
+        return []
+    jds = table.grid(obj)
+    positive = table.speed(obj, jds) > 0
+    i = np.nonzero(positive[:-1] != positive[1:])[0]
+    times = bisect_roots(lambda jd, n: table.speed(obj, jd), jds[i], jds[i + 1])
+    lons = table.longitude(obj, times)
+    return [
+        {'type': 'station', 'jd': jd, 'object': obj,
+         'direction': 'retrograde' if was_direct else 'direct', 'longitude': round(lon, 4)}
+        for jd, was_direct, lon in zip(times.tolist(), positive[i].tolist(), lons.tolist())
+    ]
+
+
+def transit_events(start_jd, end_jd, objects, targets=(), types=EVENT_TYPES):
+    """
+    Exact events of transiting bodies between start_jd and end_jd
+
+    Args:
+        objects: flatlib object IDs of the transiting bodies
+        targets: list of (label, longitude) receiving aspects (e.g. natal planets)
+        types: any of EVENT_TYPES
+
+    Returns:
+        List of event dicts sorted by time, each with type, jd and object plus
+        aspect/target (aspects), sign/direction (ingresses) or
+        direction/longitude (stations)
+    """
+    table = EphemerisTable(start_jd, end_jd, objects)
+    events = []
+    for obj in objects:
+        if 'aspect' in types and targets:
+            events.extend(aspect_events(table, obj, targets))
+        if 'ingress' in types:
+            events.extend(ingress_events(table, obj))
+        if 'station' in types:
+            events.extend(station_events(table, obj))
+    events = [event for event in events if start_jd <= event['jd'] <= end_jd]
+    events.sort(key=lambda event: event['jd'])
+    return events
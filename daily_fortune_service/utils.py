@@ -5,96 +5,99 @@ from flatlib import const
 from flatlib.datetime import Datetime
 from flatlib.geopos import GeoPos
 from flatlib.chart import Chart
+import swisseph
+from monitoring_service import get_logger
+import numpy as np
+from .ephemeris import julian_days
+from .lunar_table import PHASE_EVENTS, moon_elongation, phase_at as lunar_phase_at, phases_at as lunar_phases_at
+from .planetary_hours import ruler_at
 
+logger = get_logger('daily')
 
-def calculate_lunar_phase(date_str):
+
+def init_ephemeris_thread():
+    """
+    Point the Swiss Ephemeris at flatlib's bundled data files for the current thread
+    The ephemeris path is thread-local in pyswisseph, and flatlib only sets it
+    in the importing thread, so worker pool threads must call this first
+    """
+    import flatlib
+    from flatlib.ephem import swe
+    swe.setPath(flatlib.PATH_RES + 'swefiles')
+
+
+# Phase names by elongation (upper bound in degrees), with description and energy type
+LUNAR_PHASES = (
+    (22.5, "New Moon",
+     "The moon is hidden from view, creating optimal conditions for new beginnings and setting intentions. This is a powerful time for manifestation and planting seeds for future growth.",
+     "Renewal & New Beginnings"),
+    (67.5, "Waxing Crescent",
+     "A thin sliver of light appears, symbolizing emerging opportunities and growing momentum. This phase supports taking initial action on recent decisions and building upon new foundations.",
+     "Growth & Momentum"),
+    (112.5, "First Quarter",
+     "Half the moon is illuminated, representing a time of decision-making and overcoming obstacles. This phase brings clarity about what needs to be released or adjusted in your path forward.",
+     "Decision & Action"),
+    (157.5, "Waxing Gibbous",
+     "The moon grows fuller, enhancing intuition and bringing projects to completion. This is an excellent time for refinement, patience, and trusting the process of natural development.",
+     "Refinement & Patience"),
+    (202.5, "Full Moon",
+     "The moon shines at maximum brightness, illuminating truths and bringing situations to culmination. Emotions and psychic abilities are heightened, making this ideal for celebration and gratitude.",
+     "Culmination & Revelation"),
+    (247.5, "Waning Gibbous",
+     "The moon begins to decrease, encouraging sharing wisdom and expressing gratitude for recent achievements. This phase supports teaching others and integrating lessons learned.",
+     "Gratitude & Sharing"),
+    (292.5, "Last Quarter",
+     "Half the moon remains visible, signaling time for release and forgiveness. This phase helps clear away what no longer serves and creates space for future opportunities.",
+     "Release & Forgiveness"),
+    (360.0, "Waning Crescent",
+     "The final sliver of moon encourages rest, reflection, and spiritual connection. This is a time for contemplation, healing, and preparing for the next cycle of growth.",
+     "Rest & Reflection"),
+)
+
+
+def _direct_lunar_state(jd):
+    """Lunar state straight from the ephemeris, for dates outside the phase table"""
+    elongation, rate = moon_elongation(jd)
+    to_next = 90.0 - elongation % 90.0
+    return {
+        'elongation': elongation,
+        'illumination': (1 - math.cos(math.radians(elongation))) / 2,
+        'days_since_new_moon': elongation / rate,
+        'next_phase': PHASE_EVENTS[int(elongation // 90 + 1) % 4],
+        'days_to_next_phase': to_next / rate
+    }
+
+
+def calculate_lunar_phase(date_str, hour_utc=12.0):
     """
     Calculate detailed lunar phase information for a given date
+    Uses the precomputed phase event table (see lunar_table.py) at hour_utc
     Returns: Dictionary with comprehensive lunar data
     """
     try:
         # Parse the date
         date = datetime.strptime(date_str, '%Y-%m-%d')
+        jd = swisseph.julday(date.year, date.month, date.day, hour_utc)
         
-        # Calculate lunar phase (simplified calculation)
-        # This is a basic approximation - in production you'd use a more accurate algorithm
-        
-        # Known new moon date as reference (2024-01-11)
-        known_new_moon = datetime(2024, 1, 11)
-        lunar_cycle = 29.53  # Average lunar cycle in days
-        
-        # Calculate days since known new moon
-        days_since = (date - known_new_moon).days
-        
-        # Calculate current phase position (0-1)
-        phase_position = (days_since % lunar_cycle) / lunar_cycle
-        
-        # Calculate illumination percentage
-        illumination = round(abs(0.5 - phase_position) * 200, 1)
-        if phase_position > 0.5:
-            illumination = 100 - illumination
+        state = lunar_phase_at(jd) or _direct_lunar_state(jd)
         
         # Determine phase name and detailed info
-        if phase_position < 0.0625:
-            phase_name = "New Moon"
-            phase_description = "The moon is hidden from view, creating optimal conditions for new beginnings and setting intentions. This is a powerful time for manifestation and planting seeds for future growth."
-            energy_type = "Renewal & New Beginnings"
-        elif phase_position < 0.1875:
-            phase_name = "Waxing Crescent"
-            phase_description = "A thin sliver of light appears, symbolizing emerging opportunities and growing momentum. This phase supports taking initial action on recent decisions and building upon new foundations."
-            energy_type = "Growth & Momentum"
-        elif phase_position < 0.3125:
-            phase_name = "First Quarter"
-            phase_description = "Half the moon is illuminated, representing a time of decision-making and overcoming obstacles. This phase brings clarity about what needs to be released or adjusted in your path forward."
-            energy_type = "Decision & Action"
-        elif phase_position < 0.4375:
-            phase_name = "Waxing Gibbous"
-            phase_description = "The moon grows fuller, enhancing intuition and bringing projects to completion. This is an excellent time for refinement, patience, and trusting the process of natural development."
-            energy_type = "Refinement & Patience"
-        elif phase_position < 0.5625:
-            phase_name = "Full Moon"
-            phase_description = "The moon shines at maximum brightness, illuminating truths and bringing situations to culmination. Emotions and psychic abilities are heightened, making this ideal for celebration and gratitude."
-            energy_type = "Culmination & Revelation"
-        elif phase_position < 0.6875:
-            phase_name = "Waning Gibbous"
-            phase_description = "The moon begins to decrease, encouraging sharing wisdom and expressing gratitude for recent achievements. This phase supports teaching others and integrating lessons learned."
-            energy_type = "Gratitude & Sharing"
-        elif phase_position < 0.8125:
-            phase_name = "Last Quarter"
-            phase_description = "Half the moon remains visible, signaling time for release and forgiveness. This phase helps clear away what no longer serves and creates space for future opportunities."
-            energy_type = "Release & Forgiveness"
-        else:
-            phase_name = "Waning Crescent"
-            phase_description = "The final sliver of moon encourages rest, reflection, and spiritual connection. This is a time for contemplation, healing, and preparing for the next cycle of growth."
-            energy_type = "Rest & Reflection"
-        
-        # Calculate days until next major phase
-        days_in_cycle = days_since % lunar_cycle
-        if days_in_cycle < 7.4:
-            days_to_next = 7.4 - days_in_cycle
-            next_phase = "First Quarter"
-        elif days_in_cycle < 14.8:
-            days_to_next = 14.8 - days_in_cycle
-            next_phase = "Full Moon"
-        elif days_in_cycle < 22.1:
-            days_to_next = 22.1 - days_in_cycle
-            next_phase = "Last Quarter"
-        else:
-            days_to_next = 29.53 - days_in_cycle
-            next_phase = "New Moon"
+        for upper, phase_name, phase_description, energy_type in LUNAR_PHASES:
+            if state['elongation'] < upper:
+                break
         
         return {
             'phase_name': phase_name,
-            'illumination_percent': illumination,
+            'illumination_percent': round(state['illumination'] * 100, 1),
             'phase_description': phase_description,
             'energy_type': energy_type,
-            'days_to_next_phase': round(days_to_next, 1),
-            'next_phase': next_phase,
-            'lunar_day': int(days_in_cycle) + 1
+            'days_to_next_phase': round(state['days_to_next_phase'], 1),
+            'next_phase': state['next_phase'],
+            'lunar_day': int(state['days_since_new_moon']) + 1
         }
             
     except Exception as e:
-        print(f"Error calculating lunar phase: {e}")
+        logger.warning("Error calculating lunar phase: %s", e)
         return {
             'phase_name': "Unknown",
             'illumination_percent': 0,
@@ -106,6 +109,38 @@ def calculate_lunar_phase(date_str):
         }
 
 
+def calculate_lunar_phases(dates, hour_utc=12.0):
+    """
+    calculate_lunar_phase() for many dates in one table lookup
+
+    hour_utc is one hour for every date or one per date (see ephemeris.julian_days).
+    Returns: List of lunar phase dictionaries in date order
+    """
+    if not dates:
+        return []
+    jds = julian_days(dates, hour_utc)
+    hours = np.broadcast_to(np.asarray(hour_utc, dtype=float), (len(dates),))
+    state = lunar_phases_at(jds)
+    names = np.searchsorted([phase[0] for phase in LUNAR_PHASES], state['elongation'], side='right')
+    
+    results = []
+    for i, date in enumerate(dates):
+        if not state['valid'][i]:
+            results.append(calculate_lunar_phase(date, float(hours[i])))
+            continue
+        _, phase_name, phase_description, energy_type = LUNAR_PHASES[min(int(names[i]), len(LUNAR_PHASES) - 1)]
+        results.append({
+            'phase_name': phase_name,
+            'illumination_percent': round(float(state['illumination'][i]) * 100, 1),
+            'phase_description': phase_description,
+            'energy_type': energy_type,
+            'days_to_next_phase': round(float(state['days_to_next_phase'][i]), 1),
+            'next_phase': PHASE_EVENTS[int(state['next_phase'][i])],
+            'lunar_day': int(state['days_since_new_moon'][i]) + 1
+        })
+    return results
+
+
 def get_current_transits(date_str, timezone='UTC'):
     """
     Get current planetary positions for the given date
@@ -124,7 +159,7 @@ def get_current_transits(date_str, timezone='UTC'):
         return chart
         
     except Exception as e:
-        print(f"Error getting transits: {e}")
+        logger.warning("Error getting transits: %s", e)
         return None
 
 
@@ -281,24 +316,9 @@ def determine_fortune_level(score):
 
 def get_planetary_hour(date_time, latitude, longitude):
     """
-    Calculate planetary hour for given time and location
-    This is a simplified version - actual calculation is more complex
+    Planet ruling the planetary hour at a time and location
+    (naive datetimes are taken as UTC; see planetary_hours.py)
     """
-    
-    # Planetary hour sequence (starting from sunrise)
-    planetary_sequence = [
-        const.SUN, const.VENUS, const.MERCURY, const.MOON,
-        const.SATURN, const.JUPITER, const.MARS
-    ]
-    
-    # This is a simplified calculation
-    # In reality, you'd need to calculate sunrise/sunset times
-    # and divide daylight/night into 12 planetary hours each
-    
-    hour = date_time.hour
-    day_of_week = date_time.weekday()  # 0 = Monday
-    
-    # Simplified planetary hour calculation
-    planetary_hour_index = (day_of_week * 24 + hour) % 7
-    
-    return planetary_sequence[planetary_hour_index] 
\ No newline at end of file
+    if date_time.tzinfo is None:
+        date_time = pytz.UTC.localize(date_time)
+    return ruler_at(date_time, latitude, longitude)
\ No newline at end of file
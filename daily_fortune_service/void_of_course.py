@@ -0,0 +1,136 @@
+"""
+Void-of-course Moon periods
+
+The Moon is void of course from its last major aspect to a planet until it
+enters the next sign. For each year, the Moon's separation from every planet
+is scanned on the interpolated ephemeris at once (NumPy, samples x aspect
+points) and the exact aspects are bisected to the minute, as are the Moon's
+sign ingresses. The periods are saved as an interval table per year next to
+the ingress calendar (EVENT_CALENDAR_DIR); the intervals are disjoint and
+sorted, so whether a moment is void is one bisect on the end times.
+"""
+from bisect import bisect_right
+
+import numpy as np
+import swisseph
+from flatlib import const
+
+from .event_calendar import year_bounds, year_table
+from .influence import ASPECT_ANGLES, ASPECT_NAMES
+from .transit_events import EphemerisTable, ingress_events, point_crossings
+
+# Planets whose aspects end a void-of-course period (modern rule, Sun to Pluto)
+VOID_PLANETS = (
+    const.SUN, const.MERCURY, const.VENUS, const.MARS, const.JUPITER,
+    const.SATURN, const.URANUS, const.NEPTUNE, const.PLUTO
+)
+
+# Scan margin before a year (days); the Moon stays at most about 2.5 days in a sign
+VOID_SCAN_MARGIN_DAYS = 4.0
+
+
+def moon_aspects(table, planets=VOID_PLANETS):
+    """
+    Exact major aspects of the Moon to each planet
+
+    Returns:
+        (times, planet indexes, aspect indexes) arrays sorted by time
+    """
+    # Separations of each aspect: 0, +-60, +-90, +-120 and 180 degrees
+    points, aspects = [], []
+    for i, angle in enumerate(ASPECT_ANGLES):
+        for point in sorted({float(angle) % 360.0, float(-angle) % 360.0}):
+            points.append(point)
+            aspects.append(i)
+    points, aspects = np.array(points), np.array(aspects)
+
+    times, planet_index, aspect_index = [], [], []
+    for p, planet in enumerate(planets):
+        found, k = point_crossings(table, const.MOON, points, relative_to=planet)
+        times.append(found)
+        planet_index.append(np.full(len(found), p))
+        aspect_index.append(aspects[k])
+    times = np.concatenate(times)
+    order = np.argsort(times, kind='stable')
+    return times[order], np.concatenate(planet_index)[order], np.concatenate(aspect_index)[order]
+
+
+def build_void_table(year):
+    """
+    Void-of-course periods that end (at a Moon ingress) in a year
+
+    Returns:
+        Dictionary of parallel arrays sorted by time: start, end (Julian days,
+        UT), sign (index in const.LIST_SIGNS of the sign the Moon enters),
+        planet (index in VOID_PLANETS of the last aspect; -1 if the Moon made
+        none in the sign) and aspect (index in ASPECT_NAMES, -1 likewise)
+    """
+    start_jd, end_jd = year_bounds(year)
+    table = EphemerisTable(start_jd - VOID_SCAN_MARGIN_DAYS, end_jd, (const.MOON,) + VOID_PLANETS)
+    ingresses = ingress_events(table, const.MOON)
+    aspect_times, planets, aspects = moon_aspects(table)
+
+    columns = {name: [] for name in ('start', 'end', 'sign', 'planet', 'aspect')}
+    for previous, ingress in zip(ingresses, ingresses[1:]):
+        if not start_jd <= ingress['jd'] < end_jd:
+            continue
+        # Last aspect while the Moon was in the sign it is leaving
+        i = np.searchsorted(aspect_times, ingress['jd']) - 1
+        aspected = i >= 0 and aspect_times[i] >= previous['jd']
+        columns['start'].append(aspect_times[i] if aspected else previous['jd'])
+        columns['end'].append(ingress['jd'])
+        columns['sign'].append(const.LIST_SIGNS.index(ingress['sign']))
+        columns['planet'].append(planets[i] if aspected else -1)
+        columns['aspect'].append(aspects[i] if aspected else -1)
+    return {
+        'start': np.array(columns['start'], dtype=float),
+        'end': np.array(columns['end'], dtype=float),
+        'sign': np.array(columns['sign'], dtype=np.int8),
+        'planet': np.array(columns['planet'], dtype=np.int8),
+        'aspect': np.array(columns['aspect'], dtype=np.int8)
+    }
+
+
+def _to_periods(columns):
+    """Columns -> (end jds list for bisect, period dicts)"""
+    periods = []
+    for start, end, sign, planet, aspect in zip(
+            columns['start'].tolist(), columns['end'].tolist(), columns['sign'].tolist(),
+            columns['planet'].tolist(), columns['aspect'].tolist()):
+        periods.append({
+            'start': start,
+            'end': end,
+            'moon_enters': const.LIST_SIGNS[sign],
+            'last_aspect': {'planet': VOID_PLANETS[planet], 'aspect': ASPECT_NAMES[aspect]} if planet >= 0 else None
+        })
+    return [period['end'] for period in periods], periods
+
+
+def get_year_voids(year):
+    """(sorted end jds, period dicts) of the void-of-course periods ending in a year"""
+    return year_table('void-of-course', year, build_void_table, _to_periods)
+
+
+def void_periods(start_jd, end_jd):
+    """Void-of-course periods overlapping [start_jd, end_jd), in time order"""
+    first_year = int(swisseph.revjul(start_jd)[0])
+    # A period ending early next year may start inside the range
+    last_year = int(swisseph.revjul(end_jd)[0]) + 1
+    result = []
+    for year in range(first_year, last_year + 1):
+        ends, periods = get_year_voids(year)
+        for period in periods[bisect_right(ends, start_jd):]:
+            if period['start'] >= end_jd:
+                break
+            result.append(period)
+    return result
+
+
+def void_at(jd):
+    """The void-of-course period containing jd, or None"""
+    for year in (int(swisseph.revjul(jd)[0]), int(swisseph.revjul(jd)[0]) + 1):
+        ends, periods = get_year_voids(year)
+        i = bisect_right(ends, jd)
+        if i < len(periods):
+            return periods[i] if periods[i]['start'] <= jd else None
+    return None
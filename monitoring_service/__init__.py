@@ -0,0 +1,15 @@
+# monitoring_service module
+# 提供Prometheus指标采集和日志配置功能
+from .metrics import (
+    registry,
+    init_app,
+    stage_timer,
+    timed_stage,
+    record_cache_lookup
+)
+from .log_config import configure_logging, get_logger
+
+__all__ = [
+    'registry', 'init_app', 'stage_timer', 'timed_stage', 'record_cache_lookup',
+    'configure_logging', 'get_logger'
+]
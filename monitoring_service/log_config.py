@@ -0,0 +1,139 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+
+# 所有应用日志都挂在这个命名空间下
+ROOT_LOGGER_NAME = 'star_api'
+
+# LogRecord自带的属性，格式化时只输出调用方通过extra传入的其他字段
+_RESERVED_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+def get_logger(name):
+    """获取应用命名空间下的logger，如 get_logger('app') -> star_api.app"""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+def _parse_mapping(value):
+    """解析 'star_api.app=0.1,star_api.stage=1' 形式的配置"""
+    mapping = {}
+    for item in (value or '').split(','):
+        if '=' not in item:
+            continue
+        name, setting = item.split('=', 1)
+        mapping[name.strip()] = setting.strip()
+    return mapping
+
+
+class JsonFormatter(logging.Formatter):
+    """单行JSON格式，附带extra传入的结构化字段"""
+
+    def format(self, record):
+        payload = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_RECORD_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    按logger采样：rates中配置的logger（含子logger）只保留一定比例的记录
+    WARNING及以上级别始终保留
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        name = record.name
+        while name:
+            rate = self.rates.get(name)
+            if rate is not None:
+                return rate >= 1.0 or random.random() < rate
+            name = name.rpartition('.')[0]
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """队列满时直接丢弃日志而不是阻塞请求线程"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging():
+    """
+    配置应用日志管道（重复调用无副作用）
+    请求线程只把记录放入有界队列，由后台线程写到stdout
+
+    环境变量：
+    LOG_LEVEL         全局级别，默认INFO（生产环境不输出DEBUG）
+    LOG_LEVELS        按logger设置级别，如 'star_api.stage=DEBUG'（按需查看阶段耗时）
+    LOG_SAMPLE_RATES  按logger采样比例，如 'star_api.app=0.1'
+    LOG_FORMAT        json（默认）或 text
+    LOG_QUEUE_SIZE    队列容量，默认10000
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    root.propagate = False
+    for name, level in _parse_mapping(os.environ.get('LOG_LEVELS')).items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if os.environ.get('LOG_FORMAT', 'json').lower() == 'text':
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s - %(message)s'))
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(maxsize=int(os.environ.get('LOG_QUEUE_SIZE', 10000)))
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    rates = {name: float(rate) for name, rate in _parse_mapping(os.environ.get('LOG_SAMPLE_RATES')).items()}
+    queue_handler.addFilter(SamplingFilter(rates))
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+_stage_logger = get_logger('stage')
+
+
+def log_stage_timing(stage, start):
+    """DEBUG级别开启时记录阶段耗时（默认关闭，只做一次级别判断）"""
+    if _stage_logger.isEnabledFor(logging.DEBUG):
+        _stage_logger.debug("stage timing", extra={
+            'stage': stage,
+            'duration_ms': round((time.perf_counter() - start) * 1000, 3)
+        })
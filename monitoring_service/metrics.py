@@ -0,0 +1,236 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from .log_config import log_stage_timing
+
+
+# 默认延迟直方图分桶（秒）
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """单调递增计数器"""
+
+    type_name = 'counter'
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(labels.get(name, '') for name in self.label_names)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def items(self):
+        """加锁复制的(标签值, 计数)列表，可在其他线程计数时安全遍历"""
+        with self._lock:
+            return list(self._values.items())
+
+    def samples(self):
+        for key, value in sorted(self.items()):
+            yield f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """可增可减的瞬时值"""
+
+    type_name = 'gauge'
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.label_names)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """累积分桶直方图，observe只做一次二分查找和加法"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # 标签 -> [各分桶计数, 总和, 总数]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(entry[0]), entry[1], entry[2])) for key, entry in self._values.items()]
+        for key, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, ('le', _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    """
+    进程内指标注册表
+    记录时只更新内存中的计数，文本格式只在/metrics被抓取时生成
+    注意：gunicorn每个worker各有一份注册表，Prometheus按实例抓取
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """注册抓取时调用的回调，用于计算派生指标（如缓存命中率）"""
+        self._collectors.append(collector)
+
+    def render(self):
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    'star_api_request_duration_seconds', 'HTTP request latency by route',
+    ('route', 'method', 'status')))
+REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    'star_api_requests_in_flight', 'Requests currently being processed', ('route',)))
+STAGE_LATENCY = registry.register(Histogram(
+    'star_api_stage_duration_seconds',
+    'Latency of internal processing stages (stages may nest)', ('stage',)))
+CACHE_REQUESTS = registry.register(Counter(
+    'star_api_cache_requests_total', 'Cache lookups by cache and result', ('cache', 'result')))
+CACHE_HIT_RATIO = registry.register(Gauge(
+    'star_api_cache_hit_ratio', 'Cache hit ratio since process start', ('cache',)))
+
+
+def _update_cache_hit_ratio():
+    # 一次加锁读出所有计数，命中和未命中来自同一时刻
+    counts = dict(CACHE_REQUESTS.items())
+    for cache in {key[0] for key in counts}:
+        hits = counts.get((cache, 'hit'), 0)
+        misses = counts.get((cache, 'miss'), 0)
+        if hits + misses:
+            CACHE_HIT_RATIO.set(hits / (hits + misses), cache=cache)
+
+
+registry.add_collector(_update_cache_hit_ratio)
+
+
+def record_cache_lookup(cache, hit):
+    """记录一次缓存查询结果"""
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+@contextmanager
+def stage_timer(stage):
+    """统计代码块耗时到指定阶段的直方图（star_api.stage开启DEBUG时同时写日志）"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, stage=stage)
+        log_stage_timing(stage, start)
+
+
+def timed_stage(stage):
+    """装饰器版本的stage_timer"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def init_app(app):
+    """为Flask应用注册请求级指标钩子和/metrics端点"""
+    from flask import Response, g, request
+
+    def route_label():
+        return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.metrics_status = 500
+        REQUESTS_IN_FLIGHT.inc(route=route_label())
+
+    @app.after_request
+    def _record_response_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exc):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return
+        route = route_label()
+        REQUESTS_IN_FLIGHT.dec(route=route)
+        REQUEST_LATENCY.observe(time.perf_counter() - start, route=route,
+                                method=request.method, status=g.pop('metrics_status', 500))
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
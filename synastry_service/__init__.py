@@ -1,6 +1,7 @@
 # synastry_service module
 # 提供合盘分析相关的功能
-from .core import get_synastry_analysis
+from .core import get_synastry_analysis, get_synastry_aspects
+from .composite import composite_chart, davison_chart, circular_midpoints
 from .nakshatra import (
     get_nakshatra_number,
     get_comprehensive_compatibility,
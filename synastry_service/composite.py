@@ -0,0 +1,75 @@
+# 组合盘（中点盘）与时空中点盘（Davison）
+# 组合盘：两张本命盘同名天体经度的较短弧中点，用NumPy一次算出
+# 时空中点盘：两人出生时刻（儒略日）和出生地的中点，按该时刻地点起一张真实星盘
+from functools import lru_cache
+
+import numpy as np
+from flatlib import const
+from flatlib.chart import Chart
+from flatlib.datetime import Datetime
+from flatlib.geopos import GeoPos
+
+# 组合盘包含的天体和轴点
+COMPOSITE_OBJECTS = const.LIST_OBJECTS + [const.ASC, const.MC]
+
+# 时空中点盘缓存数量
+DAVISON_CACHE_SIZE = 1024
+
+
+def circular_midpoints(lons1, lons2):
+    """两组黄经的较短弧中点（度，0-360），支持数组"""
+    lons1 = np.asarray(lons1, dtype=float)
+    lons2 = np.asarray(lons2, dtype=float)
+    # 从lons1到lons2的有向最短角距，范围[-180, 180)
+    delta = (lons2 - lons1 + 180.0) % 360.0 - 180.0
+    return (lons1 + delta / 2.0) % 360.0
+
+
+class CompositeChart:
+    """组合盘：与flatlib Chart相同的get(ID)接口，可直接用于相位计算和SVG渲染"""
+
+    def __init__(self, objects):
+        self._objects = objects
+
+    def get(self, ID):
+        return self._objects[ID]
+
+
+def composite_chart(chart1, chart2, ids=COMPOSITE_OBJECTS):
+    """由两张本命盘计算组合盘"""
+    objects1 = [chart1.get(ID) for ID in ids]
+    objects2 = [chart2.get(ID) for ID in ids]
+    midpoints = circular_midpoints([obj.lon for obj in objects1], [obj.lon for obj in objects2])
+
+    objects = {}
+    for ID, obj1, obj2, lon in zip(ids, objects1, objects2, midpoints):
+        obj = obj1.copy()
+        obj.relocate(float(lon))
+        # 黄纬和速度取平均（速度用于判断入相/出相）
+        if hasattr(obj1, 'lonspeed'):
+            obj.lat = (obj1.lat + obj2.lat) / 2
+            obj.lonspeed = (obj1.lonspeed + obj2.lonspeed) / 2
+        objects[ID] = obj
+    return CompositeChart(objects)
+
+
+@lru_cache(maxsize=DAVISON_CACHE_SIZE)
+def _davison_chart(jd1, lat1, lon1, jd2, lat2, lon2, hsys):
+    jd = (jd1 + jd2) / 2
+    lat = (lat1 + lat2) / 2
+    lon = float(circular_midpoints(lon1, lon2))
+    # 中点经度可能落在(180, 360)，转换为东经为正的[-180, 180]
+    if lon > 180:
+        lon -= 360
+    return Chart(Datetime.fromJD(jd, '+00:00'), GeoPos(lat, lon), IDs=const.LIST_OBJECTS, hsys=hsys)
+
+
+def davison_chart(chart1, chart2):
+    """
+    由两张本命盘计算时空中点盘
+    按输入对缓存（两人顺序无关），重复请求不再调用星历
+    """
+    key1 = (round(chart1.date.jd, 8), round(chart1.pos.lat, 6), round(chart1.pos.lon, 6))
+    key2 = (round(chart2.date.jd, 8), round(chart2.pos.lat, 6), round(chart2.pos.lon, 6))
+    key1, key2 = sorted([key1, key2])
+    return _davison_chart(*key1, *key2, chart1.hsys)
@@ -2,6 +2,8 @@ from flatlib import const
 from flatlib import aspects
 import math
 
+from monitoring_service import get_logger
+
 from .nakshatra import (
     NAKSHATRA_MAPPING, 
     get_nakshatra_number,
@@ -12,6 +14,8 @@ from .compatibility import (
     calculate_relationship_aspects_scores
 )
 
+logger = get_logger('synastry')
+
 # 辅助函数，安全获取行星位置
 def safe_get_planet_position(chart, planet_id):
     """安全获取行星位置，处理可能的元组嵌套问题"""
@@ -77,14 +81,17 @@ ORBS = {
 }
 
 # 获取合盘分析数据
-def get_synastry_analysis(chart1, chart2, lang='en', user1_name='Person 1', user2_name='Person 2'):
+def get_synastry_analysis(chart1, chart2, lang='en', user1_name='Person 1', user2_name='Person 2',
+                          aspects_data=None):
     """
     获取两个人的合盘分析数据
     返回格式为Bubble.io友好的单层JSON
+    aspects_data: 可选，调用方已通过get_synastry_aspects计算的相位（如同时绘制双盘图时），避免重复计算
     """
     try:
         # 获取相位
-        aspects_data = get_synastry_aspects(chart1, chart2)
+        if aspects_data is None:
+            aspects_data = get_synastry_aspects(chart1, chart2)
         
         # 计算宫位摆放
         house_positions = get_house_positions(chart1, chart2)
@@ -470,7 +477,7 @@ def get_synastry_aspects(chart1, chart2):
                             "description": f"{planet2_name} {aspect_name} {planet1_name}"
                         })
         except Exception as e:
-            print(f"Debug - Error in aspect calculation: {str(e)}")
+            logger.debug("Error in aspect calculation: %s", e)
             pass  # 跳过出错的相位
     
     return aspects_list
@@ -67,7 +67,6 @@ def monkey_patch_flatlib():
         
         return True
     except Exception as e:
-        print(f"修补flatlib库失败: {e}")
-        import traceback
-        print(traceback.format_exc())
+        from monitoring_service import get_logger
+        get_logger('synastry').exception("修补flatlib库失败: %s", e)
         return False 
\ No newline at end of file
@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+import pytest
+
+# Keep the app's SQLite stores and disk caches out of the shared temp directory
+_state_dir = tempfile.mkdtemp(prefix='star-api-tests-')
+os.environ.setdefault('SNAPSHOT_DB_PATH', os.path.join(_state_dir, 'snapshots.sqlite3'))
+os.environ.setdefault('SUBSCRIBER_DB_PATH', os.path.join(_state_dir, 'subscribers.sqlite3'))
+os.environ.setdefault('SVG_CACHE_DIR', os.path.join(_state_dir, 'svg'))
+os.environ.setdefault('RESPONSE_CACHE_BACKEND', 'memory')
+os.environ.setdefault('EVENT_CALENDAR_DIR', os.path.join(_state_dir, 'event-calendar'))
+os.environ.setdefault('LUNAR_TABLE_PATH', os.path.join(_state_dir, 'lunar-phases.npy'))
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
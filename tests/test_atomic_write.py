@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from cache_service import atomic_write
+
+
+def test_replaces_the_file_when_the_block_succeeds(tmp_path):
+    path = tmp_path / 'nested' / 'table.bin'
+    with atomic_write(str(path)) as f:
+        f.write(b'first')
+    with atomic_write(str(path)) as f:
+        f.write(b'second')
+    assert path.read_bytes() == b'second'
+    assert os.listdir(path.parent) == ['table.bin']
+
+
+def test_removes_the_temp_file_and_keeps_the_old_one_on_error(tmp_path):
+    path = tmp_path / 'table.bin'
+    path.write_bytes(b'old')
+    with pytest.raises(OSError):
+        with atomic_write(str(path)) as f:
+            f.write(b'partial')
+            raise OSError('disk full')
+    assert path.read_bytes() == b'old'
+    assert os.listdir(tmp_path) == ['table.bin']
@@ -0,0 +1,24 @@
+from daily_fortune_service import DailyFortuneCalculator, batch
+from daily_fortune_service.snapshots import serialize_context
+
+RECORD = {'id': 'a', 'birth_date': '1990-05-15', 'birth_time': '14:30',
+          'birth_latitude': 39.9, 'birth_longitude': 116.4}
+
+
+def test_worker_scores_with_the_context_it_is_sent(monkeypatch):
+    context = DailyFortuneCalculator().build_date_context('2031-03-05', 'Asia/Shanghai')
+    batch.init_worker()
+
+    def rebuild(*args, **kwargs):
+        raise AssertionError('worker rebuilt the date context')
+    monkeypatch.setattr(batch._worker_calculator, 'build_date_context', rebuild)
+
+    lines = batch.score_chunk(([(0, RECORD), (1, {})], serialize_context(context), 'en'))
+    assert [line['index'] for line in lines] == [0, 1]
+    assert lines[1]['success'] is False
+
+    expected = DailyFortuneCalculator().calculate_daily_fortune(
+        '1990-05-15', '14:30', 39.9, 116.4, context=context)
+    line = dict(lines[0])
+    assert line.pop('index') == 0 and line.pop('id') == 'a'
+    assert line == expected
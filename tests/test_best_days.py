@@ -0,0 +1,29 @@
+import pytest
+
+from daily_fortune_service import DailyFortuneCalculator
+
+BIRTH = {'birth_date': '1990-05-15', 'birth_time': '14:30', 'birth_latitude': 39.9, 'birth_longitude': 116.4}
+
+
+@pytest.mark.parametrize('area', ['overall', 'career', 'love'])
+def test_best_days_are_ranked_within_the_window(area):
+    best = DailyFortuneCalculator().find_best_days('1990-05-15', '14:30', 39.9, 116.4,
+                                                   '2025-06-01', '2025-06-30', area=area, top_k=4)
+    assert len(best) == 4
+    assert len({day['date'] for day in best}) == 4
+    assert all('2025-06-01' <= day['date'] <= '2025-06-30' for day in best)
+    assert [day['score'] for day in best] == sorted((day['score'] for day in best), reverse=True)
+
+
+def test_overall_score_matches_the_daily_reading():
+    calculator = DailyFortuneCalculator()
+    best = calculator.find_best_days('1990-05-15', '14:30', 39.9, 116.4, '2025-06-01', '2025-06-10', top_k=1)[0]
+    reading = calculator.calculate_daily_fortune('1990-05-15', '14:30', 39.9, 116.4, best['date'])
+    assert reading['fortune_score'] == best['score']
+
+
+def test_unknown_area_is_rejected(client):
+    with pytest.raises(ValueError):
+        DailyFortuneCalculator().find_best_days('1990-05-15', '14:30', 39.9, 116.4, '2025-06-01', '2025-06-10', area='wealth')
+    response = client.post('/api/daily/best_days', json=dict(BIRTH, start_date='2025-06-01', end_date='2025-06-10', area='wealth'))
+    assert response.status_code == 400
@@ -0,0 +1,41 @@
+import pytest
+from flatlib import const
+
+from synastry_service.composite import circular_midpoints, composite_chart, davison_chart
+
+USER1 = ('1990-05-15', '14:30', 39.9, 116.4)
+USER2 = ('1992-11-03', '08:15', 51.5, -0.13)
+
+
+@pytest.mark.parametrize('lon1, lon2, midpoint', [(350, 10, 0), (10, 350, 0), (10, 200, 285), (0, 90, 45), (120, 120, 120)])
+def test_midpoint_is_on_the_shorter_arc(lon1, lon2, midpoint):
+    assert float(circular_midpoints(lon1, lon2)) == pytest.approx(midpoint)
+
+
+def test_composite_planets_sit_at_the_midpoints(app_module):
+    chart1, chart2 = app_module.calculate_chart(*USER1), app_module.calculate_chart(*USER2)
+    composite = composite_chart(chart1, chart2)
+    for ID in (const.SUN, const.MOON, const.VENUS, const.ASC):
+        expected = float(circular_midpoints(chart1.get(ID).lon, chart2.get(ID).lon))
+        assert composite.get(ID).lon == pytest.approx(expected)
+        assert composite.get(ID).sign == const.LIST_SIGNS[int(expected // 30)]
+
+
+def test_davison_chart_is_the_time_and_place_midpoint(app_module):
+    chart1, chart2 = app_module.calculate_chart(*USER1), app_module.calculate_chart(*USER2)
+    davison = davison_chart(chart1, chart2)
+    assert davison is davison_chart(chart2, chart1)
+    assert davison.date.jd == pytest.approx((chart1.date.jd + chart2.date.jd) / 2)
+    assert davison.pos.lat == pytest.approx((39.9 + 51.5) / 2)
+    assert davison.pos.lon == pytest.approx((116.4 - 0.13) / 2)
+
+
+def test_composite_endpoint(client):
+    response = client.post('/api/composite', json={
+        'user1_date': USER1[0], 'user1_time': USER1[1], 'user1_lat': USER1[2], 'user1_lon': USER1[3],
+        'user2_date': USER2[0], 'user2_time': USER2[1], 'user2_lat': USER2[2], 'user2_lon': USER2[3],
+        'chart_type': 'composite'
+    })
+    assert response.status_code == 200
+    assert set(response.get_json()) == {'success', 'composite'}
+    assert client.post('/api/composite', json={'user1_date': USER1[0], 'chart_type': 'both'}).status_code == 400
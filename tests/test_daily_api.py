@@ -0,0 +1,27 @@
+import re
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+BIRTH = {'birth_date': '1990-05-15', 'birth_time': '14:30', 'birth_latitude': 39.9, 'birth_longitude': 116.4}
+
+
+# UTC+14 and UTC-11: at any moment at least one is on a different date than UTC
+@pytest.mark.parametrize('zone', ['Pacific/Kiritimati', 'Pacific/Pago_Pago'])
+def test_today_and_max_age_follow_the_target_timezone(client, zone):
+    response = client.post('/api/daily', json=dict(BIRTH, target_timezone=zone))
+    assert response.status_code == 200
+    now = datetime.now(pytz.timezone(zone))
+    assert response.get_json()['date'] == now.strftime('%Y-%m-%d')
+
+    midnight = pytz.timezone(zone).localize(datetime(now.year, now.month, now.day) + timedelta(days=1))
+    max_age = int(re.search(r'max-age=(\d+)', response.headers['Cache-Control']).group(1))
+    assert abs(max_age - (midnight.timestamp() - time.time())) < 5
+
+
+def test_unknown_timezone_is_rejected(client):
+    response = client.post('/api/daily', json=dict(BIRTH, target_timezone='Mars/Olympus_Mons'))
+    assert response.status_code == 400
+    assert 'target_timezone' in response.get_json()['error']
@@ -0,0 +1,24 @@
+import pytest
+from flatlib import const
+
+from daily_fortune_service import DailyFortuneCalculator
+from daily_fortune_service.ephemeris import transit_snapshots
+
+
+# Local noon is 04:00 UTC in Shanghai and 22:00 UTC in Honolulu
+@pytest.mark.parametrize('zone, hour_utc', [('UTC', 12.0), ('Asia/Shanghai', 4.0), ('Pacific/Honolulu', 22.0)])
+def test_transits_are_taken_at_local_noon(zone, hour_utc):
+    context = DailyFortuneCalculator().build_date_context('2025-03-20', zone)
+    expected = transit_snapshots(['2025-03-20'], hour_utc)[0]
+    assert context['transits'].get(const.MOON).lon == pytest.approx(expected.get(const.MOON).lon)
+
+
+def test_range_contexts_match_single_day_contexts():
+    calculator = DailyFortuneCalculator()
+    # Spans the switch to BST on 2025-03-30
+    contexts = calculator.build_range_contexts('2025-03-29', '2025-04-02', 'Europe/London')
+    assert [c['target_date'] for c in contexts] == ['2025-03-29', '2025-03-30', '2025-03-31', '2025-04-01', '2025-04-02']
+    for context in contexts:
+        single = DailyFortuneCalculator().build_date_context(context['target_date'], 'Europe/London')
+        assert context['transit_longitudes'].tolist() == pytest.approx(single['transit_longitudes'].tolist())
+        assert context['lunar_phase']['phase_name'] == single['lunar_phase']['phase_name']
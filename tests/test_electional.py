@@ -0,0 +1,77 @@
+import pytest
+
+from daily_fortune_service import electional
+from daily_fortune_service.electional import (
+    _toggle_intervals, complement, electional_search, evaluate, intersect, normalize, union
+)
+from daily_fortune_service.transit_events import date_to_jd, jd_to_iso
+
+A = normalize([(5, 8), (0, 3), (2, 4), (10, 12), (12, 13)])
+B = [(1, 2), (3, 6), (7, 9)]
+
+
+def test_interval_set_operations():
+    assert A == [(0, 4), (5, 8), (10, 13)]
+    assert normalize([(3, 3), (4, 2)]) == []
+    assert intersect(A, B) == [(1, 2), (3, 4), (5, 6), (7, 8)]
+    assert intersect(A, [(4, 5)]) == []
+    assert union(A, B) == [(0, 9), (10, 13)]
+    assert complement(A, 0, 13) == [(4, 5), (8, 10)]
+    assert complement(A, -1, 9) == [(-1, 0), (4, 5), (8, 9)]
+    assert complement([], 0, 1) == [(0, 1)]
+
+
+@pytest.mark.parametrize('active, times, expected', [
+    (True, [], [(0, 10)]),
+    (False, [2, 5], [(2, 5)]),
+    (True, [2, 5], [(0, 2), (5, 10)]),
+    (False, [2, 5, 7], [(2, 5), (7, 10)]),
+])
+def test_toggle_intervals(active, times, expected):
+    assert _toggle_intervals(0, 10, active, times) == expected
+
+
+def test_evaluate_combines_predicates(monkeypatch):
+    monkeypatch.setattr(electional, 'PREDICATES', {'a': lambda start, end: A, 'b': lambda start, end: B})
+    assert evaluate('a', 0, 13) == A
+    assert evaluate(['a', 'b'], 0, 13) == intersect(A, B)
+    assert evaluate({'all': ['a', 'b']}, 0, 13) == intersect(A, B)
+    assert evaluate({'any': ['a', 'b']}, 0, 13) == union(A, B)
+    assert evaluate({'not': {'any': ['a', 'b']}}, 0, 13) == [(9, 10)]
+    assert electional_search({'not': 'a'}, 0, 13, min_duration=1.5) == [(8, 10)]
+
+
+@pytest.mark.parametrize('query', ['moon_sideways', {'xor': ['moon_waxing']}, {'all': ['moon_waxing'], 'any': []}, 3])
+def test_evaluate_rejects_bad_queries(query):
+    with pytest.raises(ValueError):
+        evaluate(query, date_to_jd('2025-01-01'), date_to_jd('2025-02-01'))
+
+
+def test_known_windows():
+    start_jd, end_jd = date_to_jd('2025-01-20'), date_to_jd('2025-04-20')
+    # New moons and full moons of early 2025
+    assert [(jd_to_iso(start), jd_to_iso(end)) for start, end in electional_search('moon_waxing', start_jd, end_jd)] == [
+        ('2025-01-29T12:36Z', '2025-02-12T13:53Z'),
+        ('2025-02-28T00:45Z', '2025-03-14T06:55Z'),
+        ('2025-03-29T10:58Z', '2025-04-13T00:22Z')
+    ]
+    assert [(jd_to_iso(start), jd_to_iso(end)) for start, end in electional_search('mercury_retrograde', start_jd, end_jd)] == [
+        ('2025-03-15T06:46Z', '2025-04-07T11:08Z')
+    ]
+
+
+def test_search_endpoint(client):
+    response = client.post('/api/electional/search', json={
+        'start_date': '2025-03-01', 'end_date': '2025-03-31',
+        'query': ['moon_waxing', 'mercury_retrograde'], 'min_duration_minutes': 60
+    })
+    assert response.status_code == 200
+    windows = response.get_json()['windows']
+    # Mercury turns retrograde the day after the full moon, so the two overlap from the next new moon
+    assert windows == [{'start': '2025-03-29T10:58Z', 'end': '2025-04-01T00:00Z', 'duration_minutes': 3662}]
+
+    assert client.post('/api/electional/search', json={'start_date': '2025-03-01', 'end_date': '2025-03-31'}).status_code == 400
+    response = client.post('/api/electional/search', json={
+        'start_date': '2025-03-01', 'end_date': '2025-03-31', 'query': ['moon_sideways']
+    })
+    assert response.status_code == 400
@@ -0,0 +1,52 @@
+import numpy as np
+from flatlib import const
+
+from daily_fortune_service import event_calendar
+from daily_fortune_service.event_calendar import (
+    CALENDAR_EVENT_TYPES, CALENDAR_OBJECTS, calendar_events, calendar_path, get_year_events, save_year_columns
+)
+from daily_fortune_service.transit_events import date_to_jd, jd_to_iso, transit_events
+
+
+def test_calendar_matches_the_event_finder_across_a_year_boundary():
+    start_jd, end_jd = date_to_jd('2025-12-01'), date_to_jd('2026-02-01')
+    events = calendar_events(start_jd, end_jd, objects=(const.SUN, const.MERCURY))
+    expected = transit_events(start_jd, end_jd, [const.SUN, const.MERCURY], types=CALENDAR_EVENT_TYPES)
+    assert [(e['type'], e['object'], jd_to_iso(e['jd'])) for e in events] == \
+        [(e['type'], e['object'], jd_to_iso(e['jd'])) for e in expected]
+    assert [e['sign'] for e in events if e['object'] == const.SUN] == ['Capricorn', 'Aquarius']
+    assert jd_to_iso(events[0]['jd']) < jd_to_iso(events[-1]['jd'])
+
+
+def test_year_table_is_saved_and_old_formats_are_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setenv('EVENT_CALENDAR_DIR', str(tmp_path))
+    monkeypatch.setattr(event_calendar, '_years', {})
+    save_year_columns(calendar_path(2025), {'jd': np.zeros(1)})
+    with np.load(calendar_path(2025)) as data:
+        data_version = int(data['version'])
+    monkeypatch.setattr(event_calendar, 'CALENDAR_FORMAT_VERSION', data_version + 1)
+
+    jds, events = get_year_events(2025)
+    assert len(events) > 100 and jds == sorted(jds)
+    assert {event['object'] for event in events} <= set(CALENDAR_OBJECTS)
+    with np.load(calendar_path(2025)) as data:
+        assert int(data['version']) == data_version + 1
+        assert data['jd'].tolist() == jds
+
+
+def test_ingresses_endpoint(client):
+    response = client.get('/api/calendar/ingresses?start_date=2025-03-01&end_date=2025-03-31&objects=Sun')
+    assert response.status_code == 200
+    events = response.get_json()['events']
+    assert [(event['type'], event['sign'], event['direction']) for event in events] == [('ingress', 'Aries', 'direct')]
+    assert events[0]['time'] in ('2025-03-20T09:01Z', '2025-03-20T09:02Z')
+
+    response = client.get('/api/calendar/ingresses?start_date=2025-03-01&end_date=2025-04-30&objects=Mercury&types=station&language=zh')
+    assert [event['direction'] for event in response.get_json()['events']] == ['retrograde', 'direct']
+    assert response.get_json()['events'][0]['object'] != 'Mercury'
+
+
+def test_ingresses_endpoint_rejects_unknown_objects(client):
+    response = client.get('/api/calendar/ingresses?start_date=2025-03-01&end_date=2025-03-31&objects=Vulcan')
+    assert response.status_code == 400
+    assert 'Vulcan' in response.get_json()['error']
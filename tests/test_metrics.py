@@ -0,0 +1,18 @@
+from monitoring_service.metrics import CACHE_HIT_RATIO, Counter, record_cache_lookup, registry
+
+
+def test_counter_items_are_a_copy():
+    counter = Counter('test_total', 'test', ('cache',))
+    counter.inc(cache='a')
+    items = counter.items()
+    counter.inc(cache='b')
+    assert items == [(('a',), 1)]
+    assert counter.value(cache='b') == 1
+
+
+def test_cache_hit_ratio_is_derived_at_scrape_time():
+    for hit in (True, True, True, False):
+        record_cache_lookup('test-ratio', hit)
+    text = registry.render()
+    assert 'star_api_cache_hit_ratio{cache="test-ratio"} 0.75' in text
+    assert CACHE_HIT_RATIO.value(cache='test-ratio') == 0.75
@@ -0,0 +1,32 @@
+import pytest
+from flatlib import const
+
+from daily_fortune_service import DailyFortuneCalculator
+
+BIRTH = {'birth_date': '1990-05-15', 'birth_time': '14:30', 'birth_latitude': 39.9, 'birth_longitude': 116.4}
+
+
+@pytest.mark.parametrize('year, month, days', [(2024, 2, 29), (2025, 2, 28), (2025, 12, 31)])
+def test_calendar_has_one_entry_per_day(year, month, days):
+    calendar = DailyFortuneCalculator().month_calendar('1990-05-15', '14:30', 39.9, 116.4, year, month)
+    assert {len(values) for values in calendar.values()} == {days}
+    assert calendar['dates'][0] == f'{year}-{month:02d}-01'
+    assert calendar['dates'][-1] == f'{year}-{month:02d}-{days}'
+
+
+def test_calendar_matches_daily_contexts():
+    calculator = DailyFortuneCalculator()
+    calendar = calculator.month_calendar('1990-05-15', '14:30', 39.9, 116.4, 2025, 3, 'Asia/Shanghai')
+    for i, date in enumerate(calendar['dates']):
+        context = DailyFortuneCalculator().build_date_context(date, 'Asia/Shanghai')
+        assert calendar['moon_sign'][i] == context['transits'].get(const.MOON).sign
+        assert calendar['lunar_phase_name'][i] == context['lunar_phase']['phase_name']
+
+
+def test_calendar_endpoint_translates_moon_signs(client):
+    response = client.post('/api/daily/calendar', json=dict(BIRTH, month='2025-03', language='zh'))
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['month'] == '2025-03'
+    assert len(body['moon_sign']) == 31
+    assert not set(body['moon_sign']) & set(const.LIST_SIGNS)
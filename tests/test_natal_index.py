@@ -0,0 +1,28 @@
+import numpy as np
+
+from daily_fortune_service.influence import ASPECT_NAMES, NATAL_PLANETS, TRANSIT_PLANETS
+from daily_fortune_service.natal_index import NatalIndex
+
+
+def test_transit_hits_lists_each_profile_once():
+    rng = np.random.default_rng(0)
+    index = NatalIndex([f'user-{i}' for i in range(2000)], rng.uniform(0, 360, (2000, len(NATAL_PLANETS))))
+    for _ in range(50):
+        for transit, aspect, natal, ids in index.transit_hits(rng.uniform(0, 360, len(TRANSIT_PLANETS))):
+            assert len(ids) == len(set(ids)), (transit, aspect, natal)
+
+
+def test_opposition_matches_brute_force():
+    rng = np.random.default_rng(1)
+    natal_lons = rng.uniform(0, 360, (500, len(NATAL_PLANETS)))
+    ids = [f'user-{i}' for i in range(500)]
+    index = NatalIndex(ids, natal_lons)
+    # lon + 180 and lon - 180 differ in the last bit for many longitudes
+    transit_lons = np.full(len(TRANSIT_PLANETS), 0.1 + 0.2)
+    orb = 8.0
+    hits = {(transit, natal): found for transit, aspect, natal, found in
+            index.transit_hits(transit_lons, orbs=[orb] * len(ASPECT_NAMES)) if aspect == 'Opposition'}
+    for j, natal in enumerate(NATAL_PLANETS):
+        separation = np.abs((natal_lons[:, j] - transit_lons[0] - 180.0 + 180.0) % 360.0 - 180.0)
+        expected = sorted(ids[i] for i in np.nonzero(separation <= orb)[0])
+        assert sorted(hits.get((TRANSIT_PLANETS[0], natal), [])) == expected
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+import pytz
+
+from daily_fortune_service.planetary_hours import CHALDEAN_ORDER, planetary_hours, ruler_at
+
+# Friday 2025-06-13 in London; sunrise is 04:43 BST
+LONDON = (51.5, -0.13)
+FRIDAY = '2025-06-13'
+
+
+def test_friday_starts_with_venus_at_sunrise():
+    start, end, ruler = planetary_hours(FRIDAY, *LONDON)[0]
+    assert ruler == 'Venus'
+    assert abs(start - datetime(2025, 6, 13, 3, 43, tzinfo=pytz.UTC)) < timedelta(minutes=3)
+    # Midsummer day hours are longer than an hour
+    assert end - start > timedelta(minutes=80)
+
+
+def test_hours_are_contiguous_and_follow_chaldean_order():
+    hours = planetary_hours(FRIDAY, *LONDON)
+    assert len(hours) == 24
+    for (_, end, ruler), (start, _, next_ruler) in zip(hours, hours[1:]):
+        assert abs(end - start) < timedelta(seconds=1)
+        assert CHALDEAN_ORDER.index(next_ruler) == (CHALDEAN_ORDER.index(ruler) + 1) % 7
+    # The next day starts where this one ends, with Saturday's ruler
+    assert abs(hours[-1][1] - planetary_hours('2025-06-14', *LONDON)[0][0]) < timedelta(seconds=1)
+    assert planetary_hours('2025-06-14', *LONDON)[0][2] == 'Saturn'
+
+
+def test_ruler_at_matches_the_hour_table():
+    for start, end, ruler in planetary_hours(FRIDAY, *LONDON):
+        assert ruler_at(start + (end - start) / 2, *LONDON) == ruler
@@ -0,0 +1,22 @@
+import time
+
+from cache_service import MemoryResponseCache
+
+
+def test_nested_values_are_not_shared_with_callers():
+    cache = MemoryResponseCache('test')
+    value = {'auspicious_hours': [{'planet': 'Sun'}], 'lucky_numbers': [1, 2]}
+    cache.put('key', value, time.time() + 60)
+    value['lucky_numbers'].append(3)
+
+    first = cache.get('key')
+    first['auspicious_hours'][0]['planet'] = 'Mars'
+    first['chart'] = '<svg/>'
+
+    assert cache.get('key') == {'auspicious_hours': [{'planet': 'Sun'}], 'lucky_numbers': [1, 2]}
+
+
+def test_expired_entries_are_dropped():
+    cache = MemoryResponseCache('test')
+    cache.put('key', {'a': 1}, time.time() - 1)
+    assert cache.get('key') is None
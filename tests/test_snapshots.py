@@ -0,0 +1,47 @@
+from daily_fortune_service import DailyFortuneCalculator, SnapshotStore
+from daily_fortune_service.ephemeris import TransitSnapshot
+from daily_fortune_service.snapshots import deserialize_context, precompute_snapshots, serialize_context
+
+
+def test_precompute_after_serving_the_same_date(client, app_module, tmp_path):
+    response = client.post('/api/daily', json={
+        'birth_date': '1990-05-15', 'birth_time': '14:30',
+        'birth_latitude': 39.9, 'birth_longitude': 116.4,
+        'target_date': '2031-03-05', 'target_timezone': 'Asia/Shanghai'
+    })
+    assert response.status_code == 200
+
+    store = SnapshotStore(str(tmp_path / 'snapshots.sqlite3'))
+    count = precompute_snapshots(app_module.daily_fortune_calc, store, days=2,
+                                 start_date='2031-03-05', timezones=('Asia/Shanghai',))
+    assert count == 2
+    assert [c['target_date'] for c in store.load('2031-03-05')] == ['2031-03-05', '2031-03-06']
+
+
+def test_serialized_context_round_trips():
+    context = DailyFortuneCalculator().build_date_context('2031-03-05', 'Asia/Shanghai')
+    assert isinstance(context['transits'], TransitSnapshot)
+    restored = deserialize_context(serialize_context(context))
+    assert restored['lunar_phase'] == context['lunar_phase']
+    assert restored['transit_longitudes'].tolist() == context['transit_longitudes'].tolist()
+
+
+def test_store_keeps_current_dates_and_prunes_past_ones(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.sqlite3'))
+    calculator = DailyFortuneCalculator()
+    store.put_many(calculator.build_range_contexts('2031-03-04', '2031-03-06', 'UTC'))
+
+    assert [c['target_date'] for c in store.load('2031-03-05')] == ['2031-03-05', '2031-03-06']
+    store.prune('2031-03-06')
+    assert [c['target_date'] for c in store.load('2000-01-01')] == ['2031-03-06']
+
+
+def test_preloaded_snapshots_are_served_by_build_date_context(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.sqlite3'))
+    precompute_snapshots(DailyFortuneCalculator(), store, days=1, start_date='2031-03-05')
+
+    calculator = DailyFortuneCalculator()
+    calculator.preload_date_contexts(store.load('2031-03-05'))
+    context = calculator.build_date_context('2031-03-05', 'UTC')
+    assert context is calculator.preloaded_contexts[('2031-03-05', 'UTC')]
+    assert context['lunar_phase'] == DailyFortuneCalculator().build_date_context('2031-03-05', 'UTC')['lunar_phase']
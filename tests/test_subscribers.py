@@ -0,0 +1,45 @@
+import pytest
+
+from daily_fortune_service.subscribers import SubscriberStore
+
+
+def subscriber(**overrides):
+    data = {
+        'subscriber_id': 'u1',
+        'birth_date': '1990/05/15',
+        'birth_time': '14:30',
+        'birth_latitude': 39.9,
+        'birth_longitude': 116.4,
+        'target_timezone': 'Asia/Shanghai',
+        'language': 'en'
+    }
+    data.update(overrides)
+    return data
+
+
+def test_upsert_stores_canonical_birth_data(tmp_path):
+    store = SubscriberStore(str(tmp_path / 'subscribers.sqlite3'))
+    store.upsert(subscriber())
+    stored = store.get('u1')
+    assert stored['birth_date'] == '1990-05-15'
+    assert stored['birth_time'] == '14:30:00'
+
+
+@pytest.mark.parametrize('field, value', [
+    ('birth_date', '1990-13-01'),
+    ('birth_date', 'yesterday'),
+    ('birth_time', '25:00'),
+    ('birth_time', None),
+])
+def test_upsert_rejects_unparseable_birth_data(tmp_path, field, value):
+    store = SubscriberStore(str(tmp_path / 'subscribers.sqlite3'))
+    with pytest.raises(ValueError):
+        store.upsert(subscriber(**{field: value}))
+    assert store.get('u1') is None
+
+
+def test_route_rejects_unparseable_birth_data(client, app_module):
+    response = client.post('/api/subscribers', json=subscriber(subscriber_id='route-bad', birth_date='1990-02-30'))
+    assert response.status_code == 400
+    assert 'birth_date' in response.get_json()['error']
+    assert app_module.subscriber_store.get('route-bad') is None
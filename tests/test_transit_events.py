@@ -0,0 +1,109 @@
+import json
+from datetime import datetime
+
+import pytest
+import swisseph
+from flatlib import const
+
+from daily_fortune_service.ephemeris import SWE_OBJECTS
+from daily_fortune_service.transit_events import aspect_hits, date_to_jd, jd_to_iso, transit_events
+
+COUPLE = {
+    'user1_date': '1990-05-15', 'user1_time': '14:30', 'user1_lat': 39.9, 'user1_lon': 116.4,
+    'user2_date': '1992-11-03', 'user2_time': '08:15', 'user2_lat': 51.5, 'user2_lon': -0.13
+}
+
+# Published 2025 Mercury stations and Sun ingresses (UTC)
+MERCURY_STATIONS_2025 = [
+    ('2025-03-15T06:46', 'retrograde'), ('2025-04-07T11:08', 'direct'),
+    ('2025-07-18T04:45', 'retrograde'), ('2025-08-11T07:30', 'direct'),
+    ('2025-11-09T19:02', 'retrograde'), ('2025-11-29T17:38', 'direct')
+]
+SUN_INGRESSES_2025 = [
+    ('2025-03-20T09:01', 'Aries'), ('2025-06-21T02:42', 'Cancer'),
+    ('2025-09-22T18:19', 'Libra'), ('2025-12-21T15:03', 'Capricorn')
+]
+
+
+def _minutes_apart(iso, expected):
+    return abs((datetime.strptime(iso, '%Y-%m-%dT%H:%MZ') - datetime.strptime(expected, '%Y-%m-%dT%H:%M')).total_seconds()) / 60
+
+
+def _sun(jd):
+    return swisseph.calc_ut(jd, SWE_OBJECTS[const.SUN])[0][0]
+
+
+def test_hits_under_way_at_the_start_come_first():
+    start_jd, end_jd = date_to_jd('2025-01-01'), date_to_jd('2025-02-01')
+    # The Sun is exactly on the first target at start_jd and reaches the second ~10 days later
+    targets = [('late', (_sun(start_jd) + 10.0) % 360.0), ('early', _sun(start_jd))]
+    hits = [hit for hit in aspect_hits([const.SUN], targets, start_jd, end_jd, orb=1.0) if hit['aspect'] == 'Conjunction']
+
+    assert [hit['target'] for hit in hits] == ['early', 'late']
+    assert hits[0]['start'] is None and abs(hits[0]['end'] - start_jd - 1.0) < 0.05
+    assert hits[1]['start'] < hits[1]['exact'][0] < hits[1]['end']
+    for jd in (hits[1]['start'], hits[1]['end']):
+        assert abs(abs((_sun(jd) - targets[0][1] + 180.0) % 360.0 - 180.0) - 1.0) < 0.01
+
+
+def test_hit_around_a_station_has_two_exact_passes():
+    # Mercury stations retrograde at 9°35' Aries on 2025-03-15 and stays within 1° of 9°12' for nine days
+    start_jd, end_jd = date_to_jd('2025-03-01'), date_to_jd('2025-05-01')
+    hits = aspect_hits([const.MERCURY], [('point', 9.2)], start_jd, end_jd, orb=1.0)
+    conjunction = [hit for hit in hits if hit['aspect'] == 'Conjunction']
+    assert len(conjunction) == 2
+    station = conjunction[0]
+    assert len(station['exact']) == 2
+    assert station['start'] < station['exact'][0] < date_to_jd('2025-03-15') < station['exact'][1] < station['end']
+    # Direct again, it passes the point once
+    assert len(conjunction[1]['exact']) == 1
+
+
+def test_timeline_lines_are_in_time_order(client):
+    response = client.post('/api/relationship/timeline', json=dict(COUPLE, start_date='2025-01-01', end_date='2025-03-31'))
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+
+    under_way = [line for line in lines if line['start'] is None]
+    assert under_way and lines[:len(under_way)] == under_way
+    starts = [line['start'] for line in lines[len(under_way):]]
+    assert starts == sorted(starts)
+    for line in lines:
+        assert all((line['start'] or '') <= exact <= (line['end'] or '~') for exact in line['exact'])
+
+
+def test_timeline_rejects_long_ranges(client):
+    response = client.post('/api/relationship/timeline', json=dict(COUPLE, start_date='2025-01-01', end_date='2026-06-01'))
+    assert response.status_code == 400
+
+
+def test_mercury_stations_2025():
+    events = transit_events(date_to_jd('2025-01-01'), date_to_jd('2026-01-01'), [const.MERCURY], types=('station',))
+    assert len(events) == len(MERCURY_STATIONS_2025)
+    for event, (expected, direction) in zip(events, MERCURY_STATIONS_2025):
+        assert event['direction'] == direction
+        assert _minutes_apart(jd_to_iso(event['jd']), expected) <= 2
+
+
+def test_sun_ingresses_2025():
+    events = transit_events(date_to_jd('2025-01-01'), date_to_jd('2026-01-01'), [const.SUN], types=('ingress',))
+    assert [event['sign'] for event in events][:3] == ['Aquarius', 'Pisces', 'Aries']
+    found = {event['sign']: jd_to_iso(event['jd']) for event in events}
+    for expected, sign in SUN_INGRESSES_2025:
+        assert _minutes_apart(found[sign], expected) <= 2
+
+
+@pytest.mark.parametrize('payload', [{'types': ['eclipse']}, {'objects': ['Vulcan']}, {'end_date': '2024-12-31'}])
+def test_transit_events_endpoint_rejects_bad_requests(client, payload):
+    response = client.post('/api/transits/events', json=dict({'start_date': '2025-01-01', 'end_date': '2025-01-31'}, **payload))
+    assert response.status_code == 400
+
+
+def test_transit_events_endpoint_lists_stations(client):
+    response = client.post('/api/transits/events', json={
+        'start_date': '2025-03-01', 'end_date': '2025-04-30', 'types': ['station'], 'objects': ['Mercury']
+    })
+    events = response.get_json()['events']
+    assert [(event['direction'], event['type']) for event in events] == [('retrograde', 'station'), ('direct', 'station')]
+    assert _minutes_apart(events[0]['time'], MERCURY_STATIONS_2025[0][0]) <= 2
@@ -0,0 +1,60 @@
+import numpy as np
+import swisseph
+from flatlib import const
+
+from daily_fortune_service.ephemeris import SWE_OBJECTS
+from daily_fortune_service.influence import ASPECT_ANGLES
+from daily_fortune_service.transit_events import date_to_jd, jd_to_iso
+from daily_fortune_service.void_of_course import VOID_PLANETS, void_at, void_periods
+
+# The Moon trines Neptune at 00:03 UTC on 2025-01-24 and enters Sagittarius at 04:29 UTC
+VOID_START = '2025-01-24T00:03Z'
+VOID_END = '2025-01-24T04:29Z'
+
+
+def _lon(obj, jd):
+    return swisseph.calc_ut(jd, SWE_OBJECTS[obj])[0][0]
+
+
+def _separation(planet, jd):
+    """Moon minus planet longitude, in [0, 360)"""
+    return (_lon(const.MOON, jd) - _lon(planet, jd)) % 360.0
+
+
+def test_known_period():
+    periods = void_periods(date_to_jd('2025-01-23'), date_to_jd('2025-01-26'))
+    period = next(p for p in periods if jd_to_iso(p['end']) == VOID_END)
+    assert jd_to_iso(period['start']) == VOID_START
+    assert period['moon_enters'] == 'Sagittarius'
+    assert period['last_aspect'] == {'planet': const.NEPTUNE, 'aspect': 'Trine'}
+
+
+def test_no_aspect_is_made_while_void():
+    period = void_at(date_to_jd('2025-01-24') + 2.0 / 24)
+    assert abs(abs((_separation(const.NEPTUNE, period['start']) + 180.0) % 360.0 - 180.0) - 120.0) < 0.01
+    assert abs(_lon(const.MOON, period['end']) - 240.0) < 0.01
+
+    # Sample about every five minutes strictly inside the period: no separation crosses an aspect angle
+    jds = np.linspace(period['start'], period['end'], 60)[1:-1]
+    for planet in VOID_PLANETS:
+        separations = np.array([_separation(planet, jd) for jd in jds])
+        for angle in ASPECT_ANGLES:
+            for point in {angle % 360.0, -angle % 360.0}:
+                deviation = (separations - point + 180.0) % 360.0 - 180.0
+                assert np.all(deviation > 0) or np.all(deviation < 0), (planet, angle)
+
+
+def test_void_at():
+    start, end = date_to_jd('2025-01-24'), date_to_jd('2025-01-24') + 5.0 / 24
+    assert void_at(start + 1.0 / 24)['moon_enters'] == 'Sagittarius'
+    assert void_at(start - 1.0 / 24) is None
+    assert void_at(end) is None
+
+
+def test_void_of_course_endpoint(client):
+    response = client.get('/api/calendar/void_of_course?start_date=2025-01-24&end_date=2025-01-24')
+    assert response.status_code == 200
+    periods = response.get_json()['periods']
+    assert {'start': VOID_START, 'end': VOID_END, 'moon_enters': 'Sagittarius',
+            'last_aspect': {'planet': 'Neptune', 'aspect': 'Trine'}} in periods
+    assert client.get('/api/calendar/void_of_course?start_date=2025-01-24').status_code == 400